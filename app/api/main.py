@@ -12,6 +12,9 @@ from app.core.logging import configure_logging
 from app.api.routes.reports import router as reports_router
 from app.api.routes.watchlist import router as watchlist_router
 from app.api.routes.ui import router as ui_router
+from app.api.routes.sources import router as sources_router
+from app.api.routes.quotes import router as quotes_router
+from app.connectors.source_health import get_source_health
 from app.scheduler.service import SchedulerService
 
 
@@ -36,6 +39,8 @@ app = FastAPI(title="QuantaWatcher", lifespan=lifespan)
 app.include_router(reports_router)
 app.include_router(ui_router)
 app.include_router(watchlist_router)
+app.include_router(sources_router)
+app.include_router(quotes_router)
 
 
 @app.get("/health")
@@ -43,11 +48,13 @@ async def health() -> dict[str, object]:
     settings = get_settings()
     watchlist_count = len(load_watchlist(settings.watchlist_path))
     refresh = load_refresh_status(settings.refresh_status_path) or {}
+    sources = get_source_health().snapshot(settings)
     return {
         "status": "ok",
         "watchlist_count": watchlist_count,
         "last_refresh_state": refresh.get("state"),
         "last_refresh_ts": refresh.get("ts"),
+        "open_circuits": [name for name, item in sources.items() if item["circuit"] == "open"],
     }
 
 
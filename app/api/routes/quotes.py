@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException
+
+from app.core.boards import parse_boards
+from app.core.config import get_settings
+from app.indicators.limits import get_limit_tracker
+from app.indicators.ranking import GAINERS, LOSERS, TURNOVER, RankFilter, rank_items
+from app.storage.quote_table import get_quote_table
+
+
+router = APIRouter(prefix="/quotes", tags=["quotes"])
+
+
+@router.get("/latest")
+def get_latest_quotes(symbols: Optional[str] = None) -> dict[str, object]:
+    table = get_quote_table()
+    wanted = [s.strip() for s in symbols.split(",") if s.strip()] if symbols else None
+    return {"stats": table.stats(), "items": table.get(wanted)}
+
+
+@router.get("/rankings")
+def get_rankings(
+    k: int = 10,
+    exclude_st: Optional[bool] = None,
+    exclude_suspended: Optional[bool] = None,
+    exclude_boards: Optional[str] = None,
+) -> dict[str, object]:
+    settings = get_settings()
+    if k <= 0:
+        raise HTTPException(status_code=400, detail="k_must_be_positive")
+    try:
+        boards = parse_boards(settings.ranking_exclude_boards if exclude_boards is None else exclude_boards)
+    except RuntimeError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    rank_filter = RankFilter(
+        exclude_st=settings.ranking_exclude_st if exclude_st is None else exclude_st,
+        exclude_suspended=settings.ranking_exclude_suspended if exclude_suspended is None else exclude_suspended,
+        exclude_boards=boards,
+    )
+    table = get_quote_table()
+    rankings = rank_items(table.get(), (GAINERS, LOSERS, TURNOVER), k, rank_filter)
+    return {"stats": table.stats(), "rankings": rankings}
+
+
+@router.get("/limits")
+def get_limit_states() -> dict[str, object]:
+    return get_limit_tracker(get_settings().timezone).current()
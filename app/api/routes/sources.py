@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+from fastapi import APIRouter
+
+from app.connectors.akshare_snapshot import _parse_market_sources
+from app.connectors.source_health import get_source_health
+from app.core.config import get_settings
+
+
+router = APIRouter(prefix="/sources", tags=["sources"])
+
+
+@router.get("/health")
+def get_sources_health() -> dict[str, object]:
+    settings = get_settings()
+    registry = get_source_health()
+    configured = _parse_market_sources(settings.market_snapshot_sources)
+    order = registry.order(configured, settings) if settings.market_snapshot_adaptive_order else configured
+    return {
+        "configured_order": configured,
+        "effective_order": order,
+        "sources": registry.snapshot(settings),
+    }
@@ -2,80 +2,113 @@ from __future__ import annotations
 
 from datetime import datetime
 import math
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
-from app.connectors.akshare_snapshot import _require_akshare, _retry
+from app.connectors.akshare_snapshot import _load_market_cache, _require_akshare, _retry
+from app.connectors.research_executor import map_ordered, research_call_executor, throttled
+from app.connectors.source_health import track_source
 from app.core.config import Settings
 
 
-def fetch_fundamentals(symbols: List[str]) -> List[Dict[str, Any]]:
+def fetch_fundamentals(
+    symbols: List[str],
+    quotes: Optional[Dict[str, Dict[str, Any]]] = None,
+) -> List[Dict[str, Any]]:
     if not symbols:
         return []
     ak = _require_akshare()
     settings = Settings()
-    results: List[Dict[str, Any]] = []
-    for symbol in symbols:
-        pe_ttm = pb = roe = "NA"
-        revenue_yoy = profit_yoy = "NA"
-        gross_margin = net_margin = "NA"
-        debt_ratio = "NA"
-        market_cap = "NA"
-        try:
-            df = _retry(
-                lambda: ak.stock_value_em(symbol=symbol),
-                settings.akshare_retries,
-                settings.akshare_backoff_sec,
-                settings.akshare_research_timeout_sec,
-            )
+    if quotes is None:
+        quotes = _snapshot_quotes(settings, symbols)
+    # Symbols are already in priority order; the shared pool works through them front to back.
+    return map_ordered(
+        lambda symbol: _fetch_one(ak, settings, symbol, quotes.get(symbol) or {}),
+        symbols,
+        settings.research_concurrency,
+    )
+
+
+def _fetch_one(ak, settings: Settings, symbol: str, quote: Dict[str, Any]) -> Dict[str, Any]:
+    pe_ttm = pb = roe = "NA"
+    revenue_yoy = profit_yoy = "NA"
+    gross_margin = net_margin = "NA"
+    debt_ratio = "NA"
+    market_cap = "NA"
+    failed = False
+    try:
+        if quote.get("pe_ttm") is not None and quote.get("total_mv") is not None:
+            # The full-market snapshot already carries valuation; skip the per-symbol call.
+            pe_ttm = quote["pe_ttm"]
+            pb = quote.get("pb", "NA")
+            market_cap = quote["total_mv"]
+        else:
+            with track_source("akshare_value"):
+                df = _retry(
+                    throttled("akshare_value", settings, lambda: ak.stock_value_em(symbol=symbol)),
+                    settings.research_retries,
+                    settings.akshare_backoff_sec,
+                    settings.akshare_research_timeout_sec,
+                    research_call_executor(settings),
+                )
             if df is not None and not df.empty:
                 row = df.iloc[-1].to_dict()
                 pe_ttm = row.get("PE(TTM)", row.get("PE(TTM) ", "NA"))
                 pb = row.get("市净率", "NA")
                 market_cap = row.get("总市值", "NA")
-        except Exception:
-            pass
-        try:
+    except Exception:
+        failed = True
+    try:
+        with track_source("akshare_financial"):
             df2 = _fetch_financial_indicator(ak, settings, symbol)
-            if df2 is not None and not df2.empty:
-                row2 = df2.iloc[-1].to_dict()
-                revenue_yoy = row2.get("主营业务收入增长率(%)", row2.get("营业收入同比增长率(%)", "NA"))
-                profit_yoy = row2.get("净利润增长率(%)", row2.get("净利润同比增长率(%)", "NA"))
-                gross_margin = row2.get("销售毛利率(%)", row2.get("毛利率", "NA"))
-                net_margin = row2.get("销售净利率(%)", row2.get("净利率", "NA"))
-                debt_ratio = row2.get("资产负债率(%)", row2.get("负债率", "NA"))
-                roe = row2.get("净资产收益率(%)", row2.get("加权净资产收益率(%)", roe))
-        except Exception:
-            pass
-        results.append(
-            {
-                "symbol": symbol,
-                "name": "",
-                "market_cap": _norm(market_cap),
-                "pe_ttm": _norm(pe_ttm),
-                "pb": _norm(pb),
-                "roe": _norm(roe),
-                "revenue_yoy": _norm(revenue_yoy),
-                "profit_yoy": _norm(profit_yoy),
-                "gross_margin": _norm(gross_margin),
-                "net_margin": _norm(net_margin),
-                "debt_ratio": _norm(debt_ratio),
-                "cashflow_3y": "NA",
-                "moat_notes": "NA",
-            }
-        )
-    return results
+        if df2 is not None and not df2.empty:
+            row2 = df2.iloc[-1].to_dict()
+            revenue_yoy = row2.get("主营业务收入增长率(%)", row2.get("营业收入同比增长率(%)", "NA"))
+            profit_yoy = row2.get("净利润增长率(%)", row2.get("净利润同比增长率(%)", "NA"))
+            gross_margin = row2.get("销售毛利率(%)", row2.get("毛利率", "NA"))
+            net_margin = row2.get("销售净利率(%)", row2.get("净利率", "NA"))
+            debt_ratio = row2.get("资产负债率(%)", row2.get("负债率", "NA"))
+            roe = row2.get("净资产收益率(%)", row2.get("加权净资产收益率(%)", roe))
+    except Exception:
+        failed = True
+    row = {
+        "symbol": symbol,
+        "name": "",
+        "market_cap": _norm(market_cap),
+        "pe_ttm": _norm(pe_ttm),
+        "pb": _norm(pb),
+        "roe": _norm(roe),
+        "revenue_yoy": _norm(revenue_yoy),
+        "profit_yoy": _norm(profit_yoy),
+        "gross_margin": _norm(gross_margin),
+        "net_margin": _norm(net_margin),
+        "debt_ratio": _norm(debt_ratio),
+        "cashflow_3y": "NA",
+        "moat_notes": "NA",
+    }
+    if failed:
+        # Lets the refresh pipeline tell an upstream error from genuinely missing data.
+        row["fetch_failed"] = True
+    return row
+
+
+def _snapshot_quotes(settings: Settings, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+    frame, _ = _load_market_cache(settings)
+    return {item["symbol"]: item for item in frame.select(symbols).to_items()}
 
 
 def _fetch_financial_indicator(ak, settings: Settings, symbol: str):
     year = datetime.now().year
     for candidate in [year, year - 1, year - 2, 2020, 2015, 2010]:
         df = _retry(
-            lambda: ak.stock_financial_analysis_indicator(
-                symbol=symbol, start_year=str(candidate)
+            throttled(
+                "akshare_financial",
+                settings,
+                lambda: ak.stock_financial_analysis_indicator(symbol=symbol, start_year=str(candidate)),
             ),
-            settings.akshare_retries,
+            settings.research_retries,
             settings.akshare_backoff_sec,
             settings.akshare_research_timeout_sec,
+            research_call_executor(settings),
         )
         if df is not None and not df.empty:
             return df
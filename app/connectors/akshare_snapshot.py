@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 import concurrent.futures
 import json
 import logging
@@ -9,13 +10,21 @@ from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Dict, List, Callable, TypeVar, Optional, Tuple
 
+from app.connectors.async_http import run_async
 from app.connectors.tencent_quote import fetch_quotes
 from app.connectors.eastmoney_spot import fetch_eastmoney_spot
-from app.connectors.sina_market import fetch_sina_market
+from app.connectors.sina_market import fetch_sina_market, fetch_sina_market_async
+from app.connectors.source_health import get_source_health, track_source
 from app.core.config import Settings
+from app.core.snapshot_frame import SnapshotFrame, as_frame
+from app.indicators.ranking import GAINERS, TURNOVER, RankFilter, rank_items, ranking_filter
+from app.storage.snapshot_cache import read_cache_header, read_snapshot_frame, write_snapshot_cache
+from app.storage.snapshot_memory import get_snapshot_memory
 
 logger = logging.getLogger(__name__)
 _EXECUTOR = concurrent.futures.ThreadPoolExecutor(max_workers=4)
+# Hedged losers keep running here after the race returns, so this is not the loop's default executor.
+_HEDGE_EXECUTOR = concurrent.futures.ThreadPoolExecutor(max_workers=4, thread_name_prefix="snapshot-hedge")
 
 
 def _require_akshare():
@@ -76,7 +85,7 @@ def fetch_market_top_movers(top_n: int) -> Dict[str, List[Dict[str, Any]]]:
     settings = Settings()
     try:
         items, _ = _fetch_market_items(settings, symbols=[])
-        snapshot = _build_snapshot_from_items(items, [], top_n)
+        snapshot = _build_snapshot_from_items(items, [], top_n, ranking_filter(settings))
         return {
             "top_gainers": snapshot.get("top_gainers", []),
             "top_turnover": snapshot.get("top_turnover", []),
@@ -87,14 +96,32 @@ def fetch_market_top_movers(top_n: int) -> Dict[str, List[Dict[str, Any]]]:
         return {"top_gainers": [], "top_turnover": []}
 
 
-def fetch_market_snapshot(symbols: List[str], top_n: int) -> Dict[str, List[Dict[str, Any]]]:
+def fetch_market_snapshot(
+    symbols: List[str],
+    top_n: int,
+    max_age_sec: Optional[float] = None,
+) -> Dict[str, List[Dict[str, Any]]]:
     settings = Settings()
-    items, meta = _fetch_market_items(settings, symbols=symbols)
-    snapshot = _build_snapshot_from_items(items, symbols, top_n)
+    items, meta = get_market_items(settings, symbols, max_age_sec)
+    snapshot = _build_snapshot_from_items(items, symbols, top_n, ranking_filter(settings))
     snapshot["meta"] = meta
     return snapshot
 
 
+def get_market_items(
+    settings: Settings,
+    symbols: List[str],
+    max_age_sec: Optional[float] = None,
+) -> Tuple[SnapshotFrame, Dict[str, Any]]:
+    if max_age_sec is None:
+        max_age_sec = settings.market_snapshot_memory_ttl_sec
+    return get_snapshot_memory().fetch(
+        lambda: _fetch_market_items(settings, symbols=symbols),
+        symbols,
+        max_age_sec,
+    )
+
+
 def _normalize_rows(df) -> List[Dict[str, Any]]:
     rows = df.to_dict("records")
     return [
@@ -117,12 +144,13 @@ def _retry(
     attempts: int = 3,
     backoff_sec: float = 1.0,
     timeout_sec: Optional[float] = None,
+    executor: Optional[concurrent.futures.Executor] = None,
 ) -> T:
     last_exc: Optional[Exception] = None
     for idx in range(attempts):
         try:
             if timeout_sec:
-                return _call_with_timeout(fn, timeout_sec)
+                return _call_with_timeout(fn, timeout_sec, executor)
             return fn()
         except Exception as exc:  # pragma: no cover - external dependency
             last_exc = exc
@@ -148,10 +176,14 @@ def _fetch_spot_df(ak, sources: List[str], timeout_sec: Optional[float] = None):
     raise RuntimeError("spot_source_unavailable")
 
 
-def _call_with_timeout(fn: Callable[[], T], timeout_sec: Optional[float]) -> T:
+def _call_with_timeout(
+    fn: Callable[[], T],
+    timeout_sec: Optional[float],
+    executor: Optional[concurrent.futures.Executor] = None,
+) -> T:
     if not timeout_sec or timeout_sec <= 0:
         return fn()
-    future = _EXECUTOR.submit(fn)
+    future = (executor or _EXECUTOR).submit(fn)
     try:
         return future.result(timeout=timeout_sec)
     except concurrent.futures.TimeoutError as exc:
@@ -196,173 +228,275 @@ def _parse_market_sources(value: str) -> List[str]:
 
 
 def _build_snapshot_from_items(
-    items: List[Dict[str, Any]],
+    items: Any,
     symbols: List[str],
     top_n: int,
+    rank_filter: Optional[RankFilter] = None,
 ) -> Dict[str, List[Dict[str, Any]]]:
-    lookup = {item.get("symbol"): item for item in items}
-    watchlist = [lookup[s] for s in symbols if s in lookup] if symbols else []
-    top_gainers = sorted(
-        items,
-        key=lambda item: _safe_num(item.get("pct_chg")),
-        reverse=True,
-    )[:top_n]
-    top_turnover = sorted(
-        items,
-        key=lambda item: _safe_num(item.get("amount")),
-        reverse=True,
-    )[:top_n]
-    return {
-        "watchlist": watchlist or items[:top_n],
-        "top_gainers": top_gainers,
-        "top_turnover": top_turnover,
-    }
+    frame = as_frame(items)
+    watchlist = frame.select(symbols) if symbols else SnapshotFrame.empty()
+    if not len(watchlist):
+        watchlist = frame.head(top_n)
+    # Only the selected rows become dicts; the full market stays columnar.
+    ranked = rank_items(frame, (GAINERS, TURNOVER), top_n, rank_filter)
+    return {"watchlist": watchlist.to_items(), **ranked}
 
 
-def _fetch_market_items(settings: Settings, symbols: List[str]) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+def _fetch_market_items(settings: Settings, symbols: List[str]) -> Tuple[SnapshotFrame, Dict[str, Any]]:
     sources = _parse_market_sources(settings.market_snapshot_sources)
     if settings.disable_fallback and sources:
         sources = sources[:1]
+    elif settings.market_snapshot_adaptive_order:
+        sources = get_source_health().order(sources, settings)
     logger.info("market_snapshot_start", extra={"sources": sources})
+    if settings.market_snapshot_hedge_enabled and len(sources) > 1:
+        return run_async(_race_market_sources(settings, sources, symbols))
     last_exc: Optional[Exception] = None
+    latency_ms: Dict[str, int] = {}
     for idx, source in enumerate(sources):
         fallback_used = idx > 0
-        if source == "sina_market":
-            try:
-                logger.info("market_snapshot_try", extra={"source": source, "fallback": fallback_used})
-                items = fetch_sina_market(settings)
-                if items:
-                    _save_market_cache(settings, items)
-                    logger.info(
-                        "market_snapshot_success",
-                        extra={"source": source, "count": len(items), "fallback": fallback_used},
-                    )
-                    return items, {
-                        "source": "sina_market",
-                        "fallback_used": fallback_used,
-                        "error": _exc_text(last_exc),
-                    }
-            except Exception as exc:
-                logger.warning("market_snapshot_failed", extra={"source": source, "error": str(exc)})
-                last_exc = exc
-                continue
-        if source == "eastmoney_direct":
-            try:
-                logger.info("market_snapshot_try", extra={"source": source, "fallback": fallback_used})
-                em_rows = fetch_eastmoney_spot(settings)
-                if em_rows:
-                    _save_market_cache(settings, em_rows)
-                    logger.info(
-                        "market_snapshot_success",
-                        extra={"source": source, "count": len(em_rows), "fallback": fallback_used},
-                    )
-                    return em_rows, {
-                        "source": "eastmoney_direct",
-                        "fallback_used": fallback_used,
-                        "error": _exc_text(last_exc),
-                    }
-            except Exception as exc:
-                logger.warning("market_snapshot_failed", extra={"source": source, "error": str(exc)})
-                last_exc = exc
-                continue
-        if source == "akshare":
-            try:
-                logger.info("market_snapshot_try", extra={"source": source, "fallback": fallback_used})
-                items, ak_source = _fetch_akshare_items(settings)
-                if items:
-                    _save_market_cache(settings, items)
-                    logger.info(
-                        "market_snapshot_success",
-                        extra={"source": f"akshare_{ak_source}", "count": len(items), "fallback": fallback_used},
-                    )
-                    return items, {
-                        "source": f"akshare_{ak_source}",
-                        "fallback_used": fallback_used,
-                        "error": _exc_text(last_exc),
-                    }
-            except Exception as exc:
-                logger.warning("market_snapshot_failed", extra={"source": source, "error": str(exc)})
-                last_exc = exc
+        start_ts = time.monotonic()
+        try:
+            logger.info("market_snapshot_try", extra={"source": source, "fallback": fallback_used})
+            result = _fetch_source(settings, source, symbols)
+        except Exception as exc:
+            latency_ms[source] = _elapsed_ms(start_ts)
+            logger.warning("market_snapshot_failed", extra={"source": source, "error": str(exc)})
+            last_exc = exc
+            continue
+        latency_ms[source] = _elapsed_ms(start_ts)
+        if result is None:
+            continue
+        items, meta = result
+        meta = {"fallback_used": fallback_used, **meta, "error": _exc_text(last_exc), "latency_ms": latency_ms}
+        logger.info(
+            "market_snapshot_success",
+            extra={"source": meta["source"], "count": len(items), "fallback": meta["fallback_used"]},
+        )
+        return items, meta
+    if last_exc:
+        raise last_exc
+    return SnapshotFrame.empty(), {"source": "none", "fallback_used": True, "error": None}
+
+
+async def _race_market_sources(
+    settings: Settings,
+    sources: List[str],
+    symbols: List[str],
+) -> Tuple[SnapshotFrame, Dict[str, Any]]:
+    hedge_delay = max(0.0, settings.market_snapshot_hedge_delay_sec)
+    # The disk cache answers instantly, so racing it would let stale rows beat any live pull
+    # slower than the hedge delay; it is only read once every live source has failed.
+    queue = [source for source in sources if source != "cache"]
+    pending: Dict["asyncio.Future[Any]", Tuple[str, float]] = {}
+    latency_ms: Dict[str, Optional[int]] = {source: None for source in sources}
+    errors: Dict[str, str] = {}
+    degraded: Optional[Tuple[SnapshotFrame, Dict[str, Any]]] = None
+    last_exc: Optional[Exception] = None
+
+    def _launch() -> None:
+        source = queue.pop(0)
+        logger.info("market_snapshot_try", extra={"source": source, "hedged": True})
+        future = asyncio.ensure_future(_fetch_source_async(settings, source, symbols))
+        pending[future] = (source, time.monotonic())
+
+    try:
+        while True:
+            if not pending and queue:
+                _launch()
+            if not pending:
+                break
+            done, _ = await asyncio.wait(
+                list(pending),
+                timeout=hedge_delay if queue else None,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            if not done:
+                _launch()
                 continue
-        if source == "cache":
-            cached, cache_ts = _load_market_cache(settings)
-            if cached and not _cache_expired(settings, cache_ts):
-                logger.info(
-                    "market_snapshot_success",
-                    extra={"source": "cache", "count": len(cached), "fallback": True},
-                )
-                return cached, {
-                    "source": "cache",
-                    "fallback_used": True,
-                    "cache_ts": cache_ts,
+            for future in done:
+                source, start_ts = pending.pop(future)
+                latency_ms[source] = _elapsed_ms(start_ts)
+                try:
+                    result = future.result()
+                except Exception as exc:
+                    logger.warning("market_snapshot_failed", extra={"source": source, "error": str(exc)})
+                    errors[source] = str(exc)
+                    last_exc = exc
+                    continue
+                if result is None:
+                    continue
+                items, meta = result
+                if meta.get("degraded"):
+                    degraded = degraded or (items, {**meta, "winner": source})
+                    continue
+                # Only the winner is cached, after the race is decided.
+                await asyncio.get_running_loop().run_in_executor(_HEDGE_EXECUTOR, _cache_result, settings, items, meta)
+                meta = {
+                    "fallback_used": source != sources[0],
+                    **meta,
+                    "winner": source,
+                    "hedged": True,
                     "error": _exc_text(last_exc),
+                    "errors": errors,
+                    "latency_ms": latency_ms,
                 }
-        if source == "tencent":
-            if not symbols:
-                continue
-            try:
-                logger.info("market_snapshot_try", extra={"source": source, "fallback": True})
-                items = fetch_quotes(symbols, settings=settings)
                 logger.info(
                     "market_snapshot_success",
-                    extra={"source": "tencent_watchlist", "count": len(items), "fallback": True},
+                    extra={"source": meta["source"], "count": len(items), "hedged": True},
                 )
-                return items, {
-                    "source": "tencent_watchlist",
-                    "fallback_used": True,
-                    "degraded": True,
-                    "error": _exc_text(last_exc),
-                }
-            except Exception as exc:
-                logger.warning("market_snapshot_failed", extra={"source": source, "error": str(exc)})
-                last_exc = exc
-                continue
+                return items, meta
+    finally:
+        for future in pending:
+            future.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+    if "cache" in sources:
+        start_ts = time.monotonic()
+        cached = await asyncio.get_running_loop().run_in_executor(
+            _HEDGE_EXECUTOR, _fetch_source_frame, settings, "cache", symbols
+        )
+        latency_ms["cache"] = _elapsed_ms(start_ts)
+        if cached is not None:
+            items, meta = cached
+            meta = {**meta, "winner": "cache", "hedged": True, "error": _exc_text(last_exc), "errors": errors, "latency_ms": latency_ms}
+            logger.info("market_snapshot_success", extra={"source": "cache", "count": len(items), "hedged": True})
+            return items, meta
+    if degraded:
+        items, meta = degraded
+        meta = {**meta, "hedged": True, "error": _exc_text(last_exc), "errors": errors, "latency_ms": latency_ms}
+        return items, meta
     if last_exc:
         raise last_exc
-    return [], {"source": "none", "fallback_used": True, "error": None}
+    return SnapshotFrame.empty(), {"source": "none", "fallback_used": True, "error": None, "latency_ms": latency_ms}
+
+
+async def _fetch_source_async(
+    settings: Settings,
+    source: str,
+    symbols: List[str],
+) -> Optional[Tuple[SnapshotFrame, Dict[str, Any]]]:
+    # Raced sources never write the cache themselves: losers keep running in the executor
+    # after the race returns and would overwrite the winner's copy.
+    if source == "sina_market":
+        # Native coroutine so a lost race closes its pooled connections right away.
+        frame = as_frame(await fetch_sina_market_async(settings))
+        if not len(frame):
+            return None
+        return frame, {"source": "sina_market"}
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_HEDGE_EXECUTOR, _fetch_source, settings, source, symbols, False)
+
+
+def _fetch_source(
+    settings: Settings,
+    source: str,
+    symbols: List[str],
+    save_cache: bool = True,
+) -> Optional[Tuple[SnapshotFrame, Dict[str, Any]]]:
+    # Dict-producing connectors are converted once here; everything downstream is columnar.
+    result = _fetch_source_frame(settings, source, symbols)
+    if save_cache and result is not None:
+        _cache_result(settings, *result)
+    return result
+
+
+def _fetch_source_frame(
+    settings: Settings,
+    source: str,
+    symbols: List[str],
+) -> Optional[Tuple[SnapshotFrame, Dict[str, Any]]]:
+    if source == "sina_market":
+        frame = as_frame(fetch_sina_market(settings))
+        return (frame, {"source": "sina_market"}) if len(frame) else None
+    if source == "eastmoney_direct":
+        frame = as_frame(fetch_eastmoney_spot(settings))
+        return (frame, {"source": "eastmoney_direct"}) if len(frame) else None
+    if source == "akshare":
+        items, ak_source = _fetch_akshare_items(settings)
+        frame = as_frame(items)
+        return (frame, {"source": f"akshare_{ak_source}"}) if len(frame) else None
+    if source == "cache":
+        cached, cache_ts = _load_market_cache(settings)
+        if not len(cached):
+            return None
+        return cached, {"source": "cache", "fallback_used": True, "cache_ts": cache_ts}
+    if source == "tencent":
+        if not symbols:
+            return None
+        frame = as_frame(fetch_quotes(symbols, settings=settings))
+        return frame, {"source": "tencent_watchlist", "fallback_used": True, "degraded": True}
+    return None
+
+
+def _cache_result(settings: Settings, frame: SnapshotFrame, meta: Dict[str, Any]) -> None:
+    # Only fresh full-market pulls are cached; the cache itself and watchlist-only results are not.
+    if meta.get("source") == "cache" or meta.get("degraded"):
+        return
+    _save_market_cache(settings, frame, meta["source"])
+
+
+def _elapsed_ms(start_ts: float) -> int:
+    return int((time.monotonic() - start_ts) * 1000)
 
 
 def _fetch_akshare_items(settings: Settings) -> Tuple[List[Dict[str, Any]], str]:
     ak = _require_akshare()
     sources = _parse_sources(settings.akshare_spot_sources)
-    df, source = _retry(
-        lambda: _fetch_spot_df(ak, sources, settings.akshare_snapshot_timeout_sec),
-        settings.akshare_retries,
-        settings.akshare_backoff_sec,
-    )
-    if df is None or df.empty:
-        raise RuntimeError("spot_df_empty")
+    with track_source("akshare"):
+        df, source = _retry(
+            lambda: _fetch_spot_df(ak, sources, settings.akshare_snapshot_timeout_sec),
+            settings.akshare_retries,
+            settings.akshare_backoff_sec,
+        )
+        if df is None or df.empty:
+            raise RuntimeError("spot_df_empty")
     return _normalize_rows(df), source
 
 
-def _save_market_cache(settings: Settings, items: List[Dict[str, Any]]) -> None:
-    path = Path(settings.market_snapshot_cache_path)
-    path.parent.mkdir(parents=True, exist_ok=True)
-    payload = {
-        "ts": datetime.now(timezone.utc).isoformat(timespec="seconds"),
-        "items": items,
-    }
-    path.write_text(json.dumps(payload, ensure_ascii=True), encoding="utf-8")
+def _save_market_cache(settings: Settings, items: Any, source: str = "") -> None:
+    # The fetch already succeeded; a cache that cannot be replaced (file locked, disk full)
+    # is logged, not turned into a source failure.
+    try:
+        write_snapshot_cache(settings.market_snapshot_cache_path, items, source)
+    except OSError as exc:
+        logger.warning("market_cache_save_failed", extra={"source": source, "error": str(exc)})
+
+
+def _load_market_cache(settings: Settings) -> Tuple[SnapshotFrame, str]:
+    path = settings.market_snapshot_cache_path
+    header = read_cache_header(path)
+    if header is None:
+        return _load_json_cache(settings)
+    ts = datetime.fromtimestamp(header.ts, timezone.utc).isoformat(timespec="seconds")
+    # TTL and row-count checks only need the header; the body is read for usable caches only.
+    min_rows = settings.sina_market_min_rows
+    if (min_rows > 0 and header.rows < min_rows) or _cache_expired(settings, ts):
+        return SnapshotFrame.empty(), ts
+    return read_snapshot_frame(path, header), ts
 
 
-def _load_market_cache(settings: Settings) -> Tuple[List[Dict[str, Any]], str]:
+def _load_json_cache(settings: Settings) -> Tuple[SnapshotFrame, str]:
     path = Path(settings.market_snapshot_cache_path)
     if not path.exists():
-        return [], ""
+        return SnapshotFrame.empty(), ""
     try:
         payload = json.loads(path.read_text(encoding="utf-8"))
     except Exception:
-        return [], ""
-    items = payload.get("items") if isinstance(payload, dict) else []
-    ts = payload.get("ts") if isinstance(payload, dict) else ""
+        return SnapshotFrame.empty(), ""
+    if not isinstance(payload, dict):
+        return SnapshotFrame.empty(), ""
+    # JSON caches from older releases: {"ts", "items"}.
+    items = payload.get("items")
+    ts = payload.get("ts")
     if not isinstance(items, list):
         items = []
     if not isinstance(ts, str):
         ts = ""
     min_rows = settings.sina_market_min_rows
-    if min_rows > 0 and len(items) < min_rows:
-        return [], ts
-    return items, ts
+    if (min_rows > 0 and len(items) < min_rows) or _cache_expired(settings, ts):
+        return SnapshotFrame.empty(), ts
+    return SnapshotFrame.from_items(items), ts
 
 
 def _cache_expired(settings: Settings, ts: str) -> bool:
@@ -387,8 +521,3 @@ def _exc_text(exc: Optional[Exception]) -> Optional[str]:
     return str(exc)
 
 
-def _safe_num(value: Any) -> float:
-    try:
-        return float(value)
-    except Exception:
-        return float("-inf")
@@ -1,10 +1,20 @@
 from __future__ import annotations
 
+import logging
+import time
 from datetime import datetime, timedelta
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
 
 from app.connectors.akshare_snapshot import _require_akshare, _retry
+from app.connectors.research_executor import map_ordered, research_call_executor, throttled
+from app.connectors.source_health import track_source
 from app.core.config import Settings
+from app.scheduler.trading_hours import last_session_close
+from app.storage.bar_store import BAR_DTYPE, bars_from_columns, date_key, get_bar_store
+
+logger = logging.getLogger(__name__)
 
 
 def fetch_technicals(symbols: List[str]) -> List[Dict[str, Any]]:
@@ -12,80 +22,167 @@ def fetch_technicals(symbols: List[str]) -> List[Dict[str, Any]]:
         return []
     ak = _require_akshare()
     settings = Settings()
-    results: List[Dict[str, Any]] = []
-    for symbol in symbols:
+    # Symbols are already in priority order; the shared pool works through them front to back.
+    return map_ordered(lambda symbol: _fetch_one(ak, settings, symbol), symbols, settings.research_concurrency)
+
+
+def _fetch_one(ak, settings: Settings, symbol: str) -> Dict[str, Any]:
+    try:
+        bars = _load_bars(ak, settings, symbol)
+        if bars is None:
+            return _empty(symbol, failed=True)
+        if not bars.size:
+            return _empty(symbol)
+        closes = bars["close"].tolist()
+        highs = bars["high"].tolist()
+        lows = bars["low"].tolist()
+        amounts = bars["amount"][~np.isnan(bars["amount"])].tolist()
+        ma20 = _sma(closes, 20)
+        ma60 = _sma(closes, 60)
+        support = min(lows[-20:]) if len(lows) >= 20 else min(lows)
+        resistance = max(highs[-20:]) if len(highs) >= 20 else max(highs)
+        return {
+            "symbol": symbol,
+            "name": "",
+            "trend": _trend(ma20, ma60),
+            "support": support,
+            "resistance": resistance,
+            "ma20": ma20,
+            "ma60": ma60,
+            "rsi14": _rsi(closes, 14),
+            "macd": _macd(closes),
+            "vol_ratio": _vol_ratio(amounts, 20),
+            "breakout_note": "NA",
+        }
+    except Exception:
+        return _empty(symbol, failed=True)
+
+
+def _load_bars(ak, settings: Settings, symbol: str) -> Optional[np.ndarray]:
+    if not settings.bar_store_enabled:
+        return _fetch_bars(ak, settings, symbol)[0]
+    store = get_bar_store(settings.bar_store_dir)
+    stored, synced_ts, upstream = store.read(symbol)
+    if stored is not None and stored.size and synced_ts >= last_session_close(settings.timezone).timestamp():
+        # Synced after the last close: every stored bar is final, no upstream call needed.
+        return stored
+    now_ts = time.time()
+    if stored is not None and stored.size >= 2 and upstream in _HIST_UPSTREAMS:
+        # The last stored bar may be a partial intraday one; the bar before it is final and
+        # anchors the check that the qfq adjustment has not moved since it was stored.
+        anchor = stored[-2]
         try:
-            df = _fetch_hist(ak, settings, symbol)
-            if df is None or df.empty:
-                results.append(_empty(symbol))
-                continue
-            closes, highs, lows, amounts = _extract_ohlc(df)
-            ma20 = _sma(closes, 20)
-            ma60 = _sma(closes, 60)
-            rsi14 = _rsi(closes, 14)
-            macd_val = _macd(closes)
-            support = min(lows[-20:]) if len(lows) >= 20 else min(lows)
-            resistance = max(highs[-20:]) if len(highs) >= 20 else max(highs)
-            trend = _trend(ma20, ma60)
-            vol_ratio = _vol_ratio(amounts, 20)
-            results.append(
-                {
-                    "symbol": symbol,
-                    "name": "",
-                    "trend": trend,
-                    "support": support,
-                    "resistance": resistance,
-                    "ma20": ma20,
-                    "ma60": ma60,
-                    "rsi14": rsi14,
-                    "macd": macd_val,
-                    "vol_ratio": vol_ratio,
-                    "breakout_note": "NA",
-                }
-            )
+            # Pinned to the upstream that wrote the bars: another provider's qfq prices never
+            # match the anchor, so falling back here would force a full refetch every run.
+            fresh, _ = _fetch_bars(ak, settings, symbol, int(anchor["date"]), upstream)
         except Exception:
-            results.append(_empty(symbol))
-    return results
+            logger.warning("bar_store_sync_failed", extra={"symbol": symbol, "upstream": upstream})
+            fresh = None
+        if fresh is not None:
+            if fresh.size and fresh["date"][0] == anchor["date"] and _same_price(fresh["close"][0], anchor["close"]):
+                return store.merge(symbol, stored, fresh, now_ts, upstream)
+            logger.info("bar_store_adjustment_changed", extra={"symbol": symbol, "anchor": int(anchor["date"])})
+    try:
+        bars, upstream = _fetch_bars(ak, settings, symbol)
+    except Exception:
+        if stored is not None and stored.size:
+            return stored
+        raise
+    store.write(symbol, bars, now_ts, upstream)
+    return bars
 
 
-def _fetch_hist(ak, settings: Settings, symbol: str):
+def _fetch_bars(
+    ak, settings: Settings, symbol: str, start: Optional[int] = None, upstream: Optional[str] = None
+) -> Tuple[np.ndarray, str]:
+    df, upstream = _fetch_hist(ak, settings, symbol, start, upstream)
+    if df is None or df.empty:
+        return np.empty(0, dtype=BAR_DTYPE), upstream
+    return _to_bars(df), upstream
+
+
+def _fetch_hist(ak, settings: Settings, symbol: str, start: Optional[int] = None, upstream: Optional[str] = None):
+    # Returns (frame, upstream). Without a pinned upstream Eastmoney is tried first, then Tencent.
+    if upstream is not None:
+        return _HIST_UPSTREAMS[upstream](ak, settings, symbol, start), upstream
     try:
+        return _fetch_eastmoney_hist(ak, settings, symbol, start), "akshare_hist"
+    except Exception:
+        return _fetch_tencent_hist(ak, settings, symbol, start), "tencent_hist"
+
+
+def _fetch_eastmoney_hist(ak, settings: Settings, symbol: str, start: Optional[int]):
+    end_date = datetime.now().date()
+    with track_source("akshare_hist"):
         return _retry(
-            lambda: ak.stock_zh_a_hist(symbol=symbol, period="daily", adjust="qfq"),
-            settings.akshare_retries,
+            throttled(
+                "akshare_hist",
+                settings,
+                lambda: ak.stock_zh_a_hist(
+                    symbol=symbol,
+                    period="daily",
+                    start_date=str(start) if start else "19700101",
+                    end_date=end_date.strftime("%Y%m%d"),
+                    adjust="qfq",
+                ),
+            ),
+            settings.research_retries,
             settings.akshare_backoff_sec,
             settings.akshare_research_timeout_sec,
+            research_call_executor(settings),
         )
-    except Exception:
-        tx_symbol = _to_tx_symbol(symbol)
-        end_date = datetime.now().date()
-        start_date = end_date - timedelta(days=420)
+
+
+def _fetch_tencent_hist(ak, settings: Settings, symbol: str, start: Optional[int]):
+    end_date = datetime.now().date()
+    tx_symbol = _to_tx_symbol(symbol)
+    start_date = str(start) if start else (end_date - timedelta(days=420)).strftime("%Y%m%d")
+    with track_source("tencent_hist"):
         return _retry(
-            lambda: ak.stock_zh_a_hist_tx(
-                symbol=tx_symbol,
-                start_date=start_date.strftime("%Y%m%d"),
-                end_date=end_date.strftime("%Y%m%d"),
-                adjust="qfq",
-                timeout=settings.akshare_research_timeout_sec,
+            throttled(
+                "tencent_hist",
+                settings,
+                lambda: ak.stock_zh_a_hist_tx(
+                    symbol=tx_symbol,
+                    start_date=start_date,
+                    end_date=end_date.strftime("%Y%m%d"),
+                    adjust="qfq",
+                    timeout=settings.akshare_research_timeout_sec,
+                ),
             ),
-            settings.akshare_retries,
+            settings.research_retries,
             settings.akshare_backoff_sec,
             settings.akshare_research_timeout_sec,
+            research_call_executor(settings),
         )
 
 
-def _extract_ohlc(df):
-    if "收盘" in df.columns:
-        closes = df["收盘"].astype(float).tolist()
-        highs = df["最高"].astype(float).tolist()
-        lows = df["最低"].astype(float).tolist()
-        amounts = df["成交额"].astype(float).tolist() if "成交额" in df.columns else []
-        return closes, highs, lows, amounts
-    closes = df["close"].astype(float).tolist() if "close" in df.columns else []
-    highs = df["high"].astype(float).tolist() if "high" in df.columns else []
-    lows = df["low"].astype(float).tolist() if "low" in df.columns else []
-    amounts = df["amount"].astype(float).tolist() if "amount" in df.columns else []
-    return closes, highs, lows, amounts
+_HIST_UPSTREAMS = {"akshare_hist": _fetch_eastmoney_hist, "tencent_hist": _fetch_tencent_hist}
+
+
+def _to_bars(df) -> np.ndarray:
+    # Eastmoney history has Chinese headers; the Tencent fallback uses English ones.
+    date_col = "日期" if "日期" in df.columns else "date"
+    return bars_from_columns(
+        [date_key(value) for value in df[date_col]],
+        _column(df, "开盘", "open"),
+        _column(df, "最高", "high"),
+        _column(df, "最低", "low"),
+        _column(df, "收盘", "close"),
+        _column(df, "成交量", "volume"),
+        _column(df, "成交额", "amount"),
+    )
+
+
+def _column(df, *names: str) -> np.ndarray:
+    for name in names:
+        if name in df.columns:
+            return df[name].astype(float).to_numpy()
+    return np.full(len(df), np.nan)
+
+
+def _same_price(fresh: float, stored: float) -> bool:
+    return abs(float(fresh) - float(stored)) <= 1e-4 * max(abs(float(stored)), 1.0)
 
 
 def _to_tx_symbol(symbol: str) -> str:
@@ -107,8 +204,8 @@ def _vol_ratio(amounts: List[float], window: int) -> Any:
     return amounts[-1] / avg
 
 
-def _empty(symbol: str) -> Dict[str, Any]:
-    return {
+def _empty(symbol: str, failed: bool = False) -> Dict[str, Any]:
+    row = {
         "symbol": symbol,
         "name": "",
         "trend": "NA",
@@ -121,6 +218,10 @@ def _empty(symbol: str) -> Dict[str, Any]:
         "vol_ratio": "NA",
         "breakout_note": "NA",
     }
+    if failed:
+        # Lets the refresh pipeline tell an upstream error from genuinely missing data.
+        row["fetch_failed"] = True
+    return row
 
 
 def _sma(series: List[float], window: int) -> float:
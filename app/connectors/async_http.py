@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import time
+from typing import Any, Awaitable, Callable, Coroutine, Dict, Optional, TypeVar
+
+import httpx
+
+T = TypeVar("T")
+
+
+def run_async(coro: Coroutine[Any, Any, T]) -> T:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    # Called from inside an event loop (e.g. an async route): run on a private loop.
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coro).result()
+
+
+def build_async_client(
+    proxy: Optional[str],
+    timeout: float,
+    max_connections: int,
+    headers: Optional[Dict[str, str]] = None,
+) -> httpx.AsyncClient:
+    limits = httpx.Limits(
+        max_connections=max(1, max_connections),
+        max_keepalive_connections=max(1, max_connections),
+    )
+    return httpx.AsyncClient(timeout=timeout, proxy=proxy, limits=limits, headers=headers)
+
+
+class RateLimiter:
+    def __init__(self, interval_sec: float) -> None:
+        self._interval = max(0.0, interval_sec)
+        self._lock = asyncio.Lock()
+        self._next_ts = 0.0
+
+    async def wait(self) -> None:
+        if self._interval <= 0:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            if self._next_ts > now:
+                await asyncio.sleep(self._next_ts - now)
+                now = self._next_ts
+            self._next_ts = now + self._interval
+
+
+async def retry_async(
+    fn: Callable[[], Awaitable[T]],
+    attempts: int,
+    backoff_sec: float,
+) -> T:
+    last_exc: Optional[Exception] = None
+    attempts = max(1, attempts)
+    for idx in range(attempts):
+        try:
+            return await fn()
+        except Exception as exc:
+            last_exc = exc
+            if idx < attempts - 1:
+                await asyncio.sleep(backoff_sec * (2**idx))
+    if last_exc:
+        raise last_exc
+    raise RuntimeError("retry_failed")
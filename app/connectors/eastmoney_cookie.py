@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import concurrent.futures
+import logging
+import threading
+import time
+from http.cookies import SimpleCookie
+from pathlib import Path
+from typing import List, Optional
+
+import httpx
+
+from app.core.config import Settings
+
+logger = logging.getLogger(__name__)
+_PERSIST_EXECUTOR = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="em-cookie")
+
+
+class EastmoneyCookieManager:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._cookie = ""
+        self._fetched_at = 0.0
+        self._loaded = False
+        self._refreshing = False
+
+    async def get(self, client: httpx.AsyncClient, settings: Settings) -> str:
+        static = settings.eastmoney_cookie or ""
+        if not settings.eastmoney_auto_cookie or (static and not settings.eastmoney_force_cookie):
+            return static
+        self._load_once(settings)
+        cookie, age = self._current()
+        if not cookie or _is_stale(age, settings):
+            return await self.refresh(client, settings) or cookie or static
+        if _needs_proactive_refresh(age, settings):
+            self._refresh_in_background(settings)
+        return cookie
+
+    async def refresh(self, client: httpx.AsyncClient, settings: Settings) -> str:
+        try:
+            resp = await client.get(settings.eastmoney_cookie_url, headers=_cookie_headers(settings))
+            resp.raise_for_status()
+        except Exception as exc:
+            logger.warning("eastmoney_cookie_refresh_failed", extra={"error": str(exc)})
+            return ""
+        return self._store(_cookie_from_response(resp), settings)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._fetched_at = 0.0
+
+    def reset(self) -> None:
+        with self._lock:
+            self._cookie = ""
+            self._fetched_at = 0.0
+            self._loaded = False
+            self._refreshing = False
+
+    def _current(self) -> tuple[str, float]:
+        with self._lock:
+            return self._cookie, time.time() - self._fetched_at
+
+    def _load_once(self, settings: Settings) -> None:
+        with self._lock:
+            if self._loaded:
+                return
+            self._loaded = True
+            path = Path(settings.eastmoney_cookie_path)
+            if not path.exists():
+                return
+            # The file mtime seeds the TTL once; afterwards age is tracked in memory.
+            self._cookie = path.read_text(encoding="utf-8").strip()
+            self._fetched_at = path.stat().st_mtime
+
+    def _store(self, cookie: str, settings: Settings) -> str:
+        if not cookie:
+            return ""
+        with self._lock:
+            self._cookie = cookie
+            self._fetched_at = time.time()
+        _PERSIST_EXECUTOR.submit(_save_cookie, settings, cookie)
+        return cookie
+
+    def _refresh_in_background(self, settings: Settings) -> None:
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        threading.Thread(target=self._refresh_sync, args=(settings,), daemon=True).start()
+
+    def _refresh_sync(self, settings: Settings) -> None:
+        try:
+            with httpx.Client(timeout=settings.eastmoney_timeout_sec, proxy=_build_proxy(settings)) as client:
+                resp = client.get(settings.eastmoney_cookie_url, headers=_cookie_headers(settings))
+                resp.raise_for_status()
+            self._store(_cookie_from_response(resp), settings)
+        except Exception as exc:
+            logger.warning("eastmoney_cookie_refresh_failed", extra={"error": str(exc)})
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+
+_MANAGER = EastmoneyCookieManager()
+
+
+def get_cookie_manager() -> EastmoneyCookieManager:
+    return _MANAGER
+
+
+def _is_stale(age: float, settings: Settings) -> bool:
+    ttl = settings.eastmoney_cookie_ttl_sec
+    return ttl > 0 and age > ttl
+
+
+def _needs_proactive_refresh(age: float, settings: Settings) -> bool:
+    ttl = settings.eastmoney_cookie_ttl_sec
+    return ttl > 0 and age > ttl * settings.eastmoney_cookie_refresh_ratio
+
+
+def _cookie_headers(settings: Settings) -> dict[str, str]:
+    return {"User-Agent": settings.eastmoney_user_agent}
+
+
+def _build_proxy(settings: Settings) -> Optional[str]:
+    if settings.https_proxy:
+        return settings.https_proxy
+    if settings.http_proxy:
+        return settings.http_proxy
+    return None
+
+
+def _cookie_from_response(resp: httpx.Response) -> str:
+    cookie_from_jar = _cookie_from_jar(resp.cookies)
+    if cookie_from_jar:
+        return cookie_from_jar
+    return _cookie_from_headers(_get_set_cookie(resp))
+
+
+def _cookie_from_jar(jar: httpx.Cookies) -> str:
+    items = [(key, jar.get(key)) for key in jar.keys()]
+    items = [(k, v) for k, v in items if v]
+    return "; ".join([f"{k}={v}" for k, v in items])
+
+
+def _get_set_cookie(resp: httpx.Response) -> List[str]:
+    if hasattr(resp.headers, "get_list"):
+        return resp.headers.get_list("set-cookie")
+    header = resp.headers.get("set-cookie")
+    return [header] if header else []
+
+
+def _cookie_from_headers(values: List[str]) -> str:
+    cookie = SimpleCookie()
+    for value in values:
+        cookie.load(value)
+    return "; ".join([f"{key}={morsel.value}" for key, morsel in cookie.items()])
+
+
+def _save_cookie(settings: Settings, cookie: str) -> None:
+    path = Path(settings.eastmoney_cookie_path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(cookie, encoding="utf-8")
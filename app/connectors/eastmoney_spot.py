@@ -1,138 +1,178 @@
 from __future__ import annotations
 
-import time
-from http.cookies import SimpleCookie
-from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 import httpx
 
+from app.connectors.async_http import RateLimiter, build_async_client, run_async
+from app.connectors.eastmoney_cookie import get_cookie_manager
+from app.connectors.pagination import scan_pages
+from app.connectors.source_health import track_source
 from app.core.config import Settings
 
+_AUTH_STATUS = {401, 403}
+# Snapshot column -> clist field; fltt=2 returns plain floats and "-" for missing values.
+_NUMERIC_FIELDS = (
+    ("last", "f2"),
+    ("pct_chg", "f3"),
+    ("amount", "f6"),
+    ("open", "f17"),
+    ("high", "f15"),
+    ("low", "f16"),
+    ("prev_close", "f18"),
+    ("volume", "f5"),
+    ("turnover_rate", "f8"),
+    ("volume_ratio", "f10"),
+    ("pe_ttm", "f115"),  # f9 is the dynamic PE (市盈率动态), not TTM
+    ("pb", "f23"),
+    ("total_mv", "f20"),
+    ("float_mv", "f21"),
+    ("main_net_inflow", "f62"),
+)
+
 
 def fetch_eastmoney_spot(settings: Settings) -> List[Dict[str, Any]]:
     if not settings.eastmoney_direct_enabled:
         return []
+    with track_source("eastmoney_direct"):
+        return _fetch_eastmoney_spot(settings)
+
+
+def _fetch_eastmoney_spot(settings: Settings) -> List[Dict[str, Any]]:
     hosts = _parse_hosts(settings.eastmoney_hosts)
     if not hosts:
         return []
-    cookie = settings.eastmoney_cookie or ""
-    if settings.eastmoney_auto_cookie:
-        if settings.eastmoney_force_cookie or not cookie:
-            fetched = _fetch_cookie(settings)
-            if fetched:
-                cookie = fetched
-                _save_cookie(settings, cookie)
-        if not cookie:
-            cookie = _load_cookie(settings)
-        if cookie and _cookie_expired(settings):
-            fetched = _fetch_cookie(settings)
-            if fetched:
-                cookie = fetched
-                _save_cookie(settings, cookie)
-    headers = {
-        "User-Agent": settings.eastmoney_user_agent,
-        "Referer": "https://quote.eastmoney.com/",
-        "Accept": "application/json, text/plain, */*",
-    }
-    if cookie:
-        headers["Cookie"] = cookie
+    return run_async(_fetch_hosts(settings, hosts))
+
+
+async def _fetch_hosts(settings: Settings, hosts: List[str]) -> List[Dict[str, Any]]:
     proxy = _build_proxy(settings)
-    timeout = settings.eastmoney_timeout_sec
-    last_exc: Optional[Exception] = None
-    for host in hosts:
-        try:
-            if settings.eastmoney_cookie_verify:
-                verified = _verify_host(host, headers, proxy, timeout, settings)
-                if not verified:
-                    raise RuntimeError("eastmoney_verify_failed")
-            rows = _fetch_host(host, headers, proxy, timeout, settings)
-            if rows:
-                return normalize_eastmoney_rows(rows)
-        except Exception as exc:
-            last_exc = exc
-            continue
+    concurrency = max(1, settings.eastmoney_concurrency)
+    # One client for the whole fetch: httpx keeps a keep-alive pool per origin,
+    # so the cookie page and every clist page of a host reuse connections.
+    async with build_async_client(proxy, settings.eastmoney_timeout_sec, concurrency) as client:
+        cookie = await get_cookie_manager().get(client, settings)
+        headers = {
+            "User-Agent": settings.eastmoney_user_agent,
+            "Referer": "https://quote.eastmoney.com/",
+            "Accept": "application/json, text/plain, */*",
+        }
+        if cookie:
+            headers["Cookie"] = cookie
+        last_exc: Optional[Exception] = None
+        for host in hosts:
+            try:
+                rows = await _fetch_host_async(client, host, headers, settings)
+                if rows:
+                    return normalize_eastmoney_rows(rows)
+            except Exception as exc:
+                last_exc = exc
+                continue
     if last_exc:
         raise last_exc
     return []
 
 
+async def _reauth(client: httpx.AsyncClient, headers: Dict[str, str], settings: Settings) -> bool:
+    if not settings.eastmoney_auto_cookie:
+        return False
+    manager = get_cookie_manager()
+    manager.invalidate()
+    cookie = await manager.refresh(client, settings)
+    if not cookie or cookie == headers.get("Cookie"):
+        return False
+    headers["Cookie"] = cookie
+    return True
+
+
 def normalize_eastmoney_rows(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     items: List[Dict[str, Any]] = []
     for row in rows:
-        items.append(
-            {
-                "symbol": str(row.get("f12") or "").strip(),
-                "name": str(row.get("f14") or "").strip(),
-                "last": _to_float(row.get("f2")),
-                "pct_chg": _to_float(row.get("f3")),
-                "amount": _to_float(row.get("f6")),
-            }
-        )
+        item: Dict[str, Any] = {
+            "symbol": str(row.get("f12") or "").strip(),
+            "name": str(row.get("f14") or "").strip(),
+        }
+        for column, field in _NUMERIC_FIELDS:
+            item[column] = _to_float(row.get(field))
+        items.append(item)
     return [item for item in items if item.get("symbol")]
 
 
-def _fetch_host(
+async def _fetch_host_async(
+    client: httpx.AsyncClient,
     host: str,
     headers: Dict[str, str],
-    proxy: Optional[str],
-    timeout: float,
     settings: Settings,
 ) -> List[Dict[str, Any]]:
-    base = host.strip()
-    if base.startswith("http://") or base.startswith("https://"):
-        url = f"{base}/api/qt/clist/get"
-    else:
-        url = f"https://{base}/api/qt/clist/get"
-    params = _build_params(settings, settings.eastmoney_page_size)
+    url = _clist_url(host)
+    page_size = settings.eastmoney_page_size
+    limiter = RateLimiter(settings.eastmoney_page_delay_sec)
+
+    async def _request(page: int) -> Optional[Tuple[List[Dict[str, Any]], Optional[int]]]:
+        params = _build_params(settings, page_size)
+        params["pn"] = str(page)
+        await limiter.wait()
+        resp = await client.get(url, params=params, headers=headers)
+        if resp.status_code in _AUTH_STATUS:
+            return None
+        resp.raise_for_status()
+        return _parse_clist(resp.json())
+
+    async def _fetch(page: int) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        parsed = await _request(page)
+        # An auth status or empty diff on page 1 is the only signal that the cookie went stale.
+        if page == 1 and (parsed is None or not parsed[0]) and await _reauth(client, headers, settings):
+            parsed = await _request(page)
+        if parsed is None:
+            raise RuntimeError("eastmoney_auth_failed")
+        items, total = parsed
+        # Page 1 doubles as the host/cookie check that used to be a separate request.
+        if page == 1 and not items and settings.eastmoney_cookie_verify:
+            raise RuntimeError("eastmoney_verify_failed")
+        return items, total
+
+    page_map, errors, last_page = await scan_pages(
+        _fetch,
+        page_size,
+        settings.eastmoney_max_pages,
+        max(1, settings.eastmoney_concurrency),
+        probe_first=True,
+        requeue=max(0, settings.eastmoney_page_requeue),
+    )
+    # last_page is already narrowed by the reported total; any page short of it means a
+    # partial market, which must fail over to the next host instead of being cached.
+    gaps = [page for page in range(1, last_page + 1) if page not in page_map]
+    if gaps:
+        first_exc = errors.get(gaps[0])
+        if gaps[0] == 1 and first_exc is not None:
+            # Page 1 failing is a host/cookie problem; keep its own error (auth, verify).
+            raise first_exc
+        raise RuntimeError(f"eastmoney_gaps:{','.join(str(page) for page in gaps)}") from first_exc
     rows: List[Dict[str, Any]] = []
-    with httpx.Client(timeout=timeout, proxy=proxy) as client:
-        for page in range(1, settings.eastmoney_max_pages + 1):
-            params["pn"] = str(page)
-            resp = client.get(url, params=params, headers=headers)
-            resp.raise_for_status()
-            data = resp.json()
-            payload = data.get("data") or {}
-            diff = payload.get("diff") or []
-            if isinstance(diff, dict):
-                diff_items = list(diff.values())
-            else:
-                diff_items = diff
-            if not diff_items:
-                break
-            rows.extend(diff_items)
-            total = payload.get("total")
-            if total and len(rows) >= int(total):
-                break
-            time.sleep(settings.eastmoney_page_delay_sec)
+    for page in range(1, last_page + 1):
+        rows.extend(page_map[page])
     return rows
 
 
-def _verify_host(
-    host: str,
-    headers: Dict[str, str],
-    proxy: Optional[str],
-    timeout: float,
-    settings: Settings,
-) -> bool:
-    base = host.strip()
-    if base.startswith("http://") or base.startswith("https://"):
-        url = f"{base}/api/qt/clist/get"
-    else:
-        url = f"https://{base}/api/qt/clist/get"
-    params = _build_params(settings, 1)
-    params["pn"] = "1"
-    with httpx.Client(timeout=timeout, proxy=proxy) as client:
-        resp = client.get(url, params=params, headers=headers)
-        resp.raise_for_status()
-        data = resp.json()
-    payload = data.get("data") or {}
+def _parse_clist(data: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+    payload = (data or {}).get("data") or {}
     diff = payload.get("diff") or []
     if isinstance(diff, dict):
         diff_items = list(diff.values())
     else:
         diff_items = diff
-    return bool(diff_items)
+    total = payload.get("total")
+    try:
+        return diff_items, int(total) if total is not None else None
+    except (TypeError, ValueError):
+        return diff_items, None
+
+
+def _clist_url(host: str) -> str:
+    base = host.strip()
+    if base.startswith("http://") or base.startswith("https://"):
+        return f"{base}/api/qt/clist/get"
+    return f"https://{base}/api/qt/clist/get"
 
 
 def _build_params(settings: Settings, page_size: int) -> Dict[str, str]:
@@ -179,63 +219,6 @@ def _build_proxy(settings: Settings) -> Optional[str]:
     return None
 
 
-def _fetch_cookie(settings: Settings) -> str:
-    proxy = _build_proxy(settings)
-    timeout = settings.eastmoney_timeout_sec
-    headers = {"User-Agent": settings.eastmoney_user_agent}
-    with httpx.Client(timeout=timeout, proxy=proxy) as client:
-        resp = client.get(settings.eastmoney_cookie_url, headers=headers)
-        resp.raise_for_status()
-        cookie_from_jar = _cookie_from_jar(resp.cookies)
-        if cookie_from_jar:
-            return cookie_from_jar
-        set_cookie_values = _get_set_cookie(resp)
-        return _cookie_from_headers(set_cookie_values)
-
-
-def _cookie_from_jar(jar: httpx.Cookies) -> str:
-    items = [(key, jar.get(key)) for key in jar.keys()]
-    items = [(k, v) for k, v in items if v]
-    return "; ".join([f"{k}={v}" for k, v in items])
-
-
-def _get_set_cookie(resp: httpx.Response) -> List[str]:
-    if hasattr(resp.headers, "get_list"):
-        return resp.headers.get_list("set-cookie")
-    header = resp.headers.get("set-cookie")
-    return [header] if header else []
-
-
-def _cookie_from_headers(values: List[str]) -> str:
-    cookie = SimpleCookie()
-    for value in values:
-        cookie.load(value)
-    return "; ".join([f"{key}={morsel.value}" for key, morsel in cookie.items()])
-
-
-def _load_cookie(settings: Settings) -> str:
-    path = Path(settings.eastmoney_cookie_path)
-    if not path.exists():
-        return ""
-    return path.read_text(encoding="utf-8").strip()
-
-
-def _save_cookie(settings: Settings, cookie: str) -> None:
-    path = Path(settings.eastmoney_cookie_path)
-    path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(cookie, encoding="utf-8")
-
-
-def _cookie_expired(settings: Settings) -> bool:
-    if settings.eastmoney_cookie_ttl_sec <= 0:
-        return False
-    path = Path(settings.eastmoney_cookie_path)
-    if not path.exists():
-        return True
-    age = time.time() - path.stat().st_mtime
-    return age > settings.eastmoney_cookie_ttl_sec
-
-
 def _to_float(value: Any) -> Optional[float]:
     try:
         if value is None or value == "":
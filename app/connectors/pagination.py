@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import asyncio
+import math
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+PageResult = Tuple[List[Any], Optional[int]]
+PageFetcher = Callable[[int], Awaitable[PageResult]]
+
+
+async def scan_pages(
+    fetch_page: PageFetcher,
+    page_size: int,
+    max_pages: int,
+    window: int,
+    total_rows: Optional[int] = None,
+    probe_first: bool = False,
+    requeue: int = 0,
+) -> Tuple[Dict[int, List[Any]], Dict[int, Exception], int]:
+    # The tail is narrowed by a reported total, a short page or an empty page;
+    # pages past it are never issued and in-flight ones are cancelled. Failed
+    # pages go back on the queue up to ``requeue`` times; the rest are kept.
+    page_size = max(1, page_size)
+    window = max(1, window)
+    last_page = _tail_from_total(max_pages, total_rows, page_size)
+    pages: Dict[int, List[Any]] = {}
+    errors: Dict[int, Exception] = {}
+    in_flight: Dict["asyncio.Task[PageResult]", int] = {}
+    cancelled: List["asyncio.Task[PageResult]"] = []
+    retry_queue: "deque[int]" = deque()
+    attempts: Dict[int, int] = {}
+    next_page = 1
+    probing = probe_first and total_rows is None
+    try:
+        while True:
+            limit = 1 if probing else window
+            while len(in_flight) < limit:
+                while retry_queue and retry_queue[0] > last_page:
+                    retry_queue.popleft()
+                if retry_queue:
+                    page = retry_queue.popleft()
+                elif next_page <= last_page:
+                    page = next_page
+                    next_page += 1
+                else:
+                    break
+                attempts[page] = attempts.get(page, 0) + 1
+                in_flight[asyncio.ensure_future(fetch_page(page))] = page
+            if not in_flight:
+                break
+            done, _ = await asyncio.wait(list(in_flight), return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                page = in_flight.pop(task)
+                probing = False
+                try:
+                    items, total = task.result()
+                except Exception as exc:
+                    errors[page] = exc
+                    if attempts[page] <= requeue:
+                        retry_queue.append(page)
+                    continue
+                errors.pop(page, None)
+                last_page = _tail_from_total(last_page, total, page_size)
+                if not items:
+                    last_page = min(last_page, page - 1)
+                    continue
+                pages[page] = items
+                if len(items) < page_size:
+                    last_page = min(last_page, page)
+            for task, page in list(in_flight.items()):
+                if page > last_page:
+                    task.cancel()
+                    in_flight.pop(task)
+                    cancelled.append(task)
+    finally:
+        for task in in_flight:
+            task.cancel()
+        cancelled.extend(in_flight)
+        if cancelled:
+            await asyncio.gather(*cancelled, return_exceptions=True)
+    pages = {page: items for page, items in pages.items() if page <= last_page}
+    errors = {page: exc for page, exc in errors.items() if page <= last_page}
+    return pages, errors, last_page
+
+
+def _tail_from_total(last_page: int, total: Optional[int], page_size: int) -> int:
+    if total is None or total < 0:
+        return last_page
+    return min(last_page, math.ceil(total / page_size))
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import concurrent.futures
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence, TypeVar
+
+from app.core.config import Settings
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class RateLimiter:
+    # Token bucket: `rate` calls per second on average, bursts of up to `burst`.
+    def __init__(self, rate: float, burst: Optional[float] = None) -> None:
+        self._rate = rate
+        self._capacity = max(1.0, burst if burst is not None else rate)
+        self._tokens = self._capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        if self._rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self._rate
+            time.sleep(wait)
+
+
+def parse_rate_limits(value: str) -> Dict[str, float]:
+    limits: Dict[str, float] = {}
+    for part in (value or "").split(","):
+        if not part.strip():
+            continue
+        name, _, rate = part.partition("=")
+        try:
+            limits[name.strip()] = float(rate)
+        except ValueError:
+            raise RuntimeError(f"research_rate_limit_invalid:{part.strip()}") from None
+    return limits
+
+
+_LIMITERS: Dict[str, RateLimiter] = {}
+_LIMITERS_LOCK = threading.Lock()
+_CALL_EXECUTOR: Optional[concurrent.futures.ThreadPoolExecutor] = None
+
+
+def get_rate_limiter(upstream: str, settings: Settings) -> RateLimiter:
+    # One bucket per upstream for the whole process, shared by every research worker.
+    with _LIMITERS_LOCK:
+        limiter = _LIMITERS.get(upstream)
+        if limiter is None:
+            limiter = RateLimiter(parse_rate_limits(settings.research_rate_limits).get(upstream, 0.0))
+            _LIMITERS[upstream] = limiter
+        return limiter
+
+
+def throttled(upstream: str, settings: Settings, fn: Callable[[], T]) -> Callable[[], T]:
+    # Wrapped per attempt, so retries also wait for a token.
+    limiter = get_rate_limiter(upstream, settings)
+
+    def _call() -> T:
+        limiter.acquire()
+        return fn()
+
+    return _call
+
+
+def research_call_executor(settings: Settings) -> concurrent.futures.ThreadPoolExecutor:
+    # Timed-out calls keep their thread until akshare returns; research gets its own pool so
+    # they cannot starve the snapshot path's timeout executor.
+    global _CALL_EXECUTOR
+    with _LIMITERS_LOCK:
+        if _CALL_EXECUTOR is None:
+            _CALL_EXECUTOR = concurrent.futures.ThreadPoolExecutor(
+                max_workers=max(2, settings.research_concurrency * 2), thread_name_prefix="research-call"
+            )
+        return _CALL_EXECUTOR
+
+
+def map_ordered(fn: Callable[[T], R], items: Sequence[T], max_workers: int) -> List[R]:
+    # Work is submitted in input order, so the first (highest-priority) items finish first.
+    if max_workers <= 1 or len(items) <= 1:
+        return [fn(item) for item in items]
+    with concurrent.futures.ThreadPoolExecutor(max_workers=min(max_workers, len(items)), thread_name_prefix="research") as pool:
+        return list(pool.map(fn, items))
@@ -1,161 +1,194 @@
 from __future__ import annotations
 
-import concurrent.futures
+import asyncio
 import json
 import re
-import time
 from typing import Any, Dict, List, Optional, Tuple
 
 import httpx
 
+from app.connectors.async_http import RateLimiter, build_async_client, retry_async, run_async
+from app.connectors.pagination import scan_pages
+from app.connectors.source_health import track_source
 from app.core.config import Settings
+from app.core.snapshot_frame import SnapshotFrame
 
 _SINA_PAGE_SIZE_CAP = 100
 
+SINA_COLUMNS = ("symbol", "name", "last", "pct_chg", "amount")
+SinaRecord = Tuple[str, str, Optional[float], Optional[float], Optional[float]]
 
-def fetch_sina_market(settings: Settings) -> List[Dict[str, Any]]:
-    url = settings.sina_market_url
+_SINA_KEYS = {"symbol", "code", "name", "trade", "price", "changepercent", "amount"}
+# Sina emits keys in a fixed order, so one match per row picks the five columns.
+_ROW_RE = re.compile(
+    r'\{symbol:"(?:sh|sz|bj)?([^"]*)",code:"([^"]*)",name:"((?:[^"\\]|\\.)*)",trade:"?([^,"}]*)"?,'
+    r'[^{}]*?changepercent:"?([^,"}]*)"?,[^{}]*?amount:"?([^,"}]*)"?[,}]'
+)
+_FIELD_RE = re.compile(r'(\{)|([A-Za-z_]\w*):(?:"((?:[^"\\]|\\.)*)"|([^,}\]]*))')
+
+
+def fetch_sina_market(settings: Settings) -> SnapshotFrame:
+    return run_async(fetch_sina_market_async(settings))
+
+
+async def fetch_sina_market_async(settings: Settings) -> SnapshotFrame:
+    with track_source("sina_market"):
+        return await _fetch_sina_market(settings)
+
+
+async def _fetch_sina_market(settings: Settings) -> SnapshotFrame:
     headers = {
         "User-Agent": settings.sina_market_user_agent,
         "Referer": "https://finance.sina.com.cn/",
     }
-    timeout = settings.sina_market_timeout_sec
     proxy = _build_proxy(settings)
-    rows: List[Dict[str, Any]] = []
-    page_size = settings.sina_market_page_size
-    effective_page_size = min(page_size, _SINA_PAGE_SIZE_CAP)
+    page_size = min(settings.sina_market_page_size, _SINA_PAGE_SIZE_CAP)
     max_pages = settings.sina_market_max_pages
     concurrency = max(1, settings.sina_market_concurrency)
+    limiter = RateLimiter(settings.sina_market_page_delay_sec)
+    async with _SinaSession(settings, headers, proxy, concurrency, limiter) as session:
+        if concurrency <= 1:
+            rows = await _fetch_sequential(session, page_size, max_pages)
+        else:
+            rows = await _fetch_concurrent(session, page_size, max_pages, concurrency)
 
-    if concurrency <= 1:
-        for page in range(1, max_pages + 1):
-            try:
-                _, items = _fetch_page_items(
-                    page,
-                    url,
-                    effective_page_size,
-                    headers,
-                    proxy,
-                    timeout,
-                    settings,
-                )
-            except Exception:
-                if rows:
-                    break
-                raise
-            if not items:
-                break
-            rows.extend(items)
-            if len(items) < effective_page_size:
-                break
-            time.sleep(settings.sina_market_page_delay_sec)
-    else:
-        page_map: Dict[int, List[Dict[str, Any]]] = {}
-        errors: List[Tuple[int, Exception]] = []
-        pages = list(range(1, max_pages + 1))
-        for offset in range(0, len(pages), concurrency):
-            batch = pages[offset : offset + concurrency]
-            with concurrent.futures.ThreadPoolExecutor(max_workers=concurrency) as executor:
-                futures = {
-                    executor.submit(
-                        _fetch_page_items,
-                        page,
-                        url,
-                        effective_page_size,
-                        headers,
-                        proxy,
-                        timeout,
-                        settings,
-                    ): page
-                    for page in batch
-                }
-                for future in concurrent.futures.as_completed(futures):
-                    page = futures[future]
-                    try:
-                        _, items = future.result()
-                        if items:
-                            page_map[page] = items
-                    except Exception as exc:
-                        errors.append((page, exc))
-            if settings.sina_market_page_delay_sec:
-                time.sleep(settings.sina_market_page_delay_sec)
-        for page in range(1, max_pages + 1):
-            items = page_map.get(page, [])
-            if not items:
-                break
-            rows.extend(items)
-            if len(items) < effective_page_size:
+    frame = SnapshotFrame.from_records(SINA_COLUMNS, rows)
+    min_rows = settings.sina_market_min_rows
+    if min_rows > 0 and len(frame) < min_rows:
+        raise RuntimeError(f"sina_market_incomplete:{len(frame)}")
+    return frame
+
+
+async def _fetch_sequential(
+    session: "_SinaSession",
+    page_size: int,
+    max_pages: int,
+) -> List[SinaRecord]:
+    rows: List[SinaRecord] = []
+    for page in range(1, max_pages + 1):
+        try:
+            _, items = await session.fetch_page_items(page, page_size)
+        except Exception:
+            if rows:
                 break
-        if not rows and errors:
-            raise errors[0][1]
+            raise
+        if not items:
+            break
+        rows.extend(items)
+        if len(items) < page_size:
+            break
+    return rows
+
+
+async def _fetch_concurrent(
+    session: "_SinaSession",
+    page_size: int,
+    max_pages: int,
+    concurrency: int,
+) -> List[SinaRecord]:
+    count_task = asyncio.ensure_future(session.count_rows())
+
+    async def _fetch(page: int) -> Tuple[List[SinaRecord], Optional[int]]:
+        _, items = await session.fetch_page_items(page, page_size)
+        total = count_task.result() if count_task.done() and not count_task.exception() else None
+        return items, total
 
-    normalized = _normalize_sina_rows(rows)
-    min_rows = settings.sina_market_min_rows
-    if min_rows > 0 and len(normalized) < min_rows:
-        raise RuntimeError(f"sina_market_incomplete:{len(normalized)}")
-    return normalized
-
-
-def _fetch_page(
-    url: str,
-    params: Dict[str, str],
-    headers: Dict[str, str],
-    proxy: Optional[str],
-    timeout: float,
-) -> str:
     try:
-        with httpx.Client(timeout=timeout, proxy=proxy) as client:
-            resp = client.get(url, params=params, headers=headers)
+        page_map, errors, last_page = await scan_pages(
+            _fetch,
+            page_size,
+            max_pages,
+            concurrency,
+            requeue=session.page_requeue,
+        )
+    finally:
+        if not count_task.done():
+            count_task.cancel()
+        await asyncio.gather(count_task, return_exceptions=True)
+    gaps = [page for page in range(1, last_page + 1) if page not in page_map]
+    if gaps:
+        first_exc = errors.get(gaps[0])
+        raise RuntimeError(f"sina_market_gaps:{','.join(str(page) for page in gaps)}") from first_exc
+    rows: List[SinaRecord] = []
+    for page in range(1, last_page + 1):
+        rows.extend(page_map[page])
+    return rows
+
+
+class _SinaSession:
+    def __init__(
+        self,
+        settings: Settings,
+        headers: Dict[str, str],
+        proxy: Optional[str],
+        concurrency: int,
+        limiter: RateLimiter,
+    ) -> None:
+        self._settings = settings
+        self._headers = headers
+        self._proxy = proxy
+        self._concurrency = concurrency
+        self._limiter = limiter
+        self._client = _build_client(proxy, settings.sina_market_timeout_sec, concurrency)
+        self._direct: Optional[httpx.AsyncClient] = None
+        self.page_requeue = max(0, settings.sina_market_page_requeue)
+
+    async def __aenter__(self) -> "_SinaSession":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self._client.aclose()
+        if self._direct is not None:
+            await self._direct.aclose()
+
+    async def fetch_page_items(self, page: int, page_size: int) -> Tuple[int, List[SinaRecord]]:
+        params = _build_page_params(self._settings, page, page_size)
+        text = await retry_async(
+            lambda: self._fetch_text(params),
+            self._settings.sina_market_retries,
+            self._settings.sina_market_backoff_sec,
+        )
+        return page, _parse_sina_records(text)
+
+    async def count_rows(self) -> Optional[int]:
+        if not self._settings.sina_market_count_url:
+            return None
+        params = {"node": self._settings.sina_market_node}
+        try:
+            resp = await self._client.get(
+                self._settings.sina_market_count_url, params=params, headers=self._headers
+            )
             resp.raise_for_status()
-            text = resp.text.strip()
-            if text and not text.startswith("[") and text != "null":
-                raise ValueError("sina_invalid_payload")
-            return text
-    except Exception:
-        if proxy:
-            with httpx.Client(timeout=timeout) as client:
-                resp = client.get(url, params=params, headers=headers)
-                resp.raise_for_status()
-                text = resp.text.strip()
-                if text and not text.startswith("[") and text != "null":
-                    raise ValueError("sina_invalid_payload")
-                return text
-        raise
-
-
-def _fetch_page_with_retry(
-    url: str,
-    params: Dict[str, str],
-    headers: Dict[str, str],
-    proxy: Optional[str],
-    timeout: float,
-    retries: int,
-    backoff_sec: float,
-) -> str:
-    last_exc: Optional[Exception] = None
-    attempts = max(1, retries)
-    for idx in range(attempts):
+            return int(resp.text.strip().strip('"'))
+        except Exception:
+            return None
+
+    async def _fetch_text(self, params: Dict[str, str]) -> str:
         try:
-            return _fetch_page(url, params, headers, proxy, timeout)
-        except Exception as exc:
-            last_exc = exc
-            if idx < attempts - 1:
-                time.sleep(backoff_sec * (2**idx))
-    if last_exc:
-        raise last_exc
-    raise RuntimeError("sina_fetch_failed")
-
-
-def _fetch_page_items(
-    page: int,
-    url: str,
-    page_size: int,
-    headers: Dict[str, str],
-    proxy: Optional[str],
-    timeout: float,
-    settings: Settings,
-) -> Tuple[int, List[Dict[str, Any]]]:
-    params = {
+            return await self._get(self._client, params)
+        except Exception:
+            if not self._proxy:
+                raise
+            if self._direct is None:
+                self._direct = _build_client(None, self._settings.sina_market_timeout_sec, self._concurrency)
+            return await self._get(self._direct, params)
+
+    async def _get(self, client: httpx.AsyncClient, params: Dict[str, str]) -> str:
+        await self._limiter.wait()
+        resp = await client.get(self._settings.sina_market_url, params=params, headers=self._headers)
+        resp.raise_for_status()
+        text = resp.text.strip()
+        if text and not text.startswith("[") and text != "null":
+            raise ValueError("sina_invalid_payload")
+        return text
+
+
+def _build_client(proxy: Optional[str], timeout: float, concurrency: int) -> httpx.AsyncClient:
+    return build_async_client(proxy, timeout, concurrency)
+
+
+def _build_page_params(settings: Settings, page: int, page_size: int) -> Dict[str, str]:
+    return {
         "page": str(page),
         "num": str(page_size),
         "sort": settings.sina_market_sort,
@@ -164,48 +197,76 @@ def _fetch_page_items(
         "symbol": "",
         "_s_r_a": "init",
     }
-    text = _fetch_page_with_retry(
-        url,
-        params,
-        headers,
-        proxy,
-        timeout,
-        settings.sina_market_retries,
-        settings.sina_market_backoff_sec,
-    )
-    return page, _parse_sina_text(text)
 
 
-def _parse_sina_text(text: str) -> List[Dict[str, Any]]:
-    if not text or text == "null":
+def parse_sina_columns(text: str) -> Dict[str, List[Any]]:
+    records = _parse_sina_records(text)
+    if not records:
+        return {name: [] for name in SINA_COLUMNS}
+    return {name: list(values) for name, values in zip(SINA_COLUMNS, zip(*records))}
+
+
+def _parse_sina_records(text: str) -> List[SinaRecord]:
+    if not text:
         return []
     text = text.strip()
     if not text.startswith("["):
         return []
-    json_text = re.sub(r'([{,])([a-zA-Z_][a-zA-Z0-9_]*)\s*:', r'\1"\2":', text)
+    matches = _ROW_RE.findall(text)
+    if len(matches) != text.count("{"):
+        return _tokenize_sina_records(text)
+    records: List[SinaRecord] = []
+    append = records.append
+    for symbol, code, name, last, pct_chg, amount in matches:
+        if "\\" in name:
+            name = _unescape(name)
+        append((code or symbol, name, _num(last), _num(pct_chg), _num(amount)))
+    return [record for record in records if record[0]]
+
+
+def _tokenize_sina_records(text: str) -> List[SinaRecord]:
+    # Field-by-field fallback for payloads whose key order differs from the fast path.
+    records: List[SinaRecord] = []
+    row: Dict[str, str] = {}
+    for brace, key, quoted, bare in _FIELD_RE.findall(text):
+        if brace:
+            if row:
+                records.append(_record_from_fields(row))
+            row = {}
+        elif key in _SINA_KEYS:
+            row[key] = _unescape(quoted) if "\\" in quoted else (quoted or bare.strip())
+    if row:
+        records.append(_record_from_fields(row))
+    return [record for record in records if record[0]]
+
+
+def _record_from_fields(row: Dict[str, str]) -> SinaRecord:
+    code = row.get("code") or row.get("symbol") or ""
+    if code.startswith(("sh", "sz", "bj")):
+        code = code[2:]
+    return (
+        code,
+        row.get("name") or "",
+        _num(row.get("trade") or row.get("price")),
+        _num(row.get("changepercent")),
+        _num(row.get("amount")),
+    )
+
+
+def _unescape(value: str) -> str:
     try:
-        return json.loads(json_text)
+        return json.loads(f'"{value}"')
     except json.JSONDecodeError:
-        return []
+        return value
 
 
-def _normalize_sina_rows(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    items: List[Dict[str, Any]] = []
-    for row in rows:
-        code = row.get("code") or row.get("symbol") or ""
-        code = str(code)
-        if code.startswith(("sh", "sz")):
-            code = code[2:]
-        items.append(
-            {
-                "symbol": code,
-                "name": row.get("name") or "",
-                "last": _to_float(row.get("trade") or row.get("price")),
-                "pct_chg": _to_float(row.get("changepercent")),
-                "amount": _to_float(row.get("amount")),
-            }
-        )
-    return [item for item in items if item.get("symbol")]
+def _num(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
 
 
 def _build_proxy(settings: Settings) -> Optional[str]:
@@ -215,11 +276,3 @@ def _build_proxy(settings: Settings) -> Optional[str]:
         return settings.http_proxy
     return None
 
-
-def _to_float(value: Any) -> Optional[float]:
-    try:
-        if value is None or value == "":
-            return None
-        return float(value)
-    except Exception:
-        return None
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+from app.core.config import Settings
+
+# Full-market sources compete for their slots; cache/tencent keep their configured positions.
+REORDERABLE_SOURCES = {"sina_market", "akshare", "eastmoney_direct"}
+
+
+class _SourceState:
+    def __init__(self, window: int) -> None:
+        self.samples: Deque[Tuple[bool, int]] = deque(maxlen=window)
+        self.consecutive_failures = 0
+        self.last_error: Optional[str] = None
+        self.last_error_ts: Optional[str] = None
+        self.last_success_ts: Optional[str] = None
+        self.last_failure_mono = 0.0
+
+
+class SourceHealthRegistry:
+    def __init__(self, window: int = 50) -> None:
+        self._window = window
+        self._lock = threading.Lock()
+        self._states: Dict[str, _SourceState] = {}
+
+    def record(self, source: str, ok: bool, latency_ms: int, error: Optional[str] = None) -> None:
+        now = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        with self._lock:
+            state = self._states.setdefault(source, _SourceState(self._window))
+            state.samples.append((ok, latency_ms))
+            if ok:
+                state.consecutive_failures = 0
+                state.last_success_ts = now
+            else:
+                state.consecutive_failures += 1
+                state.last_error = error
+                state.last_error_ts = now
+                state.last_failure_mono = time.monotonic()
+
+    def is_open(self, source: str, settings: Settings) -> bool:
+        with self._lock:
+            state = self._states.get(source)
+            return state is not None and self._is_open(state, settings)
+
+    def order(self, sources: List[str], settings: Settings) -> List[str]:
+        with self._lock:
+            allowed = [s for s in sources if s not in self._states or not self._is_open(self._states[s], settings)]
+            if not allowed:
+                return list(sources)
+            slots = [idx for idx, source in enumerate(allowed) if source in REORDERABLE_SOURCES]
+            ranked = sorted(
+                (allowed[idx] for idx in slots),
+                key=lambda source: self._rank_key(source, sources.index(source)),
+            )
+        ordered = list(allowed)
+        for idx, source in zip(slots, ranked):
+            ordered[idx] = source
+        return ordered
+
+    def snapshot(self, settings: Settings) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {source: self._describe(state, settings) for source, state in sorted(self._states.items())}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._states.clear()
+
+    def _rank_key(self, source: str, configured_idx: int) -> Tuple[float, int, int]:
+        state = self._states.get(source)
+        if state is None or not state.samples:
+            return (-1.0, 0, configured_idx)
+        rate = _success_rate(state)
+        p50 = _percentile([ms for ok, ms in state.samples if ok], 50) or 0
+        # Buckets keep near-equal sources in their configured order instead of flapping.
+        return (-round(rate, 1), p50 // 1000, configured_idx)
+
+    def _is_open(self, state: _SourceState, settings: Settings) -> bool:
+        threshold = settings.source_breaker_failures
+        if threshold <= 0 or state.consecutive_failures < threshold:
+            return False
+        # Once the cool-down passes the next call is a half-open trial; a failure re-opens it.
+        return time.monotonic() - state.last_failure_mono < settings.source_breaker_cooldown_sec
+
+    def _describe(self, state: _SourceState, settings: Settings) -> Dict[str, Any]:
+        latencies = [ms for _, ms in state.samples]
+        return {
+            "samples": len(state.samples),
+            "success_rate": round(_success_rate(state), 3) if state.samples else None,
+            "p50_ms": _percentile(latencies, 50),
+            "p95_ms": _percentile(latencies, 95),
+            "consecutive_failures": state.consecutive_failures,
+            "circuit": "open" if self._is_open(state, settings) else "closed",
+            "last_error": state.last_error,
+            "last_error_ts": state.last_error_ts,
+            "last_success_ts": state.last_success_ts,
+        }
+
+
+_REGISTRY = SourceHealthRegistry()
+
+
+def get_source_health() -> SourceHealthRegistry:
+    return _REGISTRY
+
+
+@contextmanager
+def track_source(source: str) -> Iterator[None]:
+    start_ts = time.monotonic()
+    try:
+        yield
+    except Exception as exc:
+        _REGISTRY.record(source, False, int((time.monotonic() - start_ts) * 1000), str(exc))
+        raise
+    _REGISTRY.record(source, True, int((time.monotonic() - start_ts) * 1000))
+
+
+def _success_rate(state: _SourceState) -> float:
+    if not state.samples:
+        return 0.0
+    return sum(1 for ok, _ in state.samples if ok) / len(state.samples)
+
+
+def _percentile(values: List[int], pct: int) -> Optional[int]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
@@ -1,56 +1,166 @@
 from __future__ import annotations
 
-import time
-from typing import Any, Dict, List, Optional
+import asyncio
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import httpx
 
+from app.connectors.async_http import build_async_client, retry_async, run_async
+from app.connectors.source_health import track_source
 from app.core.config import Settings
 
 
+def _to_float(value: str) -> Optional[float]:
+    try:
+        return float(value)
+    except Exception:
+        return None
+
+
+def _wan(value: str) -> Optional[float]:
+    number = _to_float(value)
+    return number * 10_000 if number is not None else None
+
+
+def _yi(value: str) -> Optional[float]:
+    number = _to_float(value)
+    return number * 100_000_000 if number is not None else None
+
+
+def _text(value: str) -> Optional[str]:
+    return value or None
+
+
+# Positions in the "~"-separated qt.gtimg.cn record. Volumes are in lots (手);
+# amount is quoted in 万元 and market caps in 亿元, both converted to CNY.
+_FIELDS: Tuple[Tuple[str, int, Callable[[str], Any]], ...] = (
+    ("last", 3, _to_float),
+    ("prev_close", 4, _to_float),
+    ("open", 5, _to_float),
+    ("volume", 6, _to_float),
+    *((f"bid{n}", 7 + 2 * n, _to_float) for n in range(1, 6)),
+    *((f"bid{n}_volume", 8 + 2 * n, _to_float) for n in range(1, 6)),
+    *((f"ask{n}", 17 + 2 * n, _to_float) for n in range(1, 6)),
+    *((f"ask{n}_volume", 18 + 2 * n, _to_float) for n in range(1, 6)),
+    ("ts", 30, _text),
+    ("pct_chg", 32, _to_float),
+    ("high", 33, _to_float),
+    ("low", 34, _to_float),
+    ("amount", 37, _wan),
+    ("turnover_rate", 38, _to_float),
+    ("pe_ttm", 39, _to_float),
+    ("float_mv", 44, _yi),
+    ("total_mv", 45, _yi),
+    ("pb", 46, _to_float),
+    ("limit_up", 47, _to_float),
+    ("limit_down", 48, _to_float),
+    ("volume_ratio", 49, _to_float),
+)
+TENCENT_COLUMNS = ("symbol", "name") + tuple(name for name, _, _ in _FIELDS)
+# Columns handed to the market snapshot; ladders and limits stay in the columnar view.
+_ITEM_COLUMNS = (
+    "symbol",
+    "name",
+    "last",
+    "pct_chg",
+    "amount",
+    "open",
+    "high",
+    "low",
+    "prev_close",
+    "volume",
+    "turnover_rate",
+    "volume_ratio",
+    "pe_ttm",
+    "pb",
+    "total_mv",
+    "float_mv",
+)
+_ITEM_IDX = tuple(TENCENT_COLUMNS.index(name) for name in _ITEM_COLUMNS)
+_LAST_IDX = TENCENT_COLUMNS.index("last")
+_PREV_IDX = TENCENT_COLUMNS.index("prev_close")
+_PCT_IDX = TENCENT_COLUMNS.index("pct_chg")
+
+TencentRecord = Tuple[Any, ...]
+
+_BASE_URL = "https://qt.gtimg.cn/q="
+
+
 def fetch_quotes(symbols: List[str], settings: Optional[Settings] = None) -> List[Dict[str, Any]]:
+    if not symbols:
+        return []
+    return _records_to_items(fetch_quote_records(symbols, settings))
+
+
+def fetch_quote_columns(symbols: List[str], settings: Optional[Settings] = None) -> Dict[str, List[Any]]:
+    return _records_to_columns(fetch_quote_records(symbols, settings))
+
+
+def fetch_quote_records(symbols: List[str], settings: Optional[Settings] = None) -> List[TencentRecord]:
     if not symbols:
         return []
     settings = settings or Settings()
+    return run_async(fetch_quote_records_async(symbols, settings))
+
+
+async def fetch_quote_records_async(symbols: List[str], settings: Settings) -> List[TencentRecord]:
     codes = [_to_tencent_code(sym) for sym in symbols]
-    results: List[Dict[str, Any]] = []
+    chunks = _chunks(codes, max(1, settings.tencent_chunk_size))
+    concurrency = max(1, settings.tencent_concurrency)
+    semaphore = asyncio.Semaphore(concurrency)
     proxy = _build_proxy(settings)
-    timeout = settings.tencent_timeout_sec
-    with httpx.Client(timeout=timeout, proxy=proxy) as client:
-        for chunk in _chunks(codes, 50):
-            url = "https://qt.gtimg.cn/q=" + ",".join(chunk)
-            results.extend(_fetch_chunk(client, url, settings))
-    return results
+
+    async def _fetch(client: httpx.AsyncClient, chunk: List[str]) -> List[TencentRecord]:
+        async with semaphore:
+            return await retry_async(
+                lambda: _fetch_chunk(client, _BASE_URL + ",".join(chunk)),
+                settings.tencent_retries,
+                settings.tencent_backoff_sec,
+            )
+
+    with track_source("tencent"):
+        async with build_async_client(proxy, settings.tencent_timeout_sec, concurrency) as client:
+            pages = await asyncio.gather(*(_fetch(client, chunk) for chunk in chunks))
+    return [record for page in pages for record in page]
+
+
+def parse_tencent_columns(text: str) -> Dict[str, List[Any]]:
+    return _records_to_columns(_parse_records(text))
 
 
 def _parse_response(text: str) -> List[Dict[str, Any]]:
-    items: List[Dict[str, Any]] = []
+    return _records_to_items(_parse_records(text))
+
+
+def _parse_records(text: str) -> List[TencentRecord]:
+    records: List[TencentRecord] = []
     for line in text.split(";"):
         line = line.strip()
         if not line or "=" not in line:
             continue
         _, raw = line.split("=", 1)
-        raw = raw.strip().strip('"')
-        parts = raw.split("~")
+        parts = raw.strip().strip('"').split("~")
         if len(parts) < 5:
             continue
-        name = parts[1]
-        code = parts[2]
-        last = _to_float(parts[3])
-        prev_close = _to_float(parts[4])
-        pct_chg = None
-        if last is not None and prev_close:
-            pct_chg = (last - prev_close) / prev_close * 100
-        items.append(
-            {
-                "symbol": code,
-                "name": name,
-                "last": last,
-                "pct_chg": pct_chg,
-                "amount": None,
-            }
-        )
-    return items
+        size = len(parts)
+        record = [parts[2], parts[1]]
+        record.extend(convert(parts[idx]) if idx < size else None for _, idx, convert in _FIELDS)
+        if record[_PCT_IDX] is None:
+            last, prev_close = record[_LAST_IDX], record[_PREV_IDX]
+            if last is not None and prev_close:
+                record[_PCT_IDX] = (last - prev_close) / prev_close * 100
+        records.append(tuple(record))
+    return records
+
+
+def _records_to_items(records: List[TencentRecord]) -> List[Dict[str, Any]]:
+    return [{name: record[idx] for name, idx in zip(_ITEM_COLUMNS, _ITEM_IDX)} for record in records]
+
+
+def _records_to_columns(records: List[TencentRecord]) -> Dict[str, List[Any]]:
+    if not records:
+        return {name: [] for name in TENCENT_COLUMNS}
+    return {name: list(values) for name, values in zip(TENCENT_COLUMNS, zip(*records))}
 
 
 def _to_tencent_code(symbol: str) -> str:
@@ -61,31 +171,14 @@ def _to_tencent_code(symbol: str) -> str:
     return f"sz{symbol}"
 
 
-def _to_float(value: str) -> Optional[float]:
-    try:
-        return float(value)
-    except Exception:
-        return None
-
-
 def _chunks(items: List[str], size: int) -> List[List[str]]:
     return [items[i : i + size] for i in range(0, len(items), size)]
 
 
-def _fetch_chunk(client: httpx.Client, url: str, settings: Settings) -> List[Dict[str, Any]]:
-    last_exc: Optional[Exception] = None
-    for idx in range(settings.tencent_retries):
-        try:
-            resp = client.get(url)
-            resp.raise_for_status()
-            return _parse_response(resp.text)
-        except Exception as exc:
-            last_exc = exc
-            if idx < settings.tencent_retries - 1:
-                time.sleep(settings.tencent_backoff_sec * (2 ** idx))
-    if last_exc:
-        raise last_exc
-    return []
+async def _fetch_chunk(client: httpx.AsyncClient, url: str) -> List[TencentRecord]:
+    resp = await client.get(url)
+    resp.raise_for_status()
+    return _parse_records(resp.text)
 
 
 def _build_proxy(settings: Settings) -> Optional[str]:
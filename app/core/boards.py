@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import re
+from typing import Dict, FrozenSet, Iterable, List
+
+SH_MAIN = "sh_main"
+SZ_MAIN = "sz_main"
+CHINEXT = "chinext"
+STAR = "star"
+BSE = "bse"
+OTHER = "other"
+BOARDS: FrozenSet[str] = frozenset({SH_MAIN, SZ_MAIN, CHINEXT, STAR, BSE, OTHER})
+
+# Daily price limits as a fraction of the previous close. ST only tightens main-board names;
+# ChiNext and STAR keep 20% for ST shares since the registration reform.
+LIMIT_RATIOS = {SH_MAIN: 0.10, SZ_MAIN: 0.10, CHINEXT: 0.20, STAR: 0.20, BSE: 0.30, OTHER: 0.10}
+ST_LIMIT_RATIO = 0.05
+
+# Prefixes are checked longest first; funds, bonds and indices fall through to OTHER.
+_PREFIXES = (
+    ("688", STAR),
+    ("689", STAR),
+    ("300", CHINEXT),
+    ("301", CHINEXT),
+    ("920", BSE),
+    ("600", SH_MAIN),
+    ("601", SH_MAIN),
+    ("603", SH_MAIN),
+    ("605", SH_MAIN),
+    ("000", SZ_MAIN),
+    ("001", SZ_MAIN),
+    ("002", SZ_MAIN),
+    ("003", SZ_MAIN),
+    ("43", BSE),
+    ("83", BSE),
+    ("87", BSE),
+    ("88", BSE),
+)
+
+
+# The risk marker leads the name: ST, *ST, and the pre-share-reform SST / S*ST. A Latin word
+# that merely starts with or contains "ST" is not a marker.
+_ST_PREFIX = re.compile(r"S?\*?ST(?![A-Z])")
+
+# Expanded to three-digit keys so a lookup is one dict hit instead of a prefix scan.
+_BY_PREFIX: Dict[str, str] = {}
+for _prefix, _board in _PREFIXES:
+    for _key in [_prefix] if len(_prefix) == 3 else [f"{_prefix}{digit}" for digit in range(10)]:
+        _BY_PREFIX.setdefault(_key, _board)
+
+
+def board_of(symbol: str) -> str:
+    return _BY_PREFIX.get(symbol[-6:][:3], OTHER)
+
+
+def boards_of(symbols: Iterable[str]) -> List[str]:
+    return [board_of(symbol) for symbol in symbols]
+
+
+def is_st(name: str) -> bool:
+    # Names may come in full-width or lower case from some feeds.
+    normalized = (name or "").strip().upper().replace("ＳＴ", "ST").replace("＊", "*")
+    return _ST_PREFIX.match(normalized) is not None
+
+
+def limit_ratio(symbol: str, name: str = "") -> float:
+    board = board_of(symbol)
+    if board in (SH_MAIN, SZ_MAIN) and is_st(name):
+        return ST_LIMIT_RATIO
+    return LIMIT_RATIOS[board]
+
+
+def limit_ratios(symbols: List[str], names: List[str]) -> List[float]:
+    return [limit_ratio(symbol, name) for symbol, name in zip(symbols, names)]
+
+
+def parse_boards(value: str) -> FrozenSet[str]:
+    boards = {item.strip().lower() for item in (value or "").split(",") if item.strip()}
+    unknown = boards - BOARDS
+    if unknown:
+        raise RuntimeError(f"board_unknown:{','.join(sorted(unknown))}")
+    return frozenset(boards)
@@ -16,7 +16,17 @@ class Settings(BaseSettings):
     data_dir: str = "data"
     db_path: str = "data/quanta_watcher.db"
 
-    poll_interval_sec: int = 60
+    poll_interval_sec: int = 5
+    market_scan_interval_sec: int = 300
+    priority_symbols: str = ""
+    intraday_trading_hours_only: bool = True
+    tick_store_enabled: bool = True
+    tick_store_dir: str = "data/ticks"
+    market_history_enabled: bool = True
+    market_history_dir: str = "data/market_history"
+    breadth_new_high_days: int = 20
+    breadth_turnover_top_n: int = 100
+    limit_events_enabled: bool = True
     morning_brief_hour: int = 8
     morning_brief_minute: int = 30
     morning_brief_refresh_hour: int = 8
@@ -32,7 +42,7 @@ class Settings(BaseSettings):
     morning_brief_data_path: str = "data/morning_brief_data.json"
     post_close_data_path: str = "data/post_close_report_data.json"
     watchlist_path: str = "data/watchlist.json"
-    watchlist_history_path: str = "data/watchlist_history.json"
+    watchlist_history_path: str = "data/watchlist_history.db"
     report_params_path: str = "data/report_params.json"
     morning_brief_top_n: int = 10
     enable_morning_brief_draft: bool = False
@@ -45,8 +55,17 @@ class Settings(BaseSettings):
     akshare_research_timeout_sec: float = 6.0
     akshare_spot_sources: str = "em,sina"
     market_snapshot_sources: str = "sina_market,cache,akshare,eastmoney_direct,tencent"
-    market_snapshot_cache_path: str = "data/market_snapshot_cache.json"
+    market_snapshot_cache_path: str = "data/market_snapshot_cache.bin"
     market_snapshot_cache_ttl_sec: int = 3600
+    market_snapshot_memory_ttl_sec: int = 60
+    ranking_exclude_st: bool = False
+    ranking_exclude_suspended: bool = False
+    ranking_exclude_boards: str = ""
+    market_snapshot_hedge_enabled: bool = False
+    market_snapshot_adaptive_order: bool = True
+    source_breaker_failures: int = 3
+    source_breaker_cooldown_sec: int = 300
+    market_snapshot_hedge_delay_sec: float = 3.0
     eastmoney_direct_enabled: bool = True
     eastmoney_hosts: str = (
         "https://82.push2.eastmoney.com,https://push2.eastmoney.com,"
@@ -56,6 +75,8 @@ class Settings(BaseSettings):
     eastmoney_page_size: int = 200
     eastmoney_max_pages: int = 50
     eastmoney_page_delay_sec: float = 0.2
+    eastmoney_concurrency: int = 4
+    eastmoney_page_requeue: int = 2
     eastmoney_user_agent: str = (
         "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
         "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
@@ -67,10 +88,15 @@ class Settings(BaseSettings):
     eastmoney_cookie_url: str = "https://quote.eastmoney.com/"
     eastmoney_cookie_path: str = "data/eastmoney_cookie.txt"
     eastmoney_cookie_ttl_sec: int = 21600
+    eastmoney_cookie_refresh_ratio: float = 0.8
     sina_market_url: str = (
         "http://vip.stock.finance.sina.com.cn/quotes_service/api/json_v2.php/"
         "Market_Center.getHQNodeData"
     )
+    sina_market_count_url: str = (
+        "http://vip.stock.finance.sina.com.cn/quotes_service/api/json_v2.php/"
+        "Market_Center.getHQNodeStockCount"
+    )
     sina_market_node: str = "hs_a"
     sina_market_page_size: int = 100
     sina_market_max_pages: int = 50
@@ -79,6 +105,7 @@ class Settings(BaseSettings):
     sina_market_retries: int = 3
     sina_market_backoff_sec: float = 0.5
     sina_market_concurrency: int = 5
+    sina_market_page_requeue: int = 2
     sina_market_min_rows: int = 3000
     sina_market_sort: str = "symbol"
     sina_market_asc: bool = True
@@ -89,6 +116,8 @@ class Settings(BaseSettings):
     tencent_timeout_sec: float = 8.0
     tencent_retries: int = 2
     tencent_backoff_sec: float = 0.5
+    tencent_chunk_size: int = 50
+    tencent_concurrency: int = 4
     disable_fallback: bool = False
     refresh_status_path: str = "data/morning_brief_refresh_status.json"
     post_close_refresh_status_path: str = "data/post_close_refresh_status.json"
@@ -97,7 +126,12 @@ class Settings(BaseSettings):
     watchlist_technicals_path: str = "data/watchlist_technicals.json"
     watchlist_refresh_path: str = "data/watchlist_refresh_status.json"
     research_enabled: bool = True
-    research_max_symbols: int = 8
+    research_max_symbols: int = 50
+    research_concurrency: int = 6
+    research_retries: int = 2
+    bar_store_enabled: bool = True
+    bar_store_dir: str = "data/bars"
+    research_rate_limits: str = "akshare_value=4,akshare_financial=2,akshare_hist=4,tencent_hist=4"
 
     disable_scheduler: bool = False
 
@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import json
+import math
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+from app.core.models import Event, Indicator, Snapshot
+from app.core.snapshot_frame import SnapshotFrame
+from app.core.snapshot_schema import SNAPSHOT_COLUMNS
+
+# Slot-only counterparts of the pydantic models for per-row hot paths. Timestamps stay as
+# epoch seconds and nothing is validated; convert with to_model() at the API boundary only.
+# Every schema column is a slot, so a snapshot row costs one fixed-size object and no dict.
+_BASE_FIELDS = ("symbol", "name", "last", "pct_chg", "volume", "amount")
+_EXTENDED_FIELDS = tuple(col for col in SNAPSHOT_COLUMNS if col not in _BASE_FIELDS)
+_NUMERIC_FIELDS = tuple(col for col in SNAPSHOT_COLUMNS if col not in {"symbol", "name"})
+
+
+class SnapshotRecord:
+    __slots__ = ("ts", "source") + SNAPSHOT_COLUMNS
+
+    # Positional order is (ts, source) + SNAPSHOT_COLUMNS; explicit assignments beat a setattr loop.
+    def __init__(
+        self,
+        ts: float,
+        source: str,
+        symbol: str,
+        name: str = "",
+        last: Optional[float] = None,
+        pct_chg: Optional[float] = None,
+        amount: Optional[float] = None,
+        open: Optional[float] = None,
+        high: Optional[float] = None,
+        low: Optional[float] = None,
+        prev_close: Optional[float] = None,
+        volume: Optional[float] = None,
+        turnover_rate: Optional[float] = None,
+        volume_ratio: Optional[float] = None,
+        pe_ttm: Optional[float] = None,
+        pb: Optional[float] = None,
+        total_mv: Optional[float] = None,
+        float_mv: Optional[float] = None,
+        main_net_inflow: Optional[float] = None,
+    ) -> None:
+        self.ts = ts
+        self.source = source
+        self.symbol = symbol
+        self.name = name
+        self.last = last
+        self.pct_chg = pct_chg
+        self.amount = amount
+        self.open = open
+        self.high = high
+        self.low = low
+        self.prev_close = prev_close
+        self.volume = volume
+        self.turnover_rate = turnover_rate
+        self.volume_ratio = volume_ratio
+        self.pe_ttm = pe_ttm
+        self.pb = pb
+        self.total_mv = total_mv
+        self.float_mv = float_mv
+        self.main_net_inflow = main_net_inflow
+
+    @classmethod
+    def from_item(cls, item: Mapping[str, Any], ts: float, source: str = "") -> "SnapshotRecord":
+        return cls(ts, source, item["symbol"], item.get("name") or "", *map(item.get, _NUMERIC_FIELDS))
+
+    def to_dict(self) -> Dict[str, Any]:
+        row = {col: getattr(self, col) for col in _BASE_FIELDS}
+        for col in _EXTENDED_FIELDS:
+            value = getattr(self, col)
+            if value is not None:
+                row[col] = value
+        row["source"] = self.source
+        row["updated_at"] = self.ts
+        return row
+
+    def to_model(self) -> Snapshot:
+        extra = {col: getattr(self, col) for col in _EXTENDED_FIELDS if getattr(self, col) is not None}
+        return Snapshot(
+            ts=_to_datetime(self.ts),
+            symbol=self.symbol,
+            last=_float(self.last),
+            pct_chg=_float(self.pct_chg),
+            volume=_float(self.volume),
+            amount=_float(self.amount),
+            extra={"name": self.name, "source": self.source, **extra},
+        )
+
+
+class IndicatorRecord:
+    __slots__ = ("ts", "entity_type", "entity_id", "key", "value", "window")
+
+    def __init__(
+        self,
+        ts: float,
+        entity_type: str,
+        entity_id: str,
+        key: str,
+        value: float,
+        window: Optional[str] = None,
+    ) -> None:
+        self.ts = ts
+        self.entity_type = entity_type
+        self.entity_id = entity_id
+        self.key = key
+        self.value = value
+        self.window = window
+
+    def to_model(self) -> Indicator:
+        return Indicator(
+            ts=_to_datetime(self.ts),
+            entity_type=self.entity_type,
+            entity_id=self.entity_id,
+            key=self.key,
+            value=self.value,
+            window=self.window,
+        )
+
+
+class EventRecord:
+    __slots__ = ("ts", "event_type", "entity_type", "entity_id", "score", "message", "payload", "dedup_key")
+
+    def __init__(
+        self,
+        ts: float,
+        event_type: str,
+        entity_type: str,
+        entity_id: str,
+        message: str,
+        dedup_key: str,
+        score: Optional[float] = None,
+        payload: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        self.ts = ts
+        self.event_type = event_type
+        self.entity_type = entity_type
+        self.entity_id = entity_id
+        self.message = message
+        self.dedup_key = dedup_key
+        self.score = score
+        self.payload = payload
+
+    def to_row(self) -> Tuple[Any, ...]:
+        # Column order of the events table in app/storage/sqlite.py.
+        return (
+            _to_datetime(self.ts).isoformat(),
+            self.event_type,
+            self.entity_type,
+            self.entity_id,
+            self.score,
+            self.message,
+            json.dumps(self.payload or {}, ensure_ascii=False),
+            self.dedup_key,
+        )
+
+    def to_model(self) -> Event:
+        return Event(
+            ts=_to_datetime(self.ts),
+            event_type=self.event_type,
+            entity_type=self.entity_type,
+            entity_id=self.entity_id,
+            score=self.score,
+            message=self.message,
+            payload=self.payload or {},
+            dedup_key=self.dedup_key,
+        )
+
+
+def snapshot_records(items: Any, ts: float, source: str = "") -> List[SnapshotRecord]:
+    if not isinstance(items, SnapshotFrame):
+        return [SnapshotRecord.from_item(item, ts, source) for item in items if item.get("symbol")]
+    # Frames go column-wise straight into records, skipping the per-row dict of to_items().
+    columns = [_column_values(items, col) for col in _NUMERIC_FIELDS]
+    return [
+        SnapshotRecord(ts, source, symbol, name, *values)
+        for symbol, name, *values in zip(items.symbols, items.names, *columns)
+    ]
+
+
+def _column_values(frame: SnapshotFrame, name: str) -> List[Optional[float]]:
+    column = frame.columns.get(name)
+    if column is None:
+        return [None] * len(frame)
+    values = column.astype(object)
+    values[np.isnan(column)] = None
+    return values.tolist()
+
+
+def _to_datetime(ts: float) -> datetime:
+    return datetime.fromtimestamp(ts, timezone.utc)
+
+
+def _float(value: Optional[float]) -> float:
+    return math.nan if value is None else float(value)
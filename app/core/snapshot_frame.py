@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+from app.core.snapshot_schema import BASE_COLUMNS, SNAPSHOT_COLUMNS
+
+_NUMERIC = tuple(col for col in SNAPSHOT_COLUMNS if col not in {"symbol", "name"})
+_BASE_NUMERIC = tuple(col for col in BASE_COLUMNS if col in _NUMERIC)
+
+
+class SnapshotFrame:
+    # Column-per-field snapshot: symbols/names as lists, numbers as float64 arrays (NaN = missing).
+    __slots__ = ("symbols", "names", "columns", "_index")
+
+    def __init__(self, symbols: List[str], names: List[str], columns: Mapping[str, np.ndarray]) -> None:
+        self.symbols = symbols
+        self.names = names
+        self.columns: Dict[str, np.ndarray] = dict(columns)
+        self._index: Optional[Dict[str, int]] = None
+
+    @classmethod
+    def empty(cls) -> "SnapshotFrame":
+        return cls([], [], {})
+
+    @classmethod
+    def from_items(cls, items: Iterable[Mapping[str, Any]]) -> "SnapshotFrame":
+        rows = [item for item in items if item.get("symbol")]
+        present = [col for col in _NUMERIC if col in _BASE_NUMERIC or any(row.get(col) is not None for row in rows)]
+        columns = {col: _to_array((row.get(col) for row in rows), len(rows)) for col in present}
+        return cls([str(row["symbol"]) for row in rows], [row.get("name") or "" for row in rows], columns)
+
+    @classmethod
+    def from_records(cls, fields: Sequence[str], records: Sequence[Sequence[Any]]) -> "SnapshotFrame":
+        # Tuples straight from a parser; numbers are already float or None.
+        records = [record for record in records if record[0]]
+        if not records:
+            return cls.empty()
+        values = dict(zip(fields, zip(*records)))
+        # numpy maps None to NaN when building a float array, so no per-value conversion.
+        columns = {col: np.array(values[col], dtype=np.float64) for col in fields if col in _NUMERIC}
+        names = list(values["name"]) if "name" in values else [""] * len(records)
+        return cls(list(values["symbol"]), names, columns)
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return iter(self.to_items())
+
+    def __getitem__(self, position: int) -> Dict[str, Any]:
+        return self._row(range(len(self))[position])
+
+    def column(self, name: str) -> np.ndarray:
+        column = self.columns.get(name)
+        return column if column is not None else np.full(len(self), np.nan)
+
+    def index_of(self, symbol: str) -> Optional[int]:
+        if self._index is None:
+            self._index = {symbol: idx for idx, symbol in enumerate(self.symbols)}
+        return self._index.get(symbol)
+
+    def get(self, symbol: str) -> Optional[Dict[str, Any]]:
+        position = self.index_of(symbol)
+        return None if position is None else self._row(position)
+
+    def select(self, symbols: Iterable[str]) -> "SnapshotFrame":
+        positions = [pos for pos in (self.index_of(symbol) for symbol in symbols) if pos is not None]
+        return self.take(np.asarray(positions, dtype=np.intp))
+
+    def head(self, count: int) -> "SnapshotFrame":
+        return self.take(np.arange(min(count, len(self)), dtype=np.intp))
+
+    def take(self, positions: np.ndarray) -> "SnapshotFrame":
+        idx = positions.tolist()
+        return SnapshotFrame(
+            [self.symbols[pos] for pos in idx],
+            [self.names[pos] for pos in idx],
+            {col: values[positions] for col, values in self.columns.items()},
+        )
+
+    def to_items(self) -> List[Dict[str, Any]]:
+        keys = ["symbol", "name", *self.columns]
+        values: List[List[Any]] = [self.symbols, self.names]
+        for column in self.columns.values():
+            objects = column.astype(object)
+            objects[np.isnan(column)] = None
+            values.append(objects.tolist())
+        return [dict(zip(keys, row)) for row in zip(*values)]
+
+    def _row(self, position: int) -> Dict[str, Any]:
+        row: Dict[str, Any] = {"symbol": self.symbols[position], "name": self.names[position]}
+        for col, values in self.columns.items():
+            value = float(values[position])
+            row[col] = None if value != value else value
+        return row
+
+
+def as_frame(items: Any) -> SnapshotFrame:
+    return items if isinstance(items, SnapshotFrame) else SnapshotFrame.from_items(items or [])
+
+
+def _to_array(values: Iterable[Any], count: int) -> np.ndarray:
+    return np.fromiter((_num(value) for value in values), dtype=np.float64, count=count)
+
+
+def _num(value: Any) -> float:
+    try:
+        return float(value) if value is not None else np.nan
+    except (TypeError, ValueError):
+        return np.nan
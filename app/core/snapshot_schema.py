@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+BASE_COLUMNS = ("symbol", "name", "last", "pct_chg", "amount")
+# Units follow Eastmoney: volume in lots (手), turnover_rate in %, money fields in CNY.
+EXTENDED_COLUMNS = (
+    "open",
+    "high",
+    "low",
+    "prev_close",
+    "volume",
+    "turnover_rate",
+    "volume_ratio",
+    "pe_ttm",
+    "pb",
+    "total_mv",
+    "float_mv",
+    "main_net_inflow",
+)
+SNAPSHOT_COLUMNS = BASE_COLUMNS + EXTENDED_COLUMNS
+
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from app.core.snapshot_frame import SnapshotFrame
+from app.indicators.limits import limit_flags
+from app.storage.history_store import PriceMatrix
+from app.storage.market_history import MarketHistory
+
+# pct_chg bucket edges; the outer buckets are open-ended.
+HISTOGRAM_EDGES = (-7.0, -5.0, -3.0, -1.0, 1.0, 3.0, 5.0, 7.0)
+
+
+def compute_breadth(frame: SnapshotFrame, prior: Optional[PriceMatrix] = None, top_n: int = 100) -> Dict[str, Any]:
+    pct = frame.column("pct_chg")
+    last = frame.column("last")
+    amount = frame.column("amount")
+    traded = ~np.isnan(pct) & ~np.isnan(last) & (last > 0)
+    moves = pct[traded]
+    advancers = int(np.count_nonzero(moves > 0))
+    decliners = int(np.count_nonzero(moves < 0))
+    at_up, at_down = limit_flags(frame)
+    counts = np.bincount(np.searchsorted(HISTOGRAM_EDGES, moves, side="right"), minlength=len(HISTOGRAM_EDGES) + 1)
+    result: Dict[str, Any] = {
+        "total": int(moves.size),
+        "advancers": advancers,
+        "decliners": decliners,
+        "unchanged": int(moves.size) - advancers - decliners,
+        "advance_decline_ratio": round(advancers / decliners, 2) if decliners else None,
+        "limit_up": int(np.count_nonzero(at_up & traded)),
+        "limit_down": int(np.count_nonzero(at_down & traded)),
+        "pct_histogram": [{"bucket": label, "count": int(count)} for label, count in zip(_bucket_labels(), counts)],
+        "turnover_top_n": top_n,
+        "turnover_top_share": _top_share(amount, top_n),
+        "new_high_low_days": None,
+        "new_highs": None,
+        "new_lows": None,
+    }
+    if prior is not None and prior.prices.shape[0] > 0:
+        days = prior.prices.shape[0]
+        # Only names with a close on every prior day count; new listings and long halts are left out.
+        full = ~np.isnan(prior.prices).any(axis=0) & traded
+        with np.errstate(invalid="ignore"):
+            highs = last > prior.prices.max(axis=0)
+            lows = last < prior.prices.min(axis=0)
+        result.update(
+            new_high_low_days=days,
+            new_highs=int(np.count_nonzero(highs & full)),
+            new_lows=int(np.count_nonzero(lows & full)),
+        )
+    return result
+
+
+def prior_closes(history: MarketHistory, symbols: List[str], days: int, today: str) -> Optional[PriceMatrix]:
+    # Closes for the `days` sessions before `today`, columns aligned with `symbols`.
+    matrix = history.price_matrix(days + 1, symbols)
+    keep = [idx for idx, date_key in enumerate(matrix.dates) if date_key < today][-days:]
+    if len(keep) < days:
+        return None
+    return PriceMatrix([matrix.dates[idx] for idx in keep], matrix.symbols, matrix.names, matrix.prices[keep])
+
+
+def breadth_lines(breadth: Dict[str, Any]) -> List[str]:
+    if not breadth or not breadth.get("total"):
+        return []
+    ratio = breadth.get("advance_decline_ratio")
+    lines = [
+        f"上涨 {breadth['advancers']} / 下跌 {breadth['decliners']} / 平盘 {breadth['unchanged']}"
+        + (f"（涨跌比 {ratio:.2f}）" if ratio is not None else ""),
+        f"涨停 {breadth['limit_up']} / 跌停 {breadth['limit_down']}",
+        f"成交额前 {breadth['turnover_top_n']} 占比 {breadth['turnover_top_share']:.1%}",
+    ]
+    if breadth.get("new_highs") is not None:
+        days = breadth["new_high_low_days"]
+        lines.append(f"{days} 日新高 {breadth['new_highs']} / {days} 日新低 {breadth['new_lows']}")
+    histogram = breadth.get("pct_histogram") or []
+    if histogram:
+        lines.append("涨跌分布：" + "，".join(f"{item['bucket']} {item['count']}" for item in histogram))
+    return lines
+
+
+def _top_share(amount: np.ndarray, top_n: int) -> float:
+    values = amount[~np.isnan(amount) & (amount > 0)]
+    total = float(values.sum())
+    if total <= 0 or top_n <= 0:
+        return 0.0
+    if values.size > top_n:
+        values = np.partition(values, values.size - top_n)[-top_n:]
+    return round(float(values.sum()) / total, 4)
+
+
+def _bucket_labels() -> List[str]:
+    edges = HISTOGRAM_EDGES
+    labels = [f"<{edges[0]:g}%"]
+    labels += [f"{low:g}~{high:g}%" for low, high in zip(edges, edges[1:])]
+    labels.append(f">={edges[-1]:g}%")
+    return labels
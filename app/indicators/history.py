@@ -1,62 +1,64 @@
 from __future__ import annotations
 
-import json
+import math
 from datetime import datetime
-from pathlib import Path
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, List
+
+from app.indicators.momentum import compute_momentum
+from app.storage.history_store import HistoryStore, get_history_store
+from app.storage.market_history import MarketHistory
+
+
+def update_history(path: str, date_key: str, items: List[Dict[str, Any]]) -> HistoryStore:
+    store = get_history_store(path)
+    store.write_day(
+        date_key,
+        (
+            (
+                item.get("symbol"),
+                item.get("name"),
+                _safe_num(item.get("last")),
+                _safe_num(item.get("pct_chg")),
+                _safe_num(item.get("amount")),
+            )
+            for item in items
+            if item.get("symbol")
+        ),
+    )
+    return store
+
+
+def backfill_history(history: HistoryStore, market: MarketHistory, symbols: List[str]) -> int:
+    # Symbols added to the watchlist after the fact pick up their past from the market capture.
+    counts = history.day_counts(symbols)
+    missing = [symbol for symbol in symbols if counts.get(symbol, 0) <= 1]
+    days = len(market.days())
+    if not missing or not days:
+        return 0
+    columns = {field: market.price_matrix(days, missing, field) for field in ("last", "pct_chg", "amount")}
+    dates = columns["last"].dates
+    rows = [
+        (
+            date_key,
+            symbol,
+            None,
+            _nan_to_none(columns["last"].prices[day, col]),
+            _nan_to_none(columns["pct_chg"].prices[day, col]),
+            _nan_to_none(columns["amount"].prices[day, col]),
+        )
+        for day, date_key in enumerate(dates)
+        for col, symbol in enumerate(missing)
+        if not math.isnan(columns["last"].prices[day, col])
+    ]
+    return history.add_rows(rows)
 
 
-def load_history(path: str) -> Dict[str, Any]:
-    file_path = Path(path)
-    if not file_path.exists():
-        return {"dates": {}}
-    try:
-        payload = json.loads(file_path.read_text(encoding="utf-8"))
-    except Exception:
-        return {"dates": {}}
-    if not isinstance(payload, dict):
-        return {"dates": {}}
-    payload.setdefault("dates", {})
-    return payload
-
-
-def save_history(path: str, payload: Dict[str, Any]) -> None:
-    file_path = Path(path)
-    file_path.parent.mkdir(parents=True, exist_ok=True)
-    file_path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
-
-
-def update_history(path: str, date_key: str, items: List[Dict[str, Any]]) -> Dict[str, Any]:
-    payload = load_history(path)
-    dates = payload.setdefault("dates", {})
-    if not isinstance(dates, dict):
-        dates = {}
-        payload["dates"] = dates
-    dates[date_key] = {
-        item.get("symbol"): {
-            "symbol": item.get("symbol"),
-            "name": item.get("name"),
-            "last": _safe_num(item.get("last")),
-            "pct_chg": _safe_num(item.get("pct_chg")),
-            "amount": _safe_num(item.get("amount")),
-        }
-        for item in items
-        if item.get("symbol")
-    }
-    save_history(path, payload)
-    return payload
-
-
-def list_dates(payload: Dict[str, Any]) -> List[str]:
-    dates = payload.get("dates", {})
-    if not isinstance(dates, dict):
-        return []
-    return sorted(dates.keys())
-
-
-def get_latest_date(payload: Dict[str, Any]) -> str:
-    dates = list_dates(payload)
-    return dates[-1] if dates else ""
+def list_dates(history: HistoryStore) -> List[str]:
+    return history.list_dates()
+
+
+def get_latest_date(history: HistoryStore) -> str:
+    return history.latest_date()
 
 
 def normalize_date(value: str | None) -> str:
@@ -65,6 +67,10 @@ def normalize_date(value: str | None) -> str:
     return datetime.now().strftime("%Y-%m-%d")
 
 
+def _nan_to_none(value: float) -> float | None:
+    return None if math.isnan(value) else float(value)
+
+
 def _safe_num(value: Any) -> float | None:
     if value is None:
         return None
@@ -75,34 +81,7 @@ def _safe_num(value: Any) -> float | None:
 
 
 def get_momentum(
-    payload: Dict[str, Any],
+    history: HistoryStore,
     days: int,
 ) -> List[Dict[str, Any]]:
-    dates = list_dates(payload)
-    if len(dates) <= days:
-        return []
-    latest_key = dates[-1]
-    prev_key = dates[-(days + 1)]
-    latest = payload["dates"].get(latest_key, {})
-    prev = payload["dates"].get(prev_key, {})
-    results: List[Dict[str, Any]] = []
-    for symbol, latest_row in latest.items():
-        prev_row = prev.get(symbol)
-        if not prev_row:
-            continue
-        latest_price = latest_row.get("last")
-        prev_price = prev_row.get("last")
-        if latest_price is None or prev_price in (None, 0):
-            continue
-        momentum = (latest_price / prev_price - 1) * 100
-        results.append(
-            {
-                "symbol": symbol,
-                "name": latest_row.get("name") or "",
-                "momentum": round(momentum, 2),
-                "from": prev_key,
-                "to": latest_key,
-            }
-        )
-    results.sort(key=lambda item: item.get("momentum", -9999), reverse=True)
-    return results
+    return compute_momentum(history.price_matrix(days + 1), [days], None)[f"{days}d"]
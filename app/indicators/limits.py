@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+import numpy as np
+
+from app.core.boards import limit_ratios
+from app.core.records import EventRecord
+from app.core.snapshot_frame import SnapshotFrame, as_frame
+
+# Exchanges round limit prices half-up to the cent; _EPS only absorbs float error
+# (e.g. 10.05 * 1.1 landing on 11.05499...), never a whole tick.
+_CENT = 100.0
+_EPS = 1e-6
+
+# Per-symbol limit state; the sign is the side. "Opened" means the limit was touched
+# (last or intraday high/low) but the last print is off it.
+NONE = 0
+SEALED_UP = 1
+OPENED_UP = 2
+SEALED_DOWN = -1
+OPENED_DOWN = -2
+STATE_NAMES = {NONE: "none", SEALED_UP: "sealed_up", OPENED_UP: "opened_up", SEALED_DOWN: "sealed_down", OPENED_DOWN: "opened_down"}
+
+# Transitions into these states are the ones worth an event.
+_EVENTS = {
+    SEALED_UP: ("limit_up_sealed", "涨停封板"),
+    OPENED_UP: ("limit_up_broken", "涨停打开"),
+    SEALED_DOWN: ("limit_down_sealed", "跌停封板"),
+    OPENED_DOWN: ("limit_down_broken", "跌停打开"),
+}
+
+
+class LimitScan(NamedTuple):
+    prev_close: np.ndarray
+    limit_up: np.ndarray
+    limit_down: np.ndarray
+    touched_up: np.ndarray
+    sealed_up: np.ndarray
+    touched_down: np.ndarray
+    sealed_down: np.ndarray
+
+    def states(self) -> np.ndarray:
+        states = np.zeros(self.prev_close.size, dtype=np.int8)
+        states[self.touched_down] = OPENED_DOWN
+        states[self.sealed_down] = SEALED_DOWN
+        states[self.touched_up] = OPENED_UP
+        states[self.sealed_up] = SEALED_UP
+        return states
+
+
+def limit_prices(frame: SnapshotFrame) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # Returns (prev_close, limit_up, limit_down); NaN where the previous close cannot be known.
+    ratios = np.array(limit_ratios(frame.symbols, frame.names), dtype=np.float64)
+    prev_close = _prev_close(frame)
+    return prev_close, _round_cent(prev_close * (1 + ratios)), _round_cent(prev_close * (1 - ratios))
+
+
+def scan_limits(frame: SnapshotFrame) -> LimitScan:
+    last = frame.column("last")
+    prev_close, up, down = limit_prices(frame)
+    # Without an intraday high/low (Sina) only the last print can show a touch.
+    high = np.fmax(frame.column("high"), last)
+    low = np.fmin(frame.column("low"), last)
+    with np.errstate(invalid="ignore"):
+        sealed_up = last >= up - _EPS
+        sealed_down = last <= down + _EPS
+        touched_up = high >= up - _EPS
+        touched_down = low <= down + _EPS
+    return LimitScan(prev_close, up, down, touched_up, sealed_up, touched_down, sealed_down)
+
+
+def limit_flags(frame: SnapshotFrame) -> Tuple[np.ndarray, np.ndarray]:
+    scan = scan_limits(frame)
+    return scan.sealed_up, scan.sealed_down
+
+
+class LimitTracker:
+    # Keeps the last limit state per symbol for the current trading day, so each poll only
+    # diffs the new snapshot against it; no tick history is rescanned.
+    def __init__(self, timezone: str) -> None:
+        self._tz = ZoneInfo(timezone)
+        self._lock = threading.Lock()
+        self._day = ""
+        self._states: Dict[str, int] = {}
+        self._ts: Dict[str, float] = {}
+        self._rows: Dict[str, Dict[str, Any]] = {}
+
+    def update(self, items: Any, ts: float) -> List[EventRecord]:
+        frame = as_frame(items)
+        if not len(frame):
+            return []
+        scan = scan_limits(frame)
+        states = scan.states()
+        day = datetime.fromtimestamp(ts, self._tz).strftime("%Y-%m-%d")
+        events: List[EventRecord] = []
+        with self._lock:
+            if day != self._day:
+                self._day = day
+                self._states.clear()
+                self._ts.clear()
+                self._rows.clear()
+            previous = np.fromiter((self._states.get(s, NONE) for s in frame.symbols), dtype=np.int8, count=len(frame))
+            # Rows older than what we already hold (a slow scan behind a fast poll) are ignored.
+            fresh = np.fromiter((self._ts.get(s, -1.0) <= ts for s in frame.symbols), dtype=bool, count=len(frame))
+            changed = np.flatnonzero(fresh & (states != previous))
+            for pos in np.flatnonzero(fresh).tolist():
+                self._ts[frame.symbols[pos]] = ts
+            for pos in changed.tolist():
+                symbol = frame.symbols[pos]
+                state = int(states[pos])
+                self._states[symbol] = state
+                if state == NONE:
+                    self._rows.pop(symbol, None)
+                    continue
+                row = _limit_row(frame, scan, pos, state)
+                self._rows[symbol] = row
+                event_type, label = _EVENTS[state]
+                events.append(
+                    EventRecord(
+                        ts,
+                        event_type,
+                        "symbol",
+                        symbol,
+                        " ".join(part for part in (symbol, row["name"], label, f"{row['limit_price']:.2f}") if part),
+                        f"{event_type}:{symbol}:{int(ts)}",
+                        score=row["pct_chg"],
+                        payload=row,
+                    )
+                )
+        return events
+
+    def current(self) -> Dict[str, List[Dict[str, Any]]]:
+        with self._lock:
+            grouped: Dict[str, List[Dict[str, Any]]] = {STATE_NAMES[state]: [] for state in _EVENTS}
+            for symbol, row in self._rows.items():
+                grouped[STATE_NAMES[self._states[symbol]]].append(dict(row))
+            return {"date": self._day, **grouped}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._day = ""
+            self._states.clear()
+            self._ts.clear()
+            self._rows.clear()
+
+
+def _limit_row(frame: SnapshotFrame, scan: LimitScan, pos: int, state: int) -> Dict[str, Any]:
+    limit = scan.limit_up[pos] if state > 0 else scan.limit_down[pos]
+    return {
+        "symbol": frame.symbols[pos],
+        "name": frame.names[pos],
+        "state": STATE_NAMES[state],
+        "last": _num(frame.column("last")[pos]),
+        "pct_chg": _num(frame.column("pct_chg")[pos]),
+        "prev_close": _num(scan.prev_close[pos]),
+        "limit_price": float(limit),
+    }
+
+
+def _num(value: float) -> Optional[float]:
+    value = float(value)
+    return None if value != value else round(value, 4)
+
+
+def _prev_close(frame: SnapshotFrame) -> np.ndarray:
+    prev_close = frame.column("prev_close").copy()
+    missing = np.isnan(prev_close) | (prev_close <= 0)
+    if missing.any():
+        # Feeds without prev_close (Sina) still carry last and pct_chg; a real close is
+        # always a whole cent, so snapping the derived value recovers it exactly.
+        derived = _round_cent(frame.column("last") / (1 + frame.column("pct_chg") / 100))
+        prev_close[missing] = derived[missing]
+    prev_close[prev_close <= 0] = np.nan
+    return prev_close
+
+
+def _round_cent(values: np.ndarray) -> np.ndarray:
+    return np.floor(values * _CENT + 0.5 + _EPS) / _CENT
+
+
+_TRACKER: Optional[LimitTracker] = None
+_TRACKER_LOCK = threading.Lock()
+
+
+def get_limit_tracker(timezone: str) -> LimitTracker:
+    global _TRACKER
+    with _TRACKER_LOCK:
+        if _TRACKER is None:
+            _TRACKER = LimitTracker(timezone)
+        return _TRACKER
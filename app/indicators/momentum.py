@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from app.indicators.ranking import top_bottom_indices
+from app.storage.history_store import PriceMatrix
+
+
+def momentum_returns(prices: np.ndarray, windows: List[int]) -> np.ndarray:
+    # One pass for every window: row k holds latest / price[-(w_k + 1)] - 1 in percent, NaN where undefined.
+    days, symbols = prices.shape
+    out = np.full((len(windows), symbols), np.nan)
+    valid = [idx for idx, window in enumerate(windows) if 0 < window < days]
+    if not valid or symbols == 0:
+        return out
+    latest = prices[-1]
+    base = prices[[-(windows[idx] + 1) for idx in valid]]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ret = (latest / base - 1.0) * 100.0
+    ret[~np.isfinite(ret)] = np.nan
+    out[valid] = ret
+    return out
+
+
+def top_indices(values: np.ndarray, top_n: Optional[int]) -> np.ndarray:
+    candidates = np.flatnonzero(~np.isnan(values))
+    k = candidates.size if top_n is None else top_n
+    top, _ = top_bottom_indices(values[candidates], k)
+    return candidates[top]
+
+
+def compute_momentum(matrix: PriceMatrix, windows: List[int], top_n: Optional[int]) -> Dict[str, List[Dict[str, Any]]]:
+    returns = momentum_returns(matrix.prices, windows)
+    results: Dict[str, List[Dict[str, Any]]] = {}
+    for row, window in enumerate(windows):
+        if not 0 < window < len(matrix.dates):
+            results[f"{window}d"] = []
+            continue
+        picks = top_indices(returns[row], top_n)
+        values = np.round(returns[row][picks], 2).tolist()
+        from_key = matrix.dates[-(window + 1)]
+        to_key = matrix.dates[-1]
+        results[f"{window}d"] = [
+            {
+                "symbol": matrix.symbols[col],
+                "name": matrix.names[col],
+                "momentum": value,
+                "from": from_key,
+                "to": to_key,
+            }
+            for col, value in zip(picks.tolist(), values)
+        ]
+    return results
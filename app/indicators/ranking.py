@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+from typing import Any, Dict, FrozenSet, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.boards import boards_of, is_st, parse_boards
+from app.core.config import Settings
+from app.core.snapshot_frame import SnapshotFrame, as_frame
+
+
+class RankSpec(NamedTuple):
+    name: str
+    column: str
+    ascending: bool = False
+
+
+class RankFilter(NamedTuple):
+    exclude_st: bool = False
+    exclude_suspended: bool = False
+    exclude_boards: FrozenSet[str] = frozenset()
+
+
+GAINERS = RankSpec("top_gainers", "pct_chg")
+LOSERS = RankSpec("top_losers", "pct_chg", ascending=True)
+TURNOVER = RankSpec("top_turnover", "amount")
+NO_FILTER = RankFilter()
+
+
+def ranking_filter(settings: Settings) -> RankFilter:
+    return RankFilter(
+        exclude_st=settings.ranking_exclude_st,
+        exclude_suspended=settings.ranking_exclude_suspended,
+        exclude_boards=parse_boards(settings.ranking_exclude_boards),
+    )
+
+
+def filter_mask(frame: SnapshotFrame, rank_filter: RankFilter) -> np.ndarray:
+    keep = np.ones(len(frame), dtype=bool)
+    if rank_filter.exclude_st:
+        keep &= ~np.fromiter((is_st(name) for name in frame.names), dtype=bool, count=len(frame))
+    if rank_filter.exclude_suspended:
+        last = frame.column("last")
+        amount = frame.column("amount")
+        # A halted name prints no trade: zero turnover or no usable last price.
+        keep &= ~((amount <= 0) | np.isnan(last) | (last <= 0))
+    if rank_filter.exclude_boards:
+        boards = np.array(boards_of(frame.symbols), dtype=object)
+        keep &= ~np.isin(boards, list(rank_filter.exclude_boards))
+    return keep
+
+
+def rank_frame(
+    frame: SnapshotFrame,
+    specs: Sequence[RankSpec],
+    k: int,
+    rank_filter: Optional[RankFilter] = None,
+) -> Dict[str, SnapshotFrame]:
+    rank_filter = rank_filter or NO_FILTER
+    eligible = filter_mask(frame, rank_filter) if rank_filter != NO_FILTER else None
+    by_column: Dict[str, List[RankSpec]] = {}
+    for spec in specs:
+        by_column.setdefault(spec.column, []).append(spec)
+    results: Dict[str, SnapshotFrame] = {}
+    for column, column_specs in by_column.items():
+        values = frame.column(column)
+        valid = ~np.isnan(values)
+        if eligible is not None:
+            valid &= eligible
+        candidates = np.flatnonzero(valid)
+        top, bottom = top_bottom_indices(values[candidates], k)
+        for spec in column_specs:
+            results[spec.name] = frame.take(candidates[bottom if spec.ascending else top])
+    return results
+
+
+def rank_items(
+    items: Any,
+    specs: Sequence[RankSpec],
+    k: int,
+    rank_filter: Optional[RankFilter] = None,
+) -> Dict[str, List[Dict[str, Any]]]:
+    return {name: ranked.to_items() for name, ranked in rank_frame(as_frame(items), specs, k, rank_filter).items()}
+
+
+def top_bottom_indices(values: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    # One partition puts the k smallest in front and the k largest at the back; only those get sorted.
+    n = values.size
+    k = max(0, min(k, n))
+    if k == 0:
+        empty = np.empty(0, dtype=np.intp)
+        return empty, empty
+    if 2 * k < n:
+        part = np.argpartition(values, [k - 1, n - k])
+        low = _with_ties(values, values[part[k - 1]], k, ascending=True)
+        high = _with_ties(values, values[part[n - k]], k, ascending=False)
+    else:
+        low = high = np.arange(n)
+    # Ties keep input order, matching a stable sort.
+    bottom = low[np.lexsort((low, values[low]))][:k]
+    top = high[np.lexsort((high, -values[high]))][:k]
+    return top, bottom
+
+
+def _with_ties(values: np.ndarray, bound: float, k: int, ascending: bool) -> np.ndarray:
+    # Partition picks arbitrary members of a tie at the boundary; take the earliest ones instead.
+    inside = np.flatnonzero(values < bound if ascending else values > bound)
+    ties = np.flatnonzero(values == bound)[: k - inside.size]
+    return np.concatenate((inside, ties))
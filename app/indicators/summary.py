@@ -1,28 +1,30 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
-from app.indicators.history import get_momentum
+from app.indicators.momentum import compute_momentum
+from app.indicators.ranking import GAINERS, LOSERS, TURNOVER, rank_items
+from app.storage.history_store import HistoryStore
 
 
-def compute_rankings(watchlist: List[Dict[str, Any]], top_n: int) -> Dict[str, List[Dict[str, Any]]]:
-    top_gainers = _top_by_key(watchlist, "pct_chg", top_n, reverse=True)
-    top_losers = _top_by_key(watchlist, "pct_chg", top_n, reverse=False)
-    top_turnover = _top_by_key(watchlist, "amount", top_n, reverse=True)
-    return {
-        "top_gainers": top_gainers,
-        "top_losers": top_losers,
-        "top_turnover": top_turnover,
-    }
+def compute_rankings(watchlist: Any, top_n: int) -> Dict[str, List[Dict[str, Any]]]:
+    return rank_items(watchlist, (GAINERS, LOSERS, TURNOVER), top_n)
 
 
-def compute_risk_notes(watchlist: List[Dict[str, Any]]) -> List[str]:
+# Market-wide thresholds for the breadth-based risk notes.
+BREADTH_DECLINE_SHARE = 0.6
+BREADTH_LIMIT_DOWN_MIN = 20
+BREADTH_TURNOVER_SHARE = 0.4
+
+
+def compute_risk_notes(watchlist: List[Dict[str, Any]], breadth: Optional[Dict[str, Any]] = None) -> List[str]:
+    market_notes = _breadth_risk_notes(breadth or {})
     if not watchlist:
-        return ["watchlist 为空，无法评估风险"]
+        return ["watchlist 为空，无法评估风险"] + market_notes
     pct_values = [item.get("pct_chg") for item in watchlist]
     pct_nums = [v for v in pct_values if isinstance(v, (int, float))]
     if not pct_nums:
-        return ["缺少涨跌幅数据，风险评估降级"]
+        return ["缺少涨跌幅数据，风险评估降级"] + market_notes
     neg_ratio = sum(1 for v in pct_nums if v < 0) / max(len(pct_nums), 1)
     avg_pct = sum(pct_nums) / len(pct_nums)
     notes: List[str] = []
@@ -32,19 +34,39 @@ def compute_risk_notes(watchlist: List[Dict[str, Any]]) -> List[str]:
         notes.append(f"watchlist 平均涨跌幅偏弱：{avg_pct:.2f}%")
     if not notes:
         notes.append("watchlist 整体波动可控")
+    return notes + market_notes
+
+
+def _breadth_risk_notes(breadth: Dict[str, Any]) -> List[str]:
+    total = breadth.get("total") or 0
+    if not total:
+        return []
+    notes: List[str] = []
+    decline_share = breadth["decliners"] / total
+    if decline_share >= BREADTH_DECLINE_SHARE:
+        notes.append(f"全市场下跌家数占比偏高：{decline_share:.0%}")
+    limit_up, limit_down = breadth["limit_up"], breadth["limit_down"]
+    if limit_down >= BREADTH_LIMIT_DOWN_MIN and limit_down > limit_up:
+        notes.append(f"跌停家数多于涨停：{limit_down} vs {limit_up}")
+    if breadth["turnover_top_share"] >= BREADTH_TURNOVER_SHARE:
+        notes.append(f"成交集中度偏高：前 {breadth['turnover_top_n']} 名占 {breadth['turnover_top_share']:.0%}")
+    new_highs, new_lows = breadth.get("new_highs"), breadth.get("new_lows")
+    if new_highs is not None and new_lows > 2 * max(new_highs, 1):
+        notes.append(f"{breadth['new_high_low_days']} 日新低家数显著多于新高：{new_lows} vs {new_highs}")
     return notes
 
 
 def compute_momentum_indicators(
-    history_payload: Dict[str, Any],
+    history_payload: HistoryStore,
     days_list: List[int],
     top_n: int,
 ) -> Dict[str, List[Dict[str, Any]]]:
-    momentum: Dict[str, List[Dict[str, Any]]] = {}
-    for days in days_list:
-        results = get_momentum(history_payload, days)
-        momentum[f"{days}d"] = results[:top_n]
-    return momentum
+    windows = [int(days) for days in days_list]
+    if not windows:
+        return {}
+    # One matrix read covers the longest window; all windows come out of the same pass.
+    matrix = history_payload.price_matrix(max(windows) + 1)
+    return compute_momentum(matrix, windows, top_n)
 
 
 def compute_abnormal_moves(
@@ -86,11 +108,6 @@ def classify_strength(
     return {"strong": strong, "weak": weak, "neutral": neutral}
 
 
-def _top_by_key(items: List[Dict[str, Any]], key: str, limit: int, reverse: bool) -> List[Dict[str, Any]]:
-    fallback = float("-inf") if reverse else float("inf")
-    return sorted(items, key=lambda item: _safe_num(item.get(key), fallback), reverse=reverse)[:limit]
-
-
 def _safe_num(value: Any, fallback: float = float("-inf")) -> float:
     try:
         return float(value)
@@ -5,14 +5,16 @@ from typing import Any, Dict, List, Optional
 
 from app.indicators.history import get_latest_date
 from app.indicators.summary import compute_momentum_indicators, compute_rankings, compute_risk_notes
+from app.storage.history_store import HistoryStore
 
 
 def build_brief_data(
     watchlist_snapshot: List[Dict[str, Any]],
     top_gainers: List[Dict[str, Any]],
     top_turnover: List[Dict[str, Any]],
-    history_payload: Optional[Dict[str, Any]] = None,
+    history_payload: Optional[HistoryStore] = None,
     params: Optional[Dict[str, Any]] = None,
+    indicators: Optional[Dict[str, Any]] = None,
 ) -> Dict[str, Any]:
     today = datetime.now().strftime("%Y-%m-%d")
     highlights = [f"{today} 晨报自动生成"]
@@ -30,13 +32,14 @@ def build_brief_data(
         highlights.append("成交额榜：" + "，".join(top_turnover_lines[:5]))
 
     rankings = compute_rankings(watchlist_snapshot, len(top_gainers) or 10)
-    risk_notes = compute_risk_notes(watchlist_snapshot)
-    indicators: Dict[str, Any] = {}
-    if history_payload and params:
+    # Precomputed indicators (from the refresh pipeline) skip the history scan.
+    indicators = dict(indicators) if indicators is not None else {}
+    if not indicators and history_payload and params:
         momentum_days = params.get("momentum_days", [5, 20])
         top_n = params.get("post_close_top_n", len(top_gainers) or 10)
         indicators["momentum"] = compute_momentum_indicators(history_payload, momentum_days, top_n)
         indicators["history_latest_date"] = get_latest_date(history_payload)
+    risk_notes = compute_risk_notes(watchlist_snapshot, indicators.get("breadth"))
 
     return {
         "highlights": highlights,
@@ -3,6 +3,8 @@ from __future__ import annotations
 from datetime import datetime
 from typing import Any, Dict, Optional
 
+from app.indicators.breadth import breadth_lines
+
 
 def build_morning_brief(
     draft: Optional[str] = None, data: Optional[Dict[str, Any]] = None
@@ -23,9 +25,12 @@ def build_morning_brief(
     rankings = data.get("rankings", {}) or {}
     indicators = data.get("indicators", {}) or {}
     momentum = indicators.get("momentum", {}) if isinstance(indicators, dict) else {}
+    breadth = breadth_lines(indicators.get("breadth", {}) if isinstance(indicators, dict) else {})
 
     lines = [f"# QuantaWatcher 晨报 ({today})", ""]
     lines += ["## 今日要点"] + (["- 暂无"] if not highlights else [f"- {item}" for item in highlights])
+    if breadth:
+        lines += ["", "## 市场宽度"] + [f"- {item}" for item in breadth]
     lines += ["", "## 关注板块"] + (["- 暂无"] if not sectors else [f"- {item}" for item in sectors])
     lines += ["", "## 重点标的"] + (["- 暂无"] if not symbols else [f"- {item}" for item in symbols])
     risk_lines = risk_notes or risks
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 from app.indicators.summary import (
     compute_abnormal_moves,
@@ -10,12 +10,14 @@ from app.indicators.summary import (
     compute_rankings,
     compute_risk_notes,
 )
+from app.storage.history_store import HistoryStore
 
 
 def build_post_close_data(
     watchlist_snapshot: List[Dict[str, Any]],
-    history_payload: Dict[str, Any] | None,
+    history_payload: HistoryStore | None,
     params: Dict[str, Any],
+    indicators: Optional[Dict[str, Any]] = None,
 ) -> Dict[str, Any]:
     today = datetime.now().strftime("%Y-%m-%d")
     top_n = int(params.get("post_close_top_n", 10))
@@ -24,11 +26,11 @@ def build_post_close_data(
     rankings = compute_rankings(watchlist_snapshot, top_n)
     abnormal_moves = compute_abnormal_moves(watchlist_snapshot, abnormal_pct)
     suggestions = classify_strength(watchlist_snapshot, strong_pct)
-    risk_notes = compute_risk_notes(watchlist_snapshot)
-    indicators: Dict[str, Any] = {}
-    if history_payload:
+    indicators = dict(indicators) if indicators is not None else {}
+    if not indicators and history_payload:
         momentum_days = params.get("momentum_days", [5, 20])
         indicators["momentum"] = compute_momentum_indicators(history_payload, momentum_days, top_n)
+    risk_notes = compute_risk_notes(watchlist_snapshot, indicators.get("breadth"))
     return {
         "date": today,
         "watchlist": watchlist_snapshot,
@@ -3,6 +3,8 @@ from __future__ import annotations
 from datetime import datetime
 from typing import Any, Dict, List
 
+from app.indicators.breadth import breadth_lines
+
 
 def build_post_close_report(data: Dict[str, Any]) -> str:
     today = data.get("date") or datetime.now().strftime("%Y-%m-%d")
@@ -11,7 +13,9 @@ def build_post_close_report(data: Dict[str, Any]) -> str:
     suggestions = data.get("suggestions", {}) or {}
     risk_notes = data.get("risk_notes", []) or []
     notes = data.get("notes", []) or []
-    momentum = (data.get("indicators", {}) or {}).get("momentum", {}) or {}
+    indicators = data.get("indicators", {}) or {}
+    momentum = indicators.get("momentum", {}) or {}
+    breadth = breadth_lines(indicators.get("breadth", {}) or {})
 
     lines: List[str] = [f"# QuantaWatcher 盘后复盘 ({today})", ""]
 
@@ -19,6 +23,9 @@ def build_post_close_report(data: Dict[str, Any]) -> str:
     lines += ["- 生成时间：" + datetime.now().strftime("%H:%M:%S")]
     lines += ["- watchlist 数量：" + str(len(data.get("watchlist", []) or []))]
 
+    if breadth:
+        lines += ["", "## 市场宽度"] + [f"- {item}" for item in breadth]
+
     lines += ["", "## 风险提示"]
     lines += ["- 暂无"] if not risk_notes else [f"- {item}" for item in risk_notes]
 
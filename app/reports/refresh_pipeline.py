@@ -0,0 +1,380 @@
+from __future__ import annotations
+
+import concurrent.futures
+import hashlib
+import json
+import logging
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+import numpy as np
+
+from app.core.config import Settings
+from app.core.report_params import load_report_params
+from app.core.snapshot_frame import SnapshotFrame
+from app.core.watchlist import load_watchlist
+from app.indicators.breadth import compute_breadth, prior_closes
+from app.indicators.history import backfill_history, get_latest_date, update_history
+from app.indicators.ranking import GAINERS, TURNOVER, rank_items
+from app.indicators.summary import compute_momentum_indicators
+from app.reports.brief_builder import build_brief_data
+from app.reports.brief_data import load_brief_data
+from app.reports.post_close_builder import build_post_close_data
+from app.reports.watchlist_research import save_research_data
+from app.scheduler.trading_hours import last_session_close
+from app.storage.history_store import HistoryStore
+from app.storage.market_history import MarketHistory, get_market_history
+from app.storage.snapshot_cache import read_snapshot_frame
+from app.storage.snapshot_memory import SnapshotResult, get_snapshot_memory
+
+logger = logging.getLogger(__name__)
+
+STAGES = ("snapshot", "enrich", "history", "breadth", "indicators", "research", "render")
+# Meta that describes what the rows are; timing keys (latency_ms, memory_age_sec,
+# joined_inflight, ...) change on every call and must not defeat reuse.
+_SNAPSHOT_META_KEYS = ("source", "fallback_used", "degraded", "cache_ts")
+
+
+class StageMemo:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Tuple[str, Any]] = {}
+
+    def get(self, key: str, fingerprint: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None or entry[0] != fingerprint:
+            return None
+        return entry[1]
+
+    def put(self, key: str, fingerprint: str, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (fingerprint, value)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_MEMO = StageMemo()
+
+
+def get_stage_memo() -> StageMemo:
+    return _MEMO
+
+
+class RefreshRun:
+    def __init__(
+        self,
+        settings: Settings,
+        fetch_snapshot: Callable[[List[str], int], Dict[str, Any]],
+        memo: Optional[StageMemo] = None,
+    ) -> None:
+        self._settings = settings
+        self._fetch_snapshot = fetch_snapshot
+        self._memo = memo or _MEMO
+        self._started = time.monotonic()
+        self._fps: Dict[str, str] = {}
+        self.timings_ms: Dict[str, int] = {}
+        self.reused: List[str] = []
+        # Market-local, the same calendar last_session_close() uses, whatever the server clock is.
+        self.date = datetime.now(ZoneInfo(settings.timezone)).strftime("%Y-%m-%d")
+        self.watchlist = load_watchlist(settings.watchlist_path)
+        self.symbols = [item.get("symbol") for item in self.watchlist if item.get("symbol")]
+        self.params = load_report_params(settings.report_params_path, settings)
+
+    def snapshot(self) -> Dict[str, Any]:
+        start_ts = time.monotonic()
+        # Freshness is owned by the snapshot cache; this stage only fingerprints what came back.
+        snapshot = self._fetch_snapshot(self.symbols, self._settings.morning_brief_top_n)
+        self._fps["snapshot"] = _snapshot_fingerprint(snapshot)
+        self.timings_ms["snapshot"] = _elapsed_ms(start_ts)
+        return snapshot
+
+    def enrich(self, snapshot: Dict[str, Any]) -> Dict[str, Any]:
+        return self._stage("enrich", [self._fps["snapshot"], self.watchlist], lambda: _enrich(snapshot, self.watchlist))
+
+    def history(self, enriched: Dict[str, Any]) -> HistoryStore:
+        settings = self._settings
+        path = settings.watchlist_history_path
+
+        def _compute() -> HistoryStore:
+            store = update_history(path, self.date, enriched.get("watchlist", []))
+            if settings.market_history_enabled:
+                backfill_history(store, get_market_history(settings.market_history_dir), self.symbols)
+            return store
+
+        return self._stage("history", [self._fps["enrich"], self.date, path, settings.market_history_enabled], _compute)
+
+    def indicators(self, history_payload: HistoryStore) -> Dict[str, Any]:
+        momentum_days = self.params.get("momentum_days", [5, 20])
+        top_n = int(self.params.get("post_close_top_n", 10))
+
+        breadth = self.breadth()
+
+        def _compute() -> Dict[str, Any]:
+            return {
+                "momentum": compute_momentum_indicators(history_payload, momentum_days, top_n),
+                "history_latest_date": get_latest_date(history_payload),
+                "breadth": breadth,
+            }
+
+        return self._stage("indicators", [self._fps["history"], momentum_days, top_n, self._fps["breadth"]], _compute)
+
+    def breadth(self) -> Dict[str, Any]:
+        settings = self._settings
+        start_ts = time.monotonic()
+        # Not memoized: one vectorized pass over the market is cheaper than fingerprinting it.
+        breadth: Dict[str, Any] = {}
+        market = self._market()
+        if market is not None:
+            frame, meta = market
+            prior = None
+            if settings.market_history_enabled:
+                history = get_market_history(settings.market_history_dir)
+                prior = prior_closes(history, frame.symbols, settings.breadth_new_high_days, self.date)
+            breadth = compute_breadth(frame, prior, settings.breadth_turnover_top_n)
+            breadth["source"] = meta.get("source")
+        self._fps["breadth"] = _fingerprint(breadth)
+        self.timings_ms["breadth"] = _elapsed_ms(start_ts)
+        return breadth
+
+    def research(
+        self,
+        symbols: List[str],
+        fetch_fundamentals: Callable[[List[str]], List[Dict[str, Any]]],
+        fetch_technicals: Callable[[List[str]], List[Dict[str, Any]]],
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        settings = self._settings
+
+        def _compute() -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+            # The two kinds hit different upstreams, so they run side by side.
+            with concurrent.futures.ThreadPoolExecutor(max_workers=2, thread_name_prefix="research-kind") as pool:
+                fundamentals_future = pool.submit(fetch_fundamentals, symbols)
+                technicals_future = pool.submit(fetch_technicals, symbols)
+                fundamentals = fundamentals_future.result()
+                technicals = technicals_future.result()
+            save_research_data(settings, {"items": fundamentals}, {"items": technicals})
+            return fundamentals, technicals
+
+        # Valuation and daily technicals do not move within a day, so one fetch serves both flows.
+        inputs = [symbols, self.date, settings.watchlist_fundamentals_path, settings.watchlist_technicals_path]
+        # A transient per-symbol failure must not stick for the day; only complete results are kept.
+        return self._stage("research", inputs, _compute, reusable=_research_complete)
+
+    def research_symbols(self) -> List[str]:
+        # Priority symbols first, then the watchlist's own `priority` (higher first), then file order.
+        settings = self._settings
+        pinned = [s.strip() for s in settings.priority_symbols.split(",") if s.strip()]
+        pin_rank = {symbol: idx for idx, symbol in enumerate(pinned)}
+        ranked = sorted(
+            (item for item in self.watchlist if item.get("symbol") and item.get("enabled", True)),
+            key=lambda item: (pin_rank.get(item["symbol"], len(pinned)), -_priority(item)),
+        )
+        return list(dict.fromkeys(item["symbol"] for item in ranked))[: settings.research_max_symbols]
+
+    def capture_market(self) -> int:
+        settings = self._settings
+        if not settings.market_history_enabled:
+            return 0
+        start_ts = time.monotonic()
+        # Persist the full-market pull this run already made; never trigger another upstream fetch.
+        latest = self._latest_pull()
+        written = 0
+        if latest is not None:
+            items, meta = latest
+            history = get_market_history(settings.market_history_dir)
+            skip = self._capture_skip_reason(history, items, meta)
+            if skip:
+                logger.info("market_history_capture_skipped", extra={"date": self.date, "reason": skip, "source": meta.get("source")})
+            else:
+                written = history.write_day(self.date, items, time.time())
+                logger.info("market_history_captured", extra={"date": self.date, "rows": written, "source": meta.get("source")})
+        self.timings_ms["capture"] = _elapsed_ms(start_ts)
+        return written
+
+    def _capture_skip_reason(self, history: MarketHistory, frame: SnapshotFrame, meta: Dict[str, Any]) -> Optional[str]:
+        # Only a completed session's closes may be stored under self.date; anything else would
+        # add a duplicate row to the price matrix behind momentum, new highs and breadth.
+        if meta.get("source") == "cache":
+            return "cache_source"
+        if last_session_close(self._settings.timezone).strftime("%Y-%m-%d") != self.date:
+            return "not_a_session_close"
+        # Exchange holidays are not modelled: a weekday holiday serves the last session again.
+        days = history.days()
+        earlier = [date_key for date_key in days if date_key < self.date]
+        if earlier:
+            prior = history.price_matrix(len(days) - days.index(earlier[-1]), frame.symbols)
+            row = prior.prices[0]
+            last = frame.column("last")
+            both = ~np.isnan(row) & ~np.isnan(last)
+            # Stored prices are fixed-point, so compare within a fraction of a cent.
+            if both.any() and np.allclose(row[both], last[both], rtol=0.0, atol=1e-3):
+                return f"unchanged_since:{earlier[-1]}"
+        return None
+
+    def render_morning(self, enriched: Dict[str, Any], indicators: Dict[str, Any]) -> Dict[str, Any]:
+        path = self._settings.morning_brief_data_path
+        inputs = [self._fps["enrich"], self._fps["indicators"], self.params, self.date, _file_mtime_iso(path)]
+        return self._stage("render", inputs, lambda: _render_morning(self._settings, enriched, indicators, self.params), "render_morning")
+
+    def render_post_close(self, enriched: Dict[str, Any], indicators: Dict[str, Any]) -> Dict[str, Any]:
+        inputs = [self._fps["enrich"], self._fps["indicators"], self.params, self.date]
+        return self._stage("render", inputs, lambda: _render_post_close(enriched, indicators, self.params), "render_post_close")
+
+    def prepare(self) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        enriched = self.enrich(self.snapshot())
+        indicators = self.indicators(self.history(enriched))
+        return enriched, indicators
+
+    def _latest_pull(self) -> Optional[SnapshotResult]:
+        max_age = max(self._settings.market_snapshot_memory_ttl_sec, time.monotonic() - self._started)
+        return get_snapshot_memory().latest(max_age)
+
+    def _market(self) -> Optional[SnapshotResult]:
+        latest = self._latest_pull()
+        if latest is not None:
+            return latest
+        # The snapshot stage may have been served from the disk cache, which memory never holds.
+        frame = read_snapshot_frame(self._settings.market_snapshot_cache_path)
+        return (frame, {"source": "cache"}) if len(frame) else None
+
+    def _stage(
+        self,
+        name: str,
+        inputs: List[Any],
+        compute: Callable[[], Any],
+        memo_key: Optional[str] = None,
+        reusable: Optional[Callable[[Any], bool]] = None,
+    ) -> Any:
+        start_ts = time.monotonic()
+        fingerprint = _fingerprint(inputs)
+        key = memo_key or name
+        value = self._memo.get(key, fingerprint)
+        if value is None:
+            value = compute()
+            if reusable is None or reusable(value):
+                self._memo.put(key, fingerprint, value)
+        else:
+            self.reused.append(name)
+        # Stages are deterministic in their inputs, so the input fingerprint identifies the output.
+        self._fps[name] = fingerprint
+        self.timings_ms[name] = _elapsed_ms(start_ts)
+        return value
+
+
+def snapshot_notes(meta: Dict[str, Any]) -> List[str]:
+    source = meta.get("source", "akshare")
+    notes = [f"source: {source}"]
+    if meta.get("fallback_used"):
+        fallback_note = f"fallback: {source}"
+        if meta.get("degraded"):
+            fallback_note += " (watchlist only)"
+        cache_ts = meta.get("cache_ts")
+        if cache_ts:
+            fallback_note += f" (cache {cache_ts})"
+        notes.append(fallback_note)
+    return notes
+
+
+def _render_morning(
+    settings: Settings,
+    enriched: Dict[str, Any],
+    indicators: Dict[str, Any],
+    params: Dict[str, Any],
+) -> Dict[str, Any]:
+    cached_brief = load_brief_data(settings.morning_brief_data_path) or {}
+    cached_ts = _file_mtime_iso(settings.morning_brief_data_path)
+    payload = build_brief_data(
+        watchlist_snapshot=enriched.get("watchlist", []),
+        top_gainers=enriched.get("top_gainers", []),
+        top_turnover=enriched.get("top_turnover", []),
+        params=params,
+        indicators=indicators,
+    )
+    notes = payload.setdefault("notes", [])
+    notes.extend(snapshot_notes(enriched.get("meta", {}) or {}))
+    if enriched.get("watchlist") and not enriched.get("top_gainers") and not enriched.get("top_turnover"):
+        notes.append("snapshot: top lists empty")
+        if cached_brief.get("top_gainers") or cached_brief.get("top_turnover"):
+            payload["top_gainers"] = cached_brief.get("top_gainers", [])
+            payload["top_turnover"] = cached_brief.get("top_turnover", [])
+            if cached_ts:
+                notes.append(f"top lists cached from {cached_ts}")
+        elif payload.get("watchlist"):
+            payload.update(rank_items(payload["watchlist"], (GAINERS, TURNOVER), settings.morning_brief_top_n))
+            notes.append("top lists derived from watchlist only")
+    return payload
+
+
+def _render_post_close(
+    enriched: Dict[str, Any],
+    indicators: Dict[str, Any],
+    params: Dict[str, Any],
+) -> Dict[str, Any]:
+    payload = build_post_close_data(
+        watchlist_snapshot=enriched.get("watchlist", []),
+        history_payload=None,
+        params=params,
+        indicators={"momentum": indicators.get("momentum", {}), "breadth": indicators.get("breadth", {})},
+    )
+    payload.setdefault("notes", []).extend(snapshot_notes(enriched.get("meta", {}) or {}))
+    return payload
+
+
+def _enrich(snapshot: Dict[str, Any], watchlist: List[Dict[str, Any]]) -> Dict[str, Any]:
+    lookup = {item.get("symbol"): item.get("name") for item in watchlist if item.get("symbol")}
+    enriched: Dict[str, Any] = dict(snapshot)
+    for key in ("watchlist", "top_gainers", "top_turnover"):
+        items = snapshot.get(key)
+        if not isinstance(items, list):
+            continue
+        # Copy rows so the shared in-memory snapshot is never mutated by a report flow.
+        enriched[key] = [
+            {**item, "name": lookup.get(item.get("symbol"))} if not item.get("name") and lookup.get(item.get("symbol")) else item
+            for item in items
+        ]
+    return enriched
+
+
+def _research_complete(result: Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]) -> bool:
+    return not any(row.get("fetch_failed") for rows in result for row in rows)
+
+
+def _priority(item: Dict[str, Any]) -> int:
+    try:
+        return int(item.get("priority") or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _snapshot_fingerprint(snapshot: Dict[str, Any]) -> str:
+    meta = snapshot.get("meta") or {}
+    return _fingerprint(
+        {
+            "watchlist": snapshot.get("watchlist"),
+            "top_gainers": snapshot.get("top_gainers"),
+            "top_turnover": snapshot.get("top_turnover"),
+            "meta": {key: meta.get(key) for key in _SNAPSHOT_META_KEYS},
+        }
+    )
+
+
+def _fingerprint(value: Any) -> str:
+    raw = json.dumps(value, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def _file_mtime_iso(path: str) -> str:
+    file_path = Path(path)
+    if not file_path.exists():
+        return ""
+    return datetime.fromtimestamp(file_path.stat().st_mtime).isoformat(timespec="seconds")
+
+
+def _elapsed_ms(start_ts: float) -> int:
+    return int((time.monotonic() - start_ts) * 1000)
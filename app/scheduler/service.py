@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import logging
 from datetime import datetime, timezone
+from typing import Any
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 
@@ -9,28 +10,40 @@ from app.core.config import Settings
 from app.storage.sqlite import SqliteStorage
 from app.notifiers.factory import build_notifier
 from app.connectors.brief_data_source import fetch_morning_brief_data
-from app.connectors.akshare_snapshot import fetch_market_snapshot
+from app.connectors.akshare_snapshot import fetch_market_snapshot, get_market_items
+from app.connectors.tencent_quote import fetch_quotes
 from app.reports.brief_store import load_morning_brief_draft
 from app.reports.morning_brief import build_morning_brief
-from app.reports.brief_builder import build_brief_data
 from app.core.watchlist import load_watchlist
+from app.indicators.limits import get_limit_tracker
 from app.reports.brief_data import save_brief_data
-from app.core.report_params import load_report_params
-from app.indicators.history import update_history
-from app.reports.post_close_builder import build_post_close_data
 from app.reports.post_close_data import save_post_close_data, load_post_close_data
 from app.reports.post_close_report import build_post_close_report
+from app.reports.refresh_pipeline import RefreshRun
+from app.scheduler.trading_hours import is_trading_time
+from app.storage.quote_table import get_quote_table
+from app.storage.tick_store import TickStore
 
 
 logger = logging.getLogger(__name__)
 
 
+def _parse_ts(value: Any) -> float | None:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(str(value)).timestamp()
+    except ValueError:
+        return None
+
+
 class SchedulerService:
     def __init__(self, settings: Settings) -> None:
         self._settings = settings
         self._scheduler = AsyncIOScheduler(timezone=settings.timezone)
         self._storage = SqliteStorage(settings.db_path)
         self._notifier = build_notifier(settings)
+        self._ticks = TickStore(settings.tick_store_dir, settings.timezone) if settings.tick_store_enabled else None
 
     async def start(self) -> None:
         self._storage.init_db()
@@ -43,6 +56,15 @@ class SchedulerService:
             coalesce=True,
             misfire_grace_time=30,
         )
+        self._scheduler.add_job(
+            self.scan_market,
+            "interval",
+            seconds=self._settings.market_scan_interval_sec,
+            id="scan_market",
+            max_instances=1,
+            coalesce=True,
+            misfire_grace_time=60,
+        )
         self._scheduler.add_job(
             self.send_morning_brief,
             "cron",
@@ -79,26 +101,90 @@ class SchedulerService:
         logger.info("scheduler_stopped")
 
     def collect_snapshots(self) -> None:
+        if not self._in_session():
+            return
+        start_ts = datetime.now(timezone.utc)
+        status = "success"
+        error = None
+        try:
+            # Fast path: watchlist + priority symbols only, via one batched Tencent round.
+            symbols = self._poll_symbols()
+            if symbols:
+                items = fetch_quotes(symbols, settings=self._settings)
+                get_quote_table().update(items, "tencent", start_ts.timestamp())
+                if self._ticks:
+                    self._ticks.append(items, start_ts.timestamp())
+                self._track_limits(items, start_ts.timestamp())
+        except Exception as exc:
+            logger.exception("collect_snapshots_failed")
+            status = "failed"
+            error = str(exc)
+        finally:
+            # This runs every few seconds; only failures are worth a task_runs row.
+            if status == "failed":
+                end_ts = datetime.now(timezone.utc)
+                self._storage.record_task_run(
+                    "collect_snapshots",
+                    start_ts.isoformat(),
+                    end_ts.isoformat(),
+                    status,
+                    error,
+                )
+
+    def scan_market(self) -> None:
+        if not self._in_session():
+            return
         start_ts = datetime.now(timezone.utc)
         try:
-            logger.info("collect_snapshots_started")
-            # TODO: wire connectors + indicators + rules
+            # max_age 0 forces a fresh pull, but it still joins an in-flight one and refreshes the memory cache.
+            items, meta = get_market_items(self._settings, self._poll_symbols(), max_age_sec=0)
+            # Stamped with the scan start so it never masks a fast-path quote taken meanwhile;
+            # cache rows keep the time they were written, so they only fill symbols we have nothing newer for.
+            if meta.get("source") == "cache":
+                cache_ts = _parse_ts(meta.get("cache_ts"))
+                count = get_quote_table().update(items, "cache", cache_ts) if cache_ts is not None else 0
+            else:
+                count = get_quote_table().update(items, meta.get("source", "market"), start_ts.timestamp())
+                if self._ticks:
+                    self._ticks.append(items, start_ts.timestamp())
+                self._track_limits(items, start_ts.timestamp())
+            logger.info("scan_market_done", extra={"source": meta.get("source"), "count": count})
             status = "success"
             error = None
-        except Exception as exc:  # pragma: no cover - placeholder
-            logger.exception("collect_snapshots_failed")
+        except Exception as exc:  # pragma: no cover - external dependency
+            logger.exception("scan_market_failed")
             status = "failed"
             error = str(exc)
         finally:
             end_ts = datetime.now(timezone.utc)
             self._storage.record_task_run(
-                "collect_snapshots",
+                "scan_market",
                 start_ts.isoformat(),
                 end_ts.isoformat(),
                 status,
                 error,
             )
 
+    def _track_limits(self, items: Any, ts: float) -> None:
+        if not self._settings.limit_events_enabled:
+            return
+        # The tracker diffs against the previous poll, so only state changes become events.
+        events = get_limit_tracker(self._settings.timezone).update(items, ts)
+        if events:
+            self._storage.record_events(events)
+            logger.info("limit_events", extra={"count": len(events)})
+
+    def _in_session(self) -> bool:
+        if not self._settings.intraday_trading_hours_only:
+            return True
+        return is_trading_time(self._settings.timezone)
+
+    def _poll_symbols(self) -> list[str]:
+        watchlist = load_watchlist(self._settings.watchlist_path)
+        symbols = [item.get("symbol") for item in watchlist if item.get("symbol")]
+        priority = [s.strip() for s in self._settings.priority_symbols.split(",") if s.strip()]
+        return list(dict.fromkeys(priority + symbols))
+
     def send_morning_brief(self) -> None:
         start_ts = datetime.now(timezone.utc)
         try:
@@ -127,35 +213,10 @@ class SchedulerService:
     def refresh_morning_brief_data(self) -> None:
         start_ts = datetime.now(timezone.utc)
         try:
-            watchlist = load_watchlist(self._settings.watchlist_path)
-            symbols = [item.get("symbol") for item in watchlist if item.get("symbol")]
-            snapshot = fetch_market_snapshot(symbols, self._settings.morning_brief_top_n)
-            snapshot = _enrich_snapshot_names(snapshot, watchlist)
-            snapshot_meta = snapshot.get("meta", {}) if isinstance(snapshot, dict) else {}
-            params = load_report_params(self._settings.report_params_path, self._settings)
-            history_payload = update_history(
-                self._settings.watchlist_history_path,
-                datetime.now().strftime("%Y-%m-%d"),
-                snapshot.get("watchlist", []),
-            )
-            payload = build_brief_data(
-                watchlist_snapshot=snapshot.get("watchlist", []),
-                top_gainers=snapshot.get("top_gainers", []),
-                top_turnover=snapshot.get("top_turnover", []),
-                history_payload=history_payload,
-                params=params,
-            )
-            notes = payload.setdefault("notes", [])
-            notes.append(f"source: {snapshot_meta.get('source', 'akshare')}")
-            if snapshot_meta.get("fallback_used"):
-                fallback_note = f"fallback: {snapshot_meta.get('source', 'unknown')}"
-                if snapshot_meta.get("degraded"):
-                    fallback_note += " (watchlist only)"
-                cache_ts = snapshot_meta.get("cache_ts")
-                if cache_ts:
-                    fallback_note += f" (cache {cache_ts})"
-                notes.append(fallback_note)
-            save_brief_data(self._settings.morning_brief_data_path, payload)
+            run = RefreshRun(self._settings, fetch_market_snapshot)
+            snapshot, indicators = run.prepare()
+            save_brief_data(self._settings.morning_brief_data_path, run.render_morning(snapshot, indicators))
+            logger.info("refresh_morning_brief_stages", extra={"timings_ms": run.timings_ms, "reused": run.reused})
             status = "success"
             error = None
         except Exception as exc:  # pragma: no cover - external dependency
@@ -175,33 +236,11 @@ class SchedulerService:
     def refresh_post_close_data(self) -> None:
         start_ts = datetime.now(timezone.utc)
         try:
-            watchlist = load_watchlist(self._settings.watchlist_path)
-            symbols = [item.get("symbol") for item in watchlist if item.get("symbol")]
-            snapshot = fetch_market_snapshot(symbols, self._settings.morning_brief_top_n)
-            snapshot = _enrich_snapshot_names(snapshot, watchlist)
-            snapshot_meta = snapshot.get("meta", {}) if isinstance(snapshot, dict) else {}
-            params = load_report_params(self._settings.report_params_path, self._settings)
-            history_payload = update_history(
-                self._settings.watchlist_history_path,
-                datetime.now().strftime("%Y-%m-%d"),
-                snapshot.get("watchlist", []),
-            )
-            payload = build_post_close_data(
-                watchlist_snapshot=snapshot.get("watchlist", []),
-                history_payload=history_payload,
-                params=params,
-            )
-            notes = payload.setdefault("notes", [])
-            notes.append(f"source: {snapshot_meta.get('source', 'akshare')}")
-            if snapshot_meta.get("fallback_used"):
-                fallback_note = f"fallback: {snapshot_meta.get('source', 'unknown')}"
-                if snapshot_meta.get("degraded"):
-                    fallback_note += " (watchlist only)"
-                cache_ts = snapshot_meta.get("cache_ts")
-                if cache_ts:
-                    fallback_note += f" (cache {cache_ts})"
-                notes.append(fallback_note)
-            save_post_close_data(self._settings.post_close_data_path, payload)
+            run = RefreshRun(self._settings, fetch_market_snapshot)
+            snapshot, indicators = run.prepare()
+            run.capture_market()
+            save_post_close_data(self._settings.post_close_data_path, run.render_post_close(snapshot, indicators))
+            logger.info("refresh_post_close_stages", extra={"timings_ms": run.timings_ms, "reused": run.reused})
             status = "success"
             error = None
         except Exception as exc:  # pragma: no cover - external dependency
@@ -239,17 +278,3 @@ class SchedulerService:
                 status,
                 error,
             )
-
-
-def _enrich_snapshot_names(snapshot: dict, watchlist: list[dict]) -> dict:
-    lookup = {item.get("symbol"): item.get("name") for item in watchlist if item.get("symbol")}
-    for key in ("watchlist", "top_gainers", "top_turnover"):
-        items = snapshot.get(key)
-        if not isinstance(items, list):
-            continue
-        for item in items:
-            if not item.get("name"):
-                name = lookup.get(item.get("symbol"))
-                if name:
-                    item["name"] = name
-    return snapshot
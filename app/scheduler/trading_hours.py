@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+from datetime import datetime, time, timedelta
+from typing import Optional
+from zoneinfo import ZoneInfo
+
+# Continuous auction sessions plus the opening call auction; exchange holidays are not modelled.
+_SESSIONS = ((time(9, 15), time(11, 30)), (time(13, 0), time(15, 0)))
+
+
+def is_trading_time(tz_name: str, now: Optional[datetime] = None) -> bool:
+    tz = ZoneInfo(tz_name)
+    now = now.astimezone(tz) if now is not None else datetime.now(tz)
+    if now.weekday() >= 5:
+        return False
+    current = now.time()
+    return any(start <= current <= end for start, end in _SESSIONS)
+
+
+def last_session_close(tz_name: str, now: Optional[datetime] = None) -> datetime:
+    # Most recent weekday 15:00 at or before `now`; a bar synced after it is final.
+    tz = ZoneInfo(tz_name)
+    now = now.astimezone(tz) if now is not None else datetime.now(tz)
+    close = datetime.combine(now.date(), _SESSIONS[-1][1], tzinfo=tz)
+    if now < close:
+        close -= timedelta(days=1)
+    while close.weekday() >= 5:
+        close -= timedelta(days=1)
+    return close
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import os
+import struct
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+# One file per symbol: header | fixed-width daily bars sorted by date (52 bytes a bar).
+# Prices are forward-adjusted (qfq) and can carry any precision, so they stay float64.
+# The header names the upstream that produced the bars: qfq series from different providers
+# are not comparable, so incremental syncs must stay on the same one.
+_MAGIC = b"QWBR"
+_VERSION = 2
+_HEADER = struct.Struct("<4sHIxxd16s")
+BAR_DTYPE = np.dtype(
+    [
+        ("date", "<i4"),
+        ("open", "<f8"),
+        ("high", "<f8"),
+        ("low", "<f8"),
+        ("close", "<f8"),
+        ("volume", "<f8"),
+        ("amount", "<f8"),
+    ]
+)
+
+
+class BarStore:
+    def __init__(self, root: str) -> None:
+        self._root = Path(root)
+        self._lock = threading.Lock()
+
+    def read(self, symbol: str) -> Tuple[Optional[np.ndarray], float, str]:
+        # Returns (bars, synced_ts, upstream); bars is None when nothing usable is stored.
+        path = self._path(symbol)
+        try:
+            raw = path.read_bytes()
+            magic, version, rows, synced, upstream = _HEADER.unpack_from(raw)
+        except (OSError, struct.error):
+            return None, 0.0, ""
+        # Version 1 files carry no upstream; they read as missing and are refetched once.
+        if magic != _MAGIC or version != _VERSION or len(raw) < _HEADER.size + rows * BAR_DTYPE.itemsize:
+            return None, 0.0, ""
+        bars = np.frombuffer(raw, dtype=BAR_DTYPE, count=rows, offset=_HEADER.size)
+        return bars, synced, upstream.rstrip(b"\0").decode("ascii", "replace")
+
+    def write(self, symbol: str, bars: np.ndarray, synced_ts: float, upstream: str) -> None:
+        bars = np.ascontiguousarray(bars, dtype=BAR_DTYPE)
+        path = self._path(symbol)
+        with self._lock:
+            self._root.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(path.name + ".tmp")
+            with tmp.open("wb") as handle:
+                handle.write(_HEADER.pack(_MAGIC, _VERSION, len(bars), synced_ts, upstream.encode("ascii")[:16]))
+                bars.tofile(handle)
+            os.replace(tmp, path)
+
+    def merge(self, symbol: str, stored: np.ndarray, fresh: np.ndarray, synced_ts: float, upstream: str) -> np.ndarray:
+        # Fresh bars replace stored ones from their first date on; earlier history is kept.
+        if fresh.size:
+            stored = stored[stored["date"] < fresh["date"][0]]
+        bars = np.concatenate((stored, fresh.astype(BAR_DTYPE)))
+        self.write(symbol, bars, synced_ts, upstream)
+        return bars
+
+    def _path(self, symbol: str) -> Path:
+        return self._root / f"{symbol}.bin"
+
+
+def bars_from_columns(dates, opens, highs, lows, closes, volumes, amounts) -> np.ndarray:
+    bars = np.empty(len(dates), dtype=BAR_DTYPE)
+    bars["date"] = dates
+    bars["open"] = opens
+    bars["high"] = highs
+    bars["low"] = lows
+    bars["close"] = closes
+    bars["volume"] = volumes
+    bars["amount"] = amounts
+    order = np.argsort(bars["date"], kind="stable")
+    return bars[order]
+
+
+def date_key(value: object) -> int:
+    # 2026-10-16, 20261016 or a date/Timestamp -> 20261016.
+    text = str(value)[:10].replace("-", "")
+    return int(text)
+
+
+_STORES: Dict[str, BarStore] = {}
+_STORES_LOCK = threading.Lock()
+
+
+def get_bar_store(root: str) -> BarStore:
+    with _STORES_LOCK:
+        store = _STORES.get(root)
+        if store is None:
+            store = BarStore(root)
+            _STORES[root] = store
+        return store
@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import json
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS daily_quotes (
+        date TEXT NOT NULL,
+        symbol TEXT NOT NULL,
+        name TEXT,
+        last REAL,
+        pct_chg REAL,
+        amount REAL,
+        PRIMARY KEY (date, symbol)
+    ) WITHOUT ROWID
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_daily_quotes_symbol ON daily_quotes (symbol, date)",
+    "CREATE TABLE IF NOT EXISTS history_meta (key TEXT PRIMARY KEY, value TEXT)",
+)
+
+Row = Tuple[str, Optional[str], Optional[float], Optional[float], Optional[float]]
+
+
+class PriceMatrix(NamedTuple):
+    dates: List[str]
+    symbols: List[str]
+    names: List[str]
+    # Shape (len(dates), len(symbols)); NaN where a symbol has no row that day.
+    prices: np.ndarray
+
+
+class HistoryStore:
+    def __init__(self, path: str) -> None:
+        # Older configs point at watchlist_history.json; the store lives next to it as .db.
+        self.path = str(Path(path).with_suffix(".db"))
+        self._legacy_json = Path(path).with_suffix(".json")
+        self._lock = threading.Lock()
+        self._ready = False
+
+    def write_day(self, date_key: str, rows: Iterable[Row]) -> int:
+        rows = list(rows)
+        with self._lock, self._connect() as conn:
+            # A re-run of the same day replaces only that day's rows; older days are never rewritten.
+            conn.execute("DELETE FROM daily_quotes WHERE date = ?", (date_key,))
+            conn.executemany(
+                "INSERT OR REPLACE INTO daily_quotes (date, symbol, name, last, pct_chg, amount) VALUES (?, ?, ?, ?, ?, ?)",
+                [(date_key, *row) for row in rows],
+            )
+        return len(rows)
+
+    def list_dates(self) -> List[str]:
+        with self._connect() as conn:
+            return [row[0] for row in conn.execute("SELECT DISTINCT date FROM daily_quotes ORDER BY date")]
+
+    def latest_date(self) -> str:
+        with self._connect() as conn:
+            row = conn.execute("SELECT MAX(date) FROM daily_quotes").fetchone()
+        return row[0] or "" if row else ""
+
+    def get_day(self, date_key: str) -> Dict[str, Dict[str, Any]]:
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "SELECT symbol, name, last, pct_chg, amount FROM daily_quotes WHERE date = ?",
+                (date_key,),
+            )
+            return {
+                symbol: {"symbol": symbol, "name": name, "last": last, "pct_chg": pct_chg, "amount": amount}
+                for symbol, name, last, pct_chg, amount in cursor
+            }
+
+    def add_rows(self, rows: Iterable[Tuple[str, str, Optional[str], Any, Any, Any]]) -> int:
+        rows = list(rows)
+        with self._lock, self._connect() as conn:
+            # Backfilled days never override a row the refresh itself wrote.
+            conn.executemany(
+                "INSERT OR IGNORE INTO daily_quotes (date, symbol, name, last, pct_chg, amount) VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+        return len(rows)
+
+    def day_counts(self, symbols: List[str]) -> Dict[str, int]:
+        if not symbols:
+            return {}
+        marks = ",".join("?" * len(symbols))
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT symbol, COUNT(*) FROM daily_quotes WHERE symbol IN ({marks}) GROUP BY symbol",
+                symbols,
+            ).fetchall()
+        counts = dict.fromkeys(symbols, 0)
+        counts.update(dict(rows))
+        return counts
+
+    def symbol_series(self, symbol: str, field: str = "last", limit: Optional[int] = None) -> List[Tuple[str, Any]]:
+        if field not in {"last", "pct_chg", "amount"}:
+            raise RuntimeError("history_field_unknown")
+        sql = f"SELECT date, {field} FROM daily_quotes WHERE symbol = ? ORDER BY date DESC"
+        params: Tuple[Any, ...] = (symbol,)
+        if limit is not None:
+            sql += " LIMIT ?"
+            params = (symbol, limit)
+        with self._connect() as conn:
+            rows = conn.execute(sql, params).fetchall()
+        return rows[::-1]
+
+    def price_matrix(self, lookback: int, field: str = "last") -> PriceMatrix:
+        if field not in {"last", "pct_chg", "amount"}:
+            raise RuntimeError("history_field_unknown")
+        with self._connect() as conn:
+            dates = [
+                row[0]
+                for row in conn.execute("SELECT DISTINCT date FROM daily_quotes ORDER BY date DESC LIMIT ?", (lookback,))
+            ][::-1]
+            if not dates:
+                return PriceMatrix([], [], [], np.empty((0, 0)))
+            rows = conn.execute(
+                f"SELECT date, symbol, name, {field} FROM daily_quotes WHERE date >= ? ORDER BY date",
+                (dates[0],),
+            ).fetchall()
+        date_idx = {date_key: idx for idx, date_key in enumerate(dates)}
+        symbol_idx: Dict[str, int] = {}
+        names: List[str] = []
+        cells = np.empty((len(rows), 3), dtype=np.float64)
+        for pos, (date_key, symbol, name, value) in enumerate(rows):
+            col = symbol_idx.get(symbol)
+            if col is None:
+                col = symbol_idx[symbol] = len(names)
+                names.append("")
+            if name:
+                # Rows are date-ordered, so the last non-empty name is the latest one.
+                names[col] = name
+            cells[pos] = (date_idx[date_key], col, np.nan if value is None else value)
+        prices = np.full((len(dates), len(names)), np.nan)
+        prices[cells[:, 0].astype(np.intp), cells[:, 1].astype(np.intp)] = cells[:, 2]
+        return PriceMatrix(dates, list(symbol_idx), names, prices)
+
+    def _connect(self) -> sqlite3.Connection:
+        if not self._ready:
+            self._init()
+        return sqlite3.connect(self.path)
+
+    def _init(self) -> None:
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        with sqlite3.connect(self.path) as conn:
+            for statement in _SCHEMA:
+                conn.execute(statement)
+        self._ready = True
+        self._migrate_json()
+
+    def _migrate_json(self) -> None:
+        with sqlite3.connect(self.path) as conn:
+            done = conn.execute("SELECT value FROM history_meta WHERE key = 'migrated_json'").fetchone()
+            if done or not self._legacy_json.exists():
+                return
+            try:
+                payload = json.loads(self._legacy_json.read_text(encoding="utf-8"))
+            except Exception:
+                logger.warning("history_migrate_unreadable", extra={"path": str(self._legacy_json)})
+                payload = {}
+            dates = payload.get("dates", {}) if isinstance(payload, dict) else {}
+            rows = [
+                (date_key, symbol, row.get("name"), row.get("last"), row.get("pct_chg"), row.get("amount"))
+                for date_key, day in (dates.items() if isinstance(dates, dict) else [])
+                if isinstance(day, dict)
+                for symbol, row in day.items()
+                if symbol and isinstance(row, dict)
+            ]
+            conn.executemany(
+                "INSERT OR REPLACE INTO daily_quotes (date, symbol, name, last, pct_chg, amount) VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            # The JSON file is left untouched; the marker keeps the import one-time.
+            conn.execute(
+                "INSERT OR REPLACE INTO history_meta (key, value) VALUES ('migrated_json', ?)",
+                (str(self._legacy_json),),
+            )
+        logger.info("history_migrated", extra={"path": str(self._legacy_json), "rows": len(rows)})
+
+
+_STORES: Dict[str, HistoryStore] = {}
+_STORES_LOCK = threading.Lock()
+
+
+def get_history_store(path: str) -> HistoryStore:
+    with _STORES_LOCK:
+        store = _STORES.get(path)
+        if store is None:
+            store = HistoryStore(path)
+            _STORES[path] = store
+        return store
@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import os
+import struct
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from app.core.snapshot_frame import as_frame
+from app.storage.history_store import PriceMatrix
+
+# One file per trading day: header | fixed-width rows. Prices are integer ticks of 0.001
+# (ETF quotes carry three decimals), pct_chg is in 0.01 percent, volume/amount are whole units.
+_MAGIC = b"QWEH"
+_VERSION = 1
+_HEADER = struct.Struct("<4sHIxxd")
+ROW_DTYPE = np.dtype(
+    [
+        ("symbol_id", "<i4"),
+        ("last", "<i4"),
+        ("open", "<i4"),
+        ("high", "<i4"),
+        ("low", "<i4"),
+        ("prev_close", "<i4"),
+        ("pct_chg", "<i4"),
+        ("volume", "<i8"),
+        ("amount", "<i8"),
+    ]
+)
+_SCALES = {"last": 1000, "open": 1000, "high": 1000, "low": 1000, "prev_close": 1000, "pct_chg": 100, "volume": 1, "amount": 1}
+_MISSING = {np.dtype("<i4"): np.iinfo(np.int32).min, np.dtype("<i8"): np.iinfo(np.int64).min}
+_SYMBOLS_FILE = "symbols.txt"
+
+
+class MarketHistory:
+    def __init__(self, root: str) -> None:
+        self._root = Path(root)
+        self._lock = threading.Lock()
+        self._symbols: Optional[List[str]] = None
+        self._index: Dict[str, int] = {}
+
+    def write_day(self, date_key: str, items: Any, ts: float) -> int:
+        frame = as_frame(items)
+        with self._lock:
+            self._root.mkdir(parents=True, exist_ok=True)
+            self._load_symbols()
+            new_symbols = list(dict.fromkeys(symbol for symbol in frame.symbols if symbol not in self._index))
+            if new_symbols:
+                # The symbol table is append-only, so ids stay valid for every day already written.
+                with (self._root / _SYMBOLS_FILE).open("a", encoding="utf-8") as handle:
+                    handle.write("".join(f"{symbol}\n" for symbol in new_symbols))
+                for symbol in new_symbols:
+                    self._index[symbol] = len(self._symbols)
+                    self._symbols.append(symbol)
+            records = np.empty(len(frame), dtype=ROW_DTYPE)
+            records["symbol_id"] = np.fromiter((self._index[symbol] for symbol in frame.symbols), dtype="<i4", count=len(frame))
+            for name, scale in _SCALES.items():
+                records[name] = _to_ticks(frame.column(name), scale, ROW_DTYPE[name])
+            target = self._root / f"{date_key}.bin"
+            tmp = target.with_name(target.name + ".tmp")
+            with tmp.open("wb") as handle:
+                handle.write(_HEADER.pack(_MAGIC, _VERSION, len(frame), ts))
+                records.tofile(handle)
+            # A re-run of the same day swaps the whole file; other days are never touched.
+            os.replace(tmp, target)
+        return len(frame)
+
+    def days(self) -> List[str]:
+        if not self._root.exists():
+            return []
+        return sorted(p.stem for p in self._root.glob("*.bin"))
+
+    def symbols(self) -> List[str]:
+        with self._lock:
+            return list(self._load_symbols())
+
+    def read_day(self, date_key: str) -> Optional[np.ndarray]:
+        path = self._root / f"{date_key}.bin"
+        try:
+            with path.open("rb") as handle:
+                magic, version, rows, _ = _HEADER.unpack(handle.read(_HEADER.size))
+                if magic != _MAGIC or version != _VERSION:
+                    return None
+                # Read into memory: a memmap would pin the file and block write_day's os.replace() on Windows.
+                records = np.fromfile(handle, dtype=ROW_DTYPE, count=rows)
+        except (OSError, struct.error):
+            return None
+        if records.size != rows:
+            return None
+        return records
+
+    def price_matrix(self, lookback: int, symbols: Optional[List[str]] = None, field: str = "last") -> PriceMatrix:
+        if field not in _SCALES:
+            raise RuntimeError("market_history_field_unknown")
+        with self._lock:
+            table = list(self._load_symbols())
+        days = self.days()[-lookback:] if lookback > 0 else []
+        if symbols is None:
+            columns = np.arange(len(table))
+            names = table
+        else:
+            index = {symbol: idx for idx, symbol in enumerate(table)}
+            names = list(symbols)
+            columns = np.array([index.get(symbol, -1) for symbol in names], dtype=np.int64)
+        # Scatter each day through a symbol_id -> column lookup, so no per-row Python work.
+        lookup = np.full(len(table), -1, dtype=np.int64)
+        valid = columns >= 0
+        lookup[columns[valid]] = np.flatnonzero(valid)
+        prices = np.full((len(days), len(names)), np.nan)
+        dates: List[str] = []
+        for row, date_key in enumerate(days):
+            records = self.read_day(date_key)
+            dates.append(date_key)
+            if records is None or records.size == 0:
+                continue
+            ids = records["symbol_id"]
+            known = ids < len(table)
+            cols = lookup[ids[known]]
+            keep = cols >= 0
+            values = _from_ticks(records[field][known][keep], _SCALES[field], ROW_DTYPE[field])
+            prices[row, cols[keep]] = values
+        return PriceMatrix(dates, names, [""] * len(names), prices)
+
+    def _load_symbols(self) -> List[str]:
+        if self._symbols is None:
+            path = self._root / _SYMBOLS_FILE
+            self._symbols = path.read_text(encoding="utf-8").splitlines() if path.exists() else []
+            self._index = {symbol: idx for idx, symbol in enumerate(self._symbols)}
+        return self._symbols
+
+
+def _to_ticks(raw: np.ndarray, scale: int, dtype: np.dtype) -> np.ndarray:
+    out = np.full(raw.size, _MISSING[dtype], dtype=dtype)
+    keep = np.isfinite(raw)
+    out[keep] = np.rint(raw[keep] * scale)
+    return out
+
+
+def _from_ticks(values: np.ndarray, scale: int, dtype: np.dtype) -> np.ndarray:
+    out = values.astype(np.float64) / scale
+    out[values == _MISSING[dtype]] = np.nan
+    return out
+
+
+_HISTORIES: Dict[str, MarketHistory] = {}
+_HISTORIES_LOCK = threading.Lock()
+
+
+def get_market_history(root: str) -> MarketHistory:
+    with _HISTORIES_LOCK:
+        history = _HISTORIES.get(root)
+        if history is None:
+            history = MarketHistory(root)
+            _HISTORIES[root] = history
+        return history
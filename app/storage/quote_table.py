@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from app.core.records import SnapshotRecord, snapshot_records
+
+
+class LatestQuoteTable:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        # Slot records rather than dicts: a full-market scan keeps ~5k of these alive.
+        self._rows: Dict[str, SnapshotRecord] = {}
+
+    def update(self, items: Any, source: str, ts: Optional[float] = None) -> int:
+        ts = time.time() if ts is None else ts
+        records = snapshot_records(items, ts, source)
+        count = 0
+        with self._lock:
+            for record in records:
+                current = self._rows.get(record.symbol)
+                # A slow full-market scan must not overwrite a fresher fast-path quote.
+                if current is not None and current.ts > ts:
+                    continue
+                self._rows[record.symbol] = record
+                count += 1
+        return count
+
+    def get(self, symbols: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        with self._lock:
+            if symbols is None:
+                rows = list(self._rows.values())
+            else:
+                rows = [self._rows[s] for s in symbols if s in self._rows]
+        return [row.to_dict() for row in rows]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            if not self._rows:
+                return {"rows": 0, "sources": {}, "newest_ts": None}
+            sources: Dict[str, int] = {}
+            for row in self._rows.values():
+                sources[row.source] = sources.get(row.source, 0) + 1
+            return {
+                "rows": len(self._rows),
+                "sources": sources,
+                "newest_ts": max(row.ts for row in self._rows.values()),
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._rows.clear()
+
+
+_TABLE = LatestQuoteTable()
+
+
+def get_quote_table() -> LatestQuoteTable:
+    return _TABLE
@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import os
+import struct
+import time
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from app.core.snapshot_frame import SnapshotFrame, as_frame
+from app.core.snapshot_schema import BASE_COLUMNS, EXTENDED_COLUMNS
+
+# Layout (little-endian, 8-byte aligned sections):
+#   header (magic, version, ncols, ts, rows, str_bytes, source)
+#   | numeric column names (16s each) | numeric columns (f8, rows each)
+#   | string table: UTF-8 "symbol\nname\n..." for every row
+_MAGIC = b"QWSC"
+_VERSION = 1
+_HEADER = struct.Struct("<4sHHdII16s")
+_NAME = struct.Struct("<16s")
+_NUMERIC_COLUMNS = tuple(col for col in BASE_COLUMNS + EXTENDED_COLUMNS if col not in {"symbol", "name"})
+
+
+class CacheHeader(NamedTuple):
+    ts: float
+    source: str
+    rows: int
+    columns: Tuple[str, ...]
+    str_bytes: int
+
+
+def write_snapshot_cache(path: str, items: Any, source: str, ts: Optional[float] = None) -> None:
+    ts = time.time() if ts is None else ts
+    frame = as_frame(items)
+    rows = len(frame)
+    # Extended columns are written only when some row carries them (Sina/AkShare give five fields).
+    columns = [
+        col
+        for col in _NUMERIC_COLUMNS
+        if col in BASE_COLUMNS or (col in frame.columns and not np.isnan(frame.columns[col]).all())
+    ]
+    blob = "\n".join(
+        _clean(value) for pair in zip(frame.symbols, frame.names) for value in pair
+    ).encode("utf-8")
+
+    header = _HEADER.pack(_MAGIC, _VERSION, len(columns), ts, rows, len(blob), source.encode("utf-8")[:16])
+    names = b"".join(_NAME.pack(col.encode("ascii")) for col in columns)
+    parts = [header, names, _pad(len(header) + len(names))]
+    for col in columns:
+        parts.append(frame.column(col).astype("<f8", copy=False).tobytes())
+    parts.append(blob)
+
+    target = Path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_name(target.name + ".tmp")
+    tmp.write_bytes(b"".join(parts))
+    # Replace rather than rewrite in place so a concurrent reader sees either file whole.
+    os.replace(tmp, target)
+
+
+def read_cache_header(path: str) -> Optional[CacheHeader]:
+    try:
+        with open(path, "rb") as handle:
+            raw = handle.read(_HEADER.size)
+            if len(raw) < _HEADER.size:
+                return None
+            magic, version, ncols, ts, rows, str_bytes, source = _HEADER.unpack(raw)
+            if magic != _MAGIC or version != _VERSION:
+                return None
+            names = handle.read(_NAME.size * ncols)
+    except OSError:
+        return None
+    try:
+        columns = tuple(
+            _NAME.unpack_from(names, idx * _NAME.size)[0].rstrip(b"\0").decode("ascii") for idx in range(ncols)
+        )
+        source_name = source.rstrip(b"\0").decode("utf-8")
+    except (struct.error, UnicodeDecodeError):
+        # Truncated or corrupt names section: treat it like any other unreadable cache.
+        return None
+    return CacheHeader(ts, source_name, rows, columns, str_bytes)
+
+
+def read_snapshot_columns(path: str, header: Optional[CacheHeader] = None) -> Optional[Dict[str, Any]]:
+    header = header or read_cache_header(path)
+    if header is None:
+        return None
+    rows = header.rows
+    columns_at = _align(_HEADER.size + _NAME.size * len(header.columns))
+    blob_at = columns_at + 8 * rows * len(header.columns)
+    if Path(path).stat().st_size < blob_at + header.str_bytes:
+        return None
+    data: Dict[str, Any] = {}
+    if rows == 0:
+        data.update({"symbol": [], "name": []})
+        data.update({col: np.empty(0, dtype="<f8") for col in header.columns})
+        return data
+    # One read into memory rather than a memmap: a frame that outlives this call must not
+    # pin the file, or the next os.replace() fails on Windows.
+    with open(path, "rb") as handle:
+        handle.seek(columns_at)
+        body = np.fromfile(handle, dtype="<f8", count=rows * len(header.columns))
+        blob = handle.read(header.str_bytes)
+    if body.size != rows * len(header.columns):
+        return None
+    for idx, col in enumerate(header.columns):
+        data[col] = body[rows * idx : rows * (idx + 1)]
+    strings = blob.decode("utf-8").split("\n")
+    if len(strings) != 2 * rows:
+        return None
+    data["symbol"] = strings[0::2]
+    data["name"] = strings[1::2]
+    return data
+
+
+def read_snapshot_frame(path: str, header: Optional[CacheHeader] = None) -> SnapshotFrame:
+    header = header or read_cache_header(path)
+    data = read_snapshot_columns(path, header) if header else None
+    if data is None:
+        return SnapshotFrame.empty()
+    return SnapshotFrame(data["symbol"], data["name"], {col: data[col] for col in header.columns})
+
+
+def read_snapshot_items(path: str, header: Optional[CacheHeader] = None) -> List[Dict[str, Any]]:
+    return read_snapshot_frame(path, header).to_items()
+
+
+def _clean(value: Any) -> str:
+    return str(value or "").replace("\n", " ")
+
+
+def _align(size: int) -> int:
+    return (size + 7) & ~7
+
+
+def _pad(size: int) -> bytes:
+    return b"\0" * (_align(size) - size)
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import concurrent.futures
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.core.snapshot_frame import SnapshotFrame
+
+SnapshotResult = Tuple[SnapshotFrame, Dict[str, Any]]
+
+
+class _Entry:
+    def __init__(self, items: SnapshotFrame, meta: Dict[str, Any], symbols: frozenset) -> None:
+        self.items = items
+        self.meta = meta
+        self.symbols = symbols
+        self.fetched_at = time.monotonic()
+
+
+class SnapshotMemory:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._entries: Dict[str, _Entry] = {}
+        self._inflight: Optional[Tuple[concurrent.futures.Future, frozenset]] = None
+
+    def fetch(
+        self,
+        fetch_fn: Callable[[], SnapshotResult],
+        symbols: List[str],
+        max_age_sec: float,
+    ) -> SnapshotResult:
+        wanted = frozenset(symbols)
+        while True:
+            with self._lock:
+                hit = self._lookup(wanted, max_age_sec)
+                if hit is not None:
+                    return hit
+                owner = self._inflight is None
+                if owner:
+                    self._inflight = (concurrent.futures.Future(), wanted)
+                future, inflight_symbols = self._inflight
+            if owner:
+                break
+            # Join the pull already under way instead of hitting the upstreams again.
+            items, meta = future.result()
+            if _covers(meta, inflight_symbols, wanted):
+                return items, {**meta, "joined_inflight": True}
+            # A watchlist-only result for other symbols: queue behind it and retry, so callers
+            # left uncovered share one follow-up pull instead of each starting their own.
+        try:
+            items, meta = fetch_fn()
+        except Exception as exc:
+            with self._lock:
+                self._inflight = None
+            future.set_exception(exc)
+            raise
+        with self._lock:
+            # Publish and release together so no caller can miss both the entry and the flight.
+            self._store(items, meta, wanted)
+            self._inflight = None
+        future.set_result((items, meta))
+        return items, meta
+
+    def latest(self, max_age_sec: float) -> Optional[SnapshotResult]:
+        # Full-market entries only; used to persist what a refresh already pulled.
+        with self._lock:
+            now = time.monotonic()
+            entries = [
+                entry
+                for entry in self._entries.values()
+                if not entry.meta.get("degraded") and now - entry.fetched_at <= max_age_sec
+            ]
+            if not entries:
+                return None
+            best = max(entries, key=lambda entry: entry.fetched_at)
+            return best.items, best.meta
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def _lookup(self, wanted: frozenset, max_age_sec: float) -> Optional[SnapshotResult]:
+        if max_age_sec <= 0:
+            return None
+        now = time.monotonic()
+        best: Optional[_Entry] = None
+        for entry in self._entries.values():
+            if now - entry.fetched_at > max_age_sec or not _covers(entry.meta, entry.symbols, wanted):
+                continue
+            if best is None or entry.fetched_at > best.fetched_at:
+                best = entry
+        if best is None:
+            return None
+        return best.items, {**best.meta, "memory_age_sec": round(now - best.fetched_at, 3)}
+
+    def _store(self, items: SnapshotFrame, meta: Dict[str, Any], wanted: frozenset) -> None:
+        source = meta.get("source")
+        # The disk cache is already cheap to read and its age is not ours to reset.
+        if not items or source in {None, "none", "cache"}:
+            return
+        self._entries[source] = _Entry(items, meta, wanted)
+
+
+def _covers(meta: Dict[str, Any], have: frozenset, wanted: frozenset) -> bool:
+    # Watchlist-only (degraded) results are reusable only for the symbols they were fetched for.
+    return not meta.get("degraded") or wanted <= have
+
+
+_MEMORY = SnapshotMemory()
+
+
+def get_snapshot_memory() -> SnapshotMemory:
+    return _MEMORY
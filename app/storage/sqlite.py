@@ -2,7 +2,9 @@ from __future__ import annotations
 
 import sqlite3
 from pathlib import Path
-from typing import Optional
+from typing import Iterable, Optional
+
+from app.core.records import EventRecord
 
 
 class SqliteStorage:
@@ -82,5 +84,21 @@ class SqliteStorage:
             )
             conn.commit()
 
+    def record_events(self, records: Iterable[EventRecord]) -> int:
+        rows = [record.to_row() for record in records]
+        if not rows:
+            return 0
+        # One transaction per batch instead of a connect + commit per event.
+        with self._connect() as conn:
+            conn.executemany(
+                """
+                INSERT INTO events (ts, event_type, entity_type, entity_id, score, message, payload, dedup_key)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                rows,
+            )
+            conn.commit()
+        return len(rows)
+
     def _connect(self) -> sqlite3.Connection:
         return sqlite3.connect(self._db_path)
@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+import numpy as np
+
+from app.core.snapshot_frame import as_frame
+
+# Fixed-width little-endian columns; every poll appends one row per symbol to each file.
+TICK_FIELDS: Tuple[Tuple[str, str], ...] = (
+    ("ts", "<f8"),
+    ("symbol_id", "<i4"),
+    ("last", "<f8"),
+    ("pct_chg", "<f8"),
+    ("amount", "<f8"),
+    ("volume", "<f8"),
+)
+_VALUE_FIELDS = tuple(name for name, _ in TICK_FIELDS if name not in {"ts", "symbol_id"})
+_SYMBOLS_FILE = "symbols.txt"
+
+
+class TickStore:
+    def __init__(self, root: str, tz_name: str = "Asia/Shanghai") -> None:
+        self._root = Path(root)
+        self._tz = ZoneInfo(tz_name)
+        self._lock = threading.Lock()
+        self._index_day: Optional[str] = None
+        self._index: Dict[str, int] = {}
+
+    def append(self, items: Any, ts: float) -> int:
+        frame = as_frame(items)
+        if not len(frame):
+            return 0
+        day = datetime.fromtimestamp(ts, self._tz).strftime("%Y-%m-%d")
+        with self._lock:
+            day_dir = self._root / day
+            day_dir.mkdir(parents=True, exist_ok=True)
+            index = self._load_index(day, day_dir)
+            new_symbols = [symbol for symbol in frame.symbols if symbol not in index]
+            if new_symbols:
+                new_symbols = list(dict.fromkeys(new_symbols))
+                # The symbol file is written before the columns so readers never see an unknown id.
+                with (day_dir / _SYMBOLS_FILE).open("a", encoding="utf-8") as handle:
+                    handle.write("".join(f"{symbol}\n" for symbol in new_symbols))
+                for symbol in new_symbols:
+                    index[symbol] = len(index)
+            columns = {
+                "ts": np.full(len(frame), ts, dtype="<f8"),
+                "symbol_id": np.fromiter((index[symbol] for symbol in frame.symbols), dtype="<i4", count=len(frame)),
+            }
+            for name in _VALUE_FIELDS:
+                columns[name] = frame.column(name)
+            try:
+                for name, dtype in TICK_FIELDS:
+                    with (day_dir / f"{name}.bin").open("ab") as handle:
+                        columns[name].astype(dtype, copy=False).tofile(handle)
+            except Exception:
+                # Force a reload (and tail repair) before the next append.
+                self._index_day = None
+                raise
+        return len(frame)
+
+    def open_day(self, day: str) -> Optional["TickDay"]:
+        day_dir = self._root / day
+        if not (day_dir / _SYMBOLS_FILE).exists():
+            return None
+        return TickDay(day_dir)
+
+    def days(self) -> List[str]:
+        if not self._root.exists():
+            return []
+        return sorted(p.name for p in self._root.iterdir() if (p / _SYMBOLS_FILE).exists())
+
+    def _load_index(self, day: str, day_dir: Path) -> Dict[str, int]:
+        if self._index_day != day:
+            path = day_dir / _SYMBOLS_FILE
+            symbols = path.read_text(encoding="utf-8").splitlines() if path.exists() else []
+            self._index = {symbol: idx for idx, symbol in enumerate(symbols)}
+            self._index_day = day
+            _truncate_torn_tail(day_dir)
+        return self._index
+
+
+def _column_rows(day_dir: Path) -> Dict[str, int]:
+    rows = {}
+    for name, dtype in TICK_FIELDS:
+        path = day_dir / f"{name}.bin"
+        rows[name] = path.stat().st_size // np.dtype(dtype).itemsize if path.exists() else 0
+    return rows
+
+
+def _truncate_torn_tail(day_dir: Path) -> None:
+    # A crash mid-append leaves some columns longer (or with a partial value); appending
+    # after that would shift every later row, so cut all columns back to the common length.
+    rows = _column_rows(day_dir)
+    complete = min(rows.values())
+    for name, dtype in TICK_FIELDS:
+        path = day_dir / f"{name}.bin"
+        size = complete * np.dtype(dtype).itemsize
+        if path.exists() and path.stat().st_size != size:
+            with path.open("r+b") as handle:
+                handle.truncate(size)
+
+
+class TickDay:
+    def __init__(self, day_dir: Path) -> None:
+        self.symbols = (day_dir / _SYMBOLS_FILE).read_text(encoding="utf-8").splitlines()
+        self._symbol_ids = {symbol: idx for idx, symbol in enumerate(self.symbols)}
+        # A torn append leaves some columns longer than others; only complete rows are visible.
+        self.rows = min(_column_rows(day_dir).values())
+        self.columns: Dict[str, np.ndarray] = {}
+        for name, dtype in TICK_FIELDS:
+            if self.rows == 0:
+                self.columns[name] = np.empty(0, dtype=dtype)
+            else:
+                self.columns[name] = np.memmap(day_dir / f"{name}.bin", dtype=dtype, mode="r", shape=(self.rows,))
+        self._order: Optional[np.ndarray] = None
+        self._offsets: Optional[np.ndarray] = None
+        self._by_symbol: Dict[str, np.ndarray] = {}
+
+    def symbol_rows(self, symbol: str) -> np.ndarray:
+        start, end = self._span(symbol)
+        return self._symbol_order()[start:end]
+
+    def series(self, symbol: str, field: str) -> Tuple[np.ndarray, np.ndarray]:
+        start, end = self._span(symbol)
+        return self._grouped("ts")[start:end], self._grouped(field)[start:end]
+
+    def minute_bars(self, symbol: str, field: str = "last") -> Dict[str, np.ndarray]:
+        ts, values = self.series(symbol, field)
+        keep = ~np.isnan(values)
+        ts, values = ts[keep], values[keep]
+        if ts.size == 0:
+            return {key: np.empty(0) for key in ("minute", "open", "high", "low", "close")}
+        # Slow market scans append with their start time, so rows are only mostly ordered.
+        order = np.argsort(ts, kind="stable")
+        ts, values = ts[order], values[order]
+        minutes = (ts // 60).astype(np.int64)
+        starts = np.flatnonzero(np.r_[True, minutes[1:] != minutes[:-1]])
+        ends = np.r_[starts[1:], minutes.size]
+        return {
+            "minute": minutes[starts] * 60,
+            "open": values[starts],
+            "high": np.maximum.reduceat(values, starts),
+            "low": np.minimum.reduceat(values, starts),
+            "close": values[ends - 1],
+        }
+
+    def _symbol_order(self) -> np.ndarray:
+        # Built once per day: rows grouped by symbol_id (append order kept within a symbol),
+        # plus each symbol's [start, end) offsets, so a lookup is two slices instead of a scan.
+        if self._order is None:
+            ids = self.columns["symbol_id"]
+            order = np.argsort(ids, kind="stable")
+            self._offsets = np.searchsorted(ids[order], np.arange(len(self.symbols) + 1))
+            self._order = order
+        return self._order
+
+    def _span(self, symbol: str) -> Tuple[int, int]:
+        symbol_id = self._symbol_ids.get(symbol)
+        if symbol_id is None:
+            return 0, 0
+        self._symbol_order()
+        return int(self._offsets[symbol_id]), int(self._offsets[symbol_id + 1])
+
+    def _grouped(self, field: str) -> np.ndarray:
+        # One gather per field per day; every series() after that returns views into it.
+        grouped = self._by_symbol.get(field)
+        if grouped is None:
+            grouped = self.columns[field][self._symbol_order()]
+            self._by_symbol[field] = grouped
+        return grouped
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import argparse
+import timeit
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List
+
+from app.core.models import Snapshot
+from app.core.records import SnapshotRecord, snapshot_records
+from app.core.snapshot_frame import SnapshotFrame
+
+
+def _items(rows: int) -> List[Dict[str, Any]]:
+    return [
+        {
+            "symbol": f"{600000 + idx:06d}",
+            "name": f"NAME{idx}",
+            "last": 10.0 + idx * 0.01,
+            "pct_chg": (idx % 200 - 100) / 10,
+            "volume": 1000.0 * idx,
+            "amount": 12000.0 * idx,
+            "open": 10.0,
+            "high": 11.0,
+            "low": 9.5,
+        }
+        for idx in range(rows)
+    ]
+
+
+def _model(item: Dict[str, Any], ts: datetime) -> Snapshot:
+    return Snapshot(
+        ts=ts,
+        symbol=item["symbol"],
+        last=item["last"],
+        pct_chg=item["pct_chg"],
+        volume=item["volume"],
+        amount=item["amount"],
+        extra={"name": item["name"], "open": item["open"], "high": item["high"], "low": item["low"]},
+    )
+
+
+def _peak_kib(fn: Callable[[], Any]) -> float:
+    tracemalloc.start()
+    kept = fn()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return current / 1024
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Per-row snapshot record construction benchmark")
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--number", type=int, default=3)
+    args = parser.parse_args()
+
+    items = _items(args.rows)
+    frame = SnapshotFrame.from_items(items)
+    ts = 1_760_000_000.0
+    dt = datetime.fromtimestamp(ts, timezone.utc)
+
+    cases = {
+        "dict merge": lambda: [{**item, "source": "bench", "updated_at": ts} for item in items],
+        "pydantic model": lambda: [_model(item, dt) for item in items],
+        "pydantic construct": lambda: [Snapshot.model_construct(ts=dt, **item) for item in items],
+        "slots record": lambda: [SnapshotRecord.from_item(item, ts, "bench") for item in items],
+        "slots from frame": lambda: snapshot_records(frame, ts, "bench"),
+    }
+    baseline = None
+    print(f"rows={args.rows}")
+    for label, fn in cases.items():
+        best = min(timeit.repeat(fn, repeat=args.repeat, number=args.number)) / args.number
+        baseline = baseline or best
+        print(f"{label:<20} {best * 1000:8.2f} ms  {baseline / best:5.2f}x  {_peak_kib(fn):9.0f} KiB retained")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import argparse
+import timeit
+from pathlib import Path
+
+from app.connectors.sina_market import SINA_COLUMNS, _parse_sina_records, parse_sina_columns
+from app.core.snapshot_frame import SnapshotFrame
+from scripts.sina_reference import normalize_sina_rows, parse_sina_text, records_to_items
+
+FIXTURE = Path(__file__).resolve().parents[1] / "tests" / "fixtures" / "sina_hs_a_page.txt"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Sina payload parser micro-benchmark")
+    parser.add_argument("--payload", default=str(FIXTURE), help="recorded getHQNodeData page")
+    parser.add_argument("--pages", type=int, default=55, help="pages per simulated market poll")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--number", type=int, default=3)
+    args = parser.parse_args()
+
+    page = Path(args.payload).read_text(encoding="utf-8")
+    pages = [page] * args.pages
+    rows = len(_parse_sina_records(page)) * args.pages
+    assert records_to_items(_parse_sina_records(page)) == normalize_sina_rows(parse_sina_text(page))
+
+    cases = {
+        "regex+json+normalize": lambda: [normalize_sina_rows(parse_sina_text(text)) for text in pages],
+        "single-pass rows": lambda: [records_to_items(_parse_sina_records(text)) for text in pages],
+        "single-pass columns": lambda: [parse_sina_columns(text) for text in pages],
+        "snapshot frame": lambda: SnapshotFrame.from_records(
+            SINA_COLUMNS, [record for text in pages for record in _parse_sina_records(text)]
+        ),
+    }
+    baseline = None
+    print(f"payload={args.payload} pages={args.pages} rows={rows}")
+    for label, fn in cases.items():
+        best = min(timeit.repeat(fn, repeat=args.repeat, number=args.number)) / args.number
+        baseline = baseline or best
+        print(f"{label:<22} {best * 1000:8.2f} ms/poll  {baseline / best:5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import json
+import re
+from typing import Any, Dict, List, Optional
+
+from app.connectors.sina_market import SINA_COLUMNS, SinaRecord
+
+# Reference parser: the original regex-to-JSON path and its dict rows. The fetch path never
+# uses it; tests/test_sina_market.py and scripts/bench_sina_parser.py compare
+# app.connectors.sina_market._parse_sina_records against it.
+
+
+def parse_sina_text(text: str) -> List[Dict[str, Any]]:
+    if not text or text == "null":
+        return []
+    text = text.strip()
+    if not text.startswith("["):
+        return []
+    json_text = re.sub(r'([{,])([a-zA-Z_][a-zA-Z0-9_]*)\s*:', r'\1"\2":', text)
+    try:
+        return json.loads(json_text)
+    except json.JSONDecodeError:
+        return []
+
+
+def normalize_sina_rows(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    items: List[Dict[str, Any]] = []
+    for row in rows:
+        code = row.get("code") or row.get("symbol") or ""
+        code = str(code)
+        if code.startswith(("sh", "sz", "bj")):
+            code = code[2:]
+        items.append(
+            {
+                "symbol": code,
+                "name": row.get("name") or "",
+                "last": _to_float(row.get("trade") or row.get("price")),
+                "pct_chg": _to_float(row.get("changepercent")),
+                "amount": _to_float(row.get("amount")),
+            }
+        )
+    return [item for item in items if item.get("symbol")]
+
+
+def records_to_items(records: List[SinaRecord]) -> List[Dict[str, Any]]:
+    return [dict(zip(SINA_COLUMNS, record)) for record in records]
+
+
+def _to_float(value: Any) -> Optional[float]:
+    try:
+        if value is None or value == "":
+            return None
+        return float(value)
+    except Exception:
+        return None
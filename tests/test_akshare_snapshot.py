@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+import time
+
+import numpy as np
+
+import app.connectors.akshare_snapshot as snapshot_module
+from app.core.config import Settings
+from app.storage.snapshot_cache import read_cache_header
+
+
+def _rows(prefix: str) -> list:
+    return [{"symbol": f"{prefix}{idx:04d}", "name": "X", "last": 1.0, "pct_chg": 0.1, "amount": 1.0} for idx in range(3)]
+
+
+def test_hedged_race_takes_first_complete_source(tmp_path, monkeypatch) -> None:
+    cancelled = []
+
+    async def slow_sina(settings):
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.append("sina_market")
+            raise
+        return _rows("60")
+
+    monkeypatch.setattr(snapshot_module, "fetch_sina_market_async", slow_sina)
+    monkeypatch.setattr(snapshot_module, "fetch_eastmoney_spot", lambda settings: _rows("00"))
+    settings = Settings(
+        market_snapshot_sources="sina_market,eastmoney_direct",
+        market_snapshot_cache_path=str(tmp_path / "cache.json"),
+        market_snapshot_hedge_enabled=True,
+        market_snapshot_hedge_delay_sec=0.05,
+    )
+    start = time.monotonic()
+    items, meta = snapshot_module._fetch_market_items(settings, symbols=[])
+    assert time.monotonic() - start < 2
+    assert items[0]["symbol"] == "000000"
+    assert meta["source"] == "eastmoney_direct"
+    assert meta["winner"] == "eastmoney_direct"
+    assert meta["fallback_used"] is True
+    assert meta["latency_ms"]["sina_market"] is None
+    assert meta["latency_ms"]["eastmoney_direct"] is not None
+    assert cancelled == ["sina_market"]
+
+
+def test_hedged_race_launches_next_source_on_failure(tmp_path, monkeypatch) -> None:
+    async def failing_sina(settings):
+        raise RuntimeError("sina_down")
+
+    monkeypatch.setattr(snapshot_module, "fetch_sina_market_async", failing_sina)
+    monkeypatch.setattr(snapshot_module, "fetch_quotes", lambda symbols, settings=None: _rows("30"))
+    monkeypatch.setattr(snapshot_module, "fetch_eastmoney_spot", lambda settings: _rows("00"))
+    settings = Settings(
+        market_snapshot_sources="sina_market,tencent,eastmoney_direct",
+        market_snapshot_cache_path=str(tmp_path / "cache.json"),
+        market_snapshot_hedge_enabled=True,
+        market_snapshot_hedge_delay_sec=10,
+    )
+    items, meta = snapshot_module._fetch_market_items(settings, symbols=["300000"])
+    assert meta["source"] == "eastmoney_direct"
+    assert meta["errors"] == {"sina_market": "sina_down"}
+    assert meta["error"] == "sina_down"
+
+
+def test_market_cache_is_binary_and_reads_legacy_json(tmp_path) -> None:
+    settings = Settings(market_snapshot_cache_path=str(tmp_path / "cache.bin"), sina_market_min_rows=0)
+    items = _rows("60")
+    items[0]["name"] = "浦发银行"
+    items[0]["pe_ttm"] = 6.5
+    snapshot_module._save_market_cache(settings, items, "eastmoney_direct")
+    header = read_cache_header(str(tmp_path / "cache.bin"))
+    assert header.rows == 3
+    assert header.source == "eastmoney_direct"
+    assert header.columns == ("last", "pct_chg", "amount", "pe_ttm")
+    loaded, ts = snapshot_module._load_market_cache(settings)
+    assert ts
+    assert loaded[0]["name"] == "浦发银行"
+    assert loaded[0]["pe_ttm"] == 6.5
+    assert loaded[1]["pe_ttm"] is None
+    assert loaded[2]["symbol"] == "600002"
+
+    # Loaded frames hold no map on the file, so the next save can replace it in place.
+    assert not any(isinstance(column, np.memmap) or isinstance(column.base, np.memmap) for column in loaded.columns.values())
+    snapshot_module._save_market_cache(settings, _rows("00"), "sina_market")
+    assert read_cache_header(str(tmp_path / "cache.bin")).source == "sina_market"
+
+    strict = Settings(market_snapshot_cache_path=str(tmp_path / "cache.bin"), sina_market_min_rows=10)
+    assert len(snapshot_module._load_market_cache(strict)[0]) == 0
+
+    legacy_path = tmp_path / "cache.json"
+    legacy_path.write_text(json.dumps({"ts": ts, "items": _rows("00")}), encoding="utf-8")
+    legacy = Settings(market_snapshot_cache_path=str(legacy_path), sina_market_min_rows=0)
+    assert [item["symbol"] for item in snapshot_module._load_market_cache(legacy)[0]] == [
+        "000000",
+        "000001",
+        "000002",
+    ]
+
+
+def test_truncated_cache_header_reads_as_no_cache(tmp_path) -> None:
+    path = tmp_path / "cache.bin"
+    settings = Settings(market_snapshot_cache_path=str(path), sina_market_min_rows=0)
+    snapshot_module._save_market_cache(settings, _rows("60"), "sina_market")
+    # Cut the file inside the column-name section that follows the fixed header.
+    path.write_bytes(path.read_bytes()[:40])
+    assert read_cache_header(str(path)) is None
+    assert len(snapshot_module._load_market_cache(settings)[0]) == 0
+
+
+def test_failed_cache_save_does_not_fail_the_fetch(tmp_path, monkeypatch) -> None:
+    def locked(path, items, source, ts=None):
+        raise PermissionError("cache file in use")
+
+    monkeypatch.setattr(snapshot_module, "write_snapshot_cache", locked)
+    monkeypatch.setattr(snapshot_module, "fetch_eastmoney_spot", lambda settings: _rows("00"))
+    settings = Settings(market_snapshot_cache_path=str(tmp_path / "cache.bin"))
+    frame, meta = snapshot_module._fetch_source(settings, "eastmoney_direct", [])
+    assert len(frame) == 3
+    assert meta["source"] == "eastmoney_direct"
+
+
+def test_hedged_race_losers_do_not_overwrite_the_winner_cache(tmp_path, monkeypatch) -> None:
+    loser_done = threading.Event()
+
+    def slow_eastmoney(settings):
+        time.sleep(0.3)
+        loser_done.set()
+        return _rows("00")
+
+    async def fast_sina(settings):
+        await asyncio.sleep(0.1)
+        return _rows("60")
+
+    monkeypatch.setattr(snapshot_module, "fetch_eastmoney_spot", slow_eastmoney)
+    monkeypatch.setattr(snapshot_module, "fetch_sina_market_async", fast_sina)
+    cache_path = tmp_path / "cache.bin"
+    settings = Settings(
+        market_snapshot_sources="eastmoney_direct,sina_market",
+        market_snapshot_cache_path=str(cache_path),
+        market_snapshot_hedge_enabled=True,
+        market_snapshot_hedge_delay_sec=0.01,
+    )
+    items, meta = snapshot_module._fetch_market_items(settings, symbols=[])
+    assert meta["winner"] == "sina_market"
+    assert read_cache_header(str(cache_path)).source == "sina_market"
+    # The executor thread of the losing source finishes after the race returned.
+    assert loser_done.wait(2)
+    time.sleep(0.05)
+    assert read_cache_header(str(cache_path)).source == "sina_market"
+
+
+def test_hedged_race_never_lets_the_disk_cache_beat_a_slow_live_source(tmp_path, monkeypatch) -> None:
+    async def slow_sina(settings):
+        await asyncio.sleep(0.3)
+        return _rows("60")
+
+    monkeypatch.setattr(snapshot_module, "fetch_sina_market_async", slow_sina)
+    cache_path = tmp_path / "cache.bin"
+    settings = Settings(
+        market_snapshot_cache_path=str(cache_path),
+        market_snapshot_hedge_enabled=True,
+        market_snapshot_hedge_delay_sec=0.05,
+        market_snapshot_adaptive_order=False,
+        sina_market_min_rows=0,
+    )
+    assert settings.market_snapshot_sources.startswith("sina_market,cache,")
+    snapshot_module._save_market_cache(settings, _rows("00"), "eastmoney_direct")
+    # Later live sources fail fast so the race only has Sina to wait for.
+    monkeypatch.setattr(snapshot_module, "_fetch_akshare_items", lambda settings: ([], "em"))
+    monkeypatch.setattr(snapshot_module, "fetch_eastmoney_spot", lambda settings: [])
+
+    items, meta = snapshot_module._fetch_market_items(settings, symbols=[])
+    assert meta["source"] == "sina_market"
+    assert items[0]["symbol"] == "600000"
+    assert read_cache_header(str(cache_path)).source == "sina_market"
+
+    async def down(settings):
+        raise RuntimeError("sina_down")
+
+    monkeypatch.setattr(snapshot_module, "fetch_sina_market_async", down)
+    items, meta = snapshot_module._fetch_market_items(settings, symbols=[])
+    assert (meta["source"], meta["winner"]) == ("cache", "cache")
+    assert meta["errors"]["sina_market"] == "sina_down"
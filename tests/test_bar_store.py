@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+import numpy as np
+
+from app.connectors import akshare_technicals
+from app.core.config import Settings
+from app.scheduler.trading_hours import last_session_close
+from app.storage.bar_store import BAR_DTYPE, BarStore, bars_from_columns, date_key
+
+
+class _Series(list):
+    def astype(self, _type):
+        return self
+
+    def to_numpy(self):
+        return np.array(self, dtype=float)
+
+
+class _HistFrame:
+    # Just enough of a DataFrame for _to_bars: Eastmoney-style headers, or Tencent's English ones.
+    def __init__(self, rows, keys=("日期", "收盘", "最高", "最低")):
+        self._data = {key: _Series(row[idx] for row in rows) for idx, key in enumerate(keys)}
+        self.columns = list(self._data)
+        self.empty = not rows
+
+    def __getitem__(self, key):
+        return self._data[key]
+
+    def __len__(self):
+        return len(next(iter(self._data.values())))
+
+
+class _FakeAk:
+    def __init__(self, closes):
+        self.closes = closes
+        self.calls = []
+        self.eastmoney_down = False
+        self.tx_calls = []
+
+    def stock_zh_a_hist(self, symbol, period, start_date, end_date, adjust):
+        self.calls.append(start_date)
+        if self.eastmoney_down:
+            raise RuntimeError("eastmoney_down")
+        rows = [(d, c, c + 0.5, c - 0.5) for d, c in self.closes.items() if date_key(d) >= int(start_date)]
+        return _HistFrame(rows)
+
+    def stock_zh_a_hist_tx(self, symbol, start_date, end_date, adjust, timeout):
+        # Tencent's qfq base differs from Eastmoney's, so its prices never match an Eastmoney anchor.
+        self.tx_calls.append(start_date)
+        rows = [(d, c * 0.95, c, c) for d, c in self.closes.items() if date_key(d) >= int(start_date)]
+        return _HistFrame(rows, ("date", "close", "high", "low"))
+
+
+def _bars(dates, closes):
+    return bars_from_columns(dates, closes, closes, closes, closes, [np.nan] * len(dates), [np.nan] * len(dates))
+
+
+def test_bar_store_round_trip_and_merge(tmp_path) -> None:
+    store = BarStore(str(tmp_path))
+    store.write("600000", _bars([20260105, 20260102], [10.1, 10.0]), 123.0, "akshare_hist")
+    bars, synced, upstream = store.read("600000")
+    assert bars["date"].tolist() == [20260102, 20260105]
+    assert synced == 123.0
+    assert upstream == "akshare_hist"
+    assert BAR_DTYPE.itemsize == 52
+
+    merged = store.merge("600000", bars, _bars([20260105, 20260106], [10.2, 10.3]), 456.0, "akshare_hist")
+    assert merged["date"].tolist() == [20260102, 20260105, 20260106]
+    assert merged["close"].tolist() == [10.0, 10.2, 10.3]
+    assert store.read("000001") == (None, 0.0, "")
+
+
+def test_last_session_close_skips_weekend() -> None:
+    # 2026-10-18 is a Sunday.
+    sunday = datetime.fromisoformat("2026-10-18T10:00:00+08:00")
+    assert last_session_close("Asia/Shanghai", sunday).isoformat() == "2026-10-16T15:00:00+08:00"
+
+
+def test_load_bars_fetches_only_missing_days(tmp_path) -> None:
+    settings = Settings(bar_store_dir=str(tmp_path), research_rate_limits="", akshare_research_timeout_sec=0)
+    ak = _FakeAk({"2026-01-02": 10.0, "2026-01-05": 10.1, "2026-01-06": 10.2})
+
+    first = akshare_technicals._load_bars(ak, settings, "600000")
+    assert first["date"].tolist() == [20260102, 20260105, 20260106]
+    # Synced after the last close: a second refresh is a pure local read.
+    akshare_technicals._load_bars(ak, settings, "600000")
+    assert ak.calls == ["19700101"]
+
+    store = BarStore(str(tmp_path))
+    store.write("600000", store.read("600000")[0], 0.0, "akshare_hist")
+    ak.closes["2026-01-07"] = 10.4
+    bars = akshare_technicals._load_bars(ak, settings, "600000")
+    assert ak.calls[-1] == "20260105"
+    assert bars["close"].tolist() == [10.0, 10.1, 10.2, 10.4]
+
+    # An ex-dividend day rescales qfq history: the anchor no longer matches, so refetch everything.
+    store.write("600000", bars, 0.0, "akshare_hist")
+    ak.closes = {day: close * 0.9 for day, close in ak.closes.items()}
+    bars = akshare_technicals._load_bars(ak, settings, "600000")
+    assert ak.calls[-2:] == ["20260106", "19700101"]
+    assert np.allclose(bars["close"], [9.0, 9.09, 9.18, 9.36])
+    assert last_session_close(settings.timezone).timestamp() <= store.read("600000")[1]
+
+
+def test_incremental_sync_stays_on_the_upstream_that_wrote_the_bars(tmp_path) -> None:
+    settings = Settings(
+        bar_store_dir=str(tmp_path),
+        research_rate_limits="",
+        akshare_research_timeout_sec=0,
+        research_retries=1,
+        akshare_backoff_sec=0,
+    )
+    store = BarStore(str(tmp_path))
+    ak = _FakeAk({"2026-01-02": 10.0, "2026-01-05": 10.1, "2026-01-06": 10.2})
+    akshare_technicals._load_bars(ak, settings, "600000")
+    assert store.read("600000")[2] == "akshare_hist"
+
+    # Eastmoney is down: the Tencent answer is never anchor-checked against Eastmoney bars,
+    # it replaces the series whole and the store now records Tencent.
+    store.write("600000", store.read("600000")[0], 0.0, "akshare_hist")
+    ak.eastmoney_down = True
+    bars = akshare_technicals._load_bars(ak, settings, "600000")
+    assert len(ak.tx_calls) == 1 and ak.tx_calls[0] != "20260105"
+    assert np.allclose(bars["close"], [9.5, 9.595, 9.69])
+    assert store.read("600000")[2] == "tencent_hist"
+
+    # Eastmoney is back, but the stored bars are Tencent's: sync incrementally from Tencent,
+    # no Eastmoney call and no full refetch.
+    store.write("600000", bars, 0.0, "tencent_hist")
+    ak.eastmoney_down = False
+    ak.closes["2026-01-07"] = 10.4
+    em_calls = len(ak.calls)
+    bars = akshare_technicals._load_bars(ak, settings, "600000")
+    assert len(ak.calls) == em_calls
+    assert ak.tx_calls[-1] == "20260105"
+    assert np.allclose(bars["close"], [9.5, 9.595, 9.69, 9.88])
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+from app.core.snapshot_frame import SnapshotFrame
+from app.indicators.breadth import breadth_lines, compute_breadth, prior_closes
+from app.indicators.limits import limit_flags, limit_prices
+from app.indicators.summary import compute_risk_notes
+from app.storage.market_history import MarketHistory
+
+
+def _market() -> SnapshotFrame:
+    return SnapshotFrame.from_items(
+        [
+            {"symbol": "600000", "name": "浦发银行", "last": 11.0, "prev_close": 10.0, "pct_chg": 10.0, "amount": 500.0},
+            {"symbol": "300750", "name": "宁德时代", "last": 12.0, "prev_close": 10.0, "pct_chg": 20.0, "amount": 300.0},
+            {"symbol": "600001", "name": "ST测试", "last": 9.5, "prev_close": 10.0, "pct_chg": -5.0, "amount": 100.0},
+            # No prev_close (Sina): 3.33 * 0.9 rounds to 3.00, derived from pct_chg.
+            {"symbol": "000002", "name": "万科A", "last": 3.0, "pct_chg": -9.91, "amount": 50.0},
+            {"symbol": "000004", "name": "平盘", "last": 5.0, "prev_close": 5.0, "pct_chg": 0.0, "amount": 50.0},
+            {"symbol": "000005", "name": "停牌", "last": None, "pct_chg": None, "amount": 0.0},
+        ]
+    )
+
+
+def test_limit_flags_are_board_aware() -> None:
+    at_up, at_down = limit_flags(_market())
+    assert at_up.tolist() == [True, True, False, False, False, False]
+    assert at_down.tolist() == [False, False, True, True, False, False]
+
+
+def test_limit_flags_need_the_exact_limit_without_prev_close() -> None:
+    frame = SnapshotFrame.from_items(
+        [
+            # One tick below the 2.20 limit; derived prev_close snaps to 2.00.
+            {"symbol": "600010", "name": "包钢股份", "last": 2.19, "pct_chg": 9.5},
+            {"symbol": "600011", "name": "低价股", "last": 2.20, "pct_chg": 10.0},
+            {"symbol": "600012", "name": "低价跌", "last": 1.81, "pct_chg": -9.5},
+            # 10.05 * 1.1 = 11.055 rounds half-up to 11.06 despite float error.
+            {"symbol": "600013", "name": "半分", "last": 11.06, "prev_close": 10.05, "pct_chg": 10.05},
+        ]
+    )
+    at_up, at_down = limit_flags(frame)
+    assert at_up.tolist() == [False, True, False, True]
+    assert at_down.tolist() == [False, False, False, False]
+    assert limit_prices(frame)[1].tolist() == [2.2, 2.2, 2.2, 11.06]
+    assert compute_breadth(frame)["limit_up"] == 2
+
+
+def test_compute_breadth_counts_and_histogram() -> None:
+    breadth = compute_breadth(_market(), top_n=2)
+
+    assert (breadth["total"], breadth["advancers"], breadth["decliners"], breadth["unchanged"]) == (5, 2, 2, 1)
+    assert breadth["advance_decline_ratio"] == 1.0
+    assert (breadth["limit_up"], breadth["limit_down"]) == (2, 2)
+    assert breadth["turnover_top_share"] == 0.8
+    histogram = {item["bucket"]: item["count"] for item in breadth["pct_histogram"]}
+    assert histogram == {"<-7%": 1, "-7~-5%": 0, "-5~-3%": 1, "-3~-1%": 0, "-1~1%": 1, "1~3%": 0, "3~5%": 0, "5~7%": 0, ">=7%": 2}
+    assert breadth["new_highs"] is None
+
+
+def test_new_highs_and_lows_use_prior_market_days(tmp_path) -> None:
+    history = MarketHistory(str(tmp_path))
+    market = _market()
+    for day, last in (("2026-01-05", 10.5), ("2026-01-06", 10.8)):
+        history.write_day(day, [{"symbol": s, "last": last} for s in market.symbols], 0.0)
+    # Today's own capture must not count as a prior day.
+    history.write_day("2026-01-07", market, 0.0)
+
+    assert prior_closes(history, market.symbols, 3, "2026-01-07") is None
+    prior = prior_closes(history, market.symbols, 2, "2026-01-07")
+    breadth = compute_breadth(market, prior)
+
+    assert prior.dates == ["2026-01-05", "2026-01-06"]
+    assert (breadth["new_high_low_days"], breadth["new_highs"], breadth["new_lows"]) == (2, 2, 3)
+    assert "2 日新高 2 / 2 日新低 3" in breadth_lines(breadth)
+
+
+def test_risk_notes_include_market_breadth() -> None:
+    breadth = {
+        "total": 100,
+        "advancers": 20,
+        "decliners": 75,
+        "limit_up": 5,
+        "limit_down": 30,
+        "turnover_top_n": 100,
+        "turnover_top_share": 0.1,
+        "new_highs": None,
+    }
+    notes = compute_risk_notes([{"symbol": "000001", "pct_chg": 0.5}], breadth)
+    assert notes == ["watchlist 整体波动可控", "全市场下跌家数占比偏高：75%", "跌停家数多于涨停：30 vs 5"]
@@ -1,6 +1,21 @@
 from __future__ import annotations
 
-from app.connectors.eastmoney_spot import normalize_eastmoney_rows, _cookie_from_headers
+import asyncio
+
+import httpx
+import pytest
+
+from app.connectors import eastmoney_spot
+from app.connectors.eastmoney_cookie import _cookie_from_headers, get_cookie_manager
+from app.connectors.eastmoney_spot import normalize_eastmoney_rows
+from app.core.config import Settings
+
+
+@pytest.fixture(autouse=True)
+def _fresh_cookie_manager():
+    get_cookie_manager().reset()
+    yield
+    get_cookie_manager().reset()
 
 
 def test_normalize_eastmoney_rows() -> None:
@@ -15,6 +30,19 @@ def test_normalize_eastmoney_rows() -> None:
     assert items[0]["last"] == 12.3
 
 
+def test_normalize_eastmoney_rows_keeps_extended_fields() -> None:
+    row = {"f12": "600000", "f14": "浦发银行", "f2": 8.1, "f17": 8.0, "f15": 8.2, "f16": 7.9, "f18": 8.0}
+    row.update({"f5": 1200.0, "f8": 0.5, "f10": 1.3, "f9": 4.8, "f115": 5.2, "f23": "-", "f20": 2.4e11, "f62": -3.5e6})
+    item = normalize_eastmoney_rows([row])[0]
+    assert item["open"] == 8.0
+    assert item["prev_close"] == 8.0
+    assert item["pe_ttm"] == 5.2
+    assert item["pb"] is None
+    assert item["total_mv"] == 2.4e11
+    assert item["float_mv"] is None
+    assert item["main_net_inflow"] == -3.5e6
+
+
 def test_cookie_from_headers() -> None:
     values = [
         "ab=1; Path=/; HttpOnly",
@@ -23,3 +51,143 @@ def test_cookie_from_headers() -> None:
     cookie = _cookie_from_headers(values)
     assert "ab=1" in cookie
     assert "cid=xyz" in cookie
+
+
+def test_fetch_eastmoney_spot_single_client_no_verify_roundtrip(tmp_path, monkeypatch) -> None:
+    requested = []
+    clients = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.host == "quote.example.com":
+            requested.append("cookie")
+            return httpx.Response(200, headers={"set-cookie": "qgqp=abc; Path=/"})
+        assert request.headers["cookie"] == "qgqp=abc"
+        page = int(request.url.params["pn"])
+        requested.append(page)
+        diff = [{"f12": f"{page:03d}{idx:03d}", "f14": "X"} for idx in range(2)]
+        return httpx.Response(200, json={"data": {"total": 5, "diff": diff[: 1 if page == 3 else 2]}})
+
+    def fake_client(proxy, timeout, max_connections, headers=None):
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        clients.append(client)
+        return client
+
+    monkeypatch.setattr(eastmoney_spot, "build_async_client", fake_client)
+    settings = Settings(
+        eastmoney_hosts="https://push2.example.com",
+        eastmoney_cookie_url="https://quote.example.com/",
+        eastmoney_cookie_path=str(tmp_path / "cookie.txt"),
+        eastmoney_page_size=2,
+        eastmoney_page_delay_sec=0.0,
+        eastmoney_concurrency=3,
+    )
+    rows = eastmoney_spot.fetch_eastmoney_spot(settings)
+    assert len(rows) == 5
+    assert len(clients) == 1
+    assert requested[0] == "cookie"
+    assert sorted(requested[1:]) == [1, 2, 3]
+
+
+def test_fetch_eastmoney_spot_rejects_empty_first_page(tmp_path, monkeypatch) -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json={"data": None})
+
+    monkeypatch.setattr(
+        eastmoney_spot,
+        "build_async_client",
+        lambda proxy, timeout, max_connections, headers=None: httpx.AsyncClient(
+            transport=httpx.MockTransport(handler)
+        ),
+    )
+    settings = Settings(
+        eastmoney_hosts="https://push2.example.com",
+        eastmoney_auto_cookie=False,
+        eastmoney_page_delay_sec=0.0,
+    )
+    with pytest.raises(RuntimeError, match="eastmoney_verify_failed"):
+        eastmoney_spot.fetch_eastmoney_spot(settings)
+
+
+def test_cookie_manager_reuses_cookie_and_refreshes_on_auth_failure(tmp_path, monkeypatch) -> None:
+    state = {"issued": 0, "valid": "qgqp=v1"}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.host == "quote.example.com":
+            state["issued"] += 1
+            return httpx.Response(200, headers={"set-cookie": f"qgqp=v{state['issued']}; Path=/"})
+        if request.headers.get("cookie") != state["valid"]:
+            return httpx.Response(403)
+        return httpx.Response(200, json={"data": {"total": 1, "diff": [{"f12": "000001", "f14": "A"}]}})
+
+    monkeypatch.setattr(
+        eastmoney_spot,
+        "build_async_client",
+        lambda proxy, timeout, max_connections, headers=None: httpx.AsyncClient(
+            transport=httpx.MockTransport(handler)
+        ),
+    )
+    settings = Settings(
+        eastmoney_hosts="https://push2.example.com",
+        eastmoney_cookie_url="https://quote.example.com/",
+        eastmoney_cookie_path=str(tmp_path / "cookie.txt"),
+        eastmoney_page_delay_sec=0.0,
+    )
+    assert len(eastmoney_spot.fetch_eastmoney_spot(settings)) == 1
+    assert len(eastmoney_spot.fetch_eastmoney_spot(settings)) == 1
+    assert state["issued"] == 1
+
+    # The server rotates the session: the next fetch sees a 403 and refreshes exactly once.
+    state["valid"] = "qgqp=v2"
+    assert len(eastmoney_spot.fetch_eastmoney_spot(settings)) == 1
+    assert state["issued"] == 2
+
+
+def test_cookie_manager_seeds_from_disk_once(tmp_path) -> None:
+    path = tmp_path / "cookie.txt"
+    path.write_text("qgqp=disk", encoding="utf-8")
+    settings = Settings(eastmoney_cookie_path=str(path), eastmoney_cookie_ttl_sec=3600)
+
+    async def _get() -> str:
+        async with httpx.AsyncClient(transport=httpx.MockTransport(lambda r: httpx.Response(500))) as client:
+            return await get_cookie_manager().get(client, settings)
+
+    assert asyncio.run(_get()) == "qgqp=disk"
+    path.unlink()
+    assert asyncio.run(_get()) == "qgqp=disk"
+
+
+def test_fetch_eastmoney_spot_fails_over_on_missing_middle_page(monkeypatch) -> None:
+    requested = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        page = int(request.url.params["pn"])
+        requested.append((request.url.host, page))
+        if request.url.host == "bad.example.com" and page == 3:
+            return httpx.Response(403)
+        diff = [{"f12": f"{page:03d}{idx:03d}", "f14": "X"} for idx in range(2)]
+        return httpx.Response(200, json={"data": {"total": 10, "diff": diff}})
+
+    monkeypatch.setattr(
+        eastmoney_spot,
+        "build_async_client",
+        lambda proxy, timeout, max_connections, headers=None: httpx.AsyncClient(
+            transport=httpx.MockTransport(handler)
+        ),
+    )
+    settings = Settings(
+        eastmoney_hosts="https://bad.example.com,https://good.example.com",
+        eastmoney_auto_cookie=False,
+        eastmoney_page_size=2,
+        eastmoney_page_delay_sec=0.0,
+        eastmoney_concurrency=3,
+        eastmoney_page_requeue=1,
+    )
+    rows = eastmoney_spot.fetch_eastmoney_spot(settings)
+    assert len(rows) == 10
+    # Page 3 of 5 was retried once on the first host, then the whole scan moved on.
+    assert requested.count(("bad.example.com", 3)) == 2
+    assert sorted(page for host, page in requested if host == "good.example.com") == [1, 2, 3, 4, 5]
+
+    settings = settings.model_copy(update={"eastmoney_hosts": "https://bad.example.com"})
+    with pytest.raises(RuntimeError, match="eastmoney_gaps:3"):
+        eastmoney_spot.fetch_eastmoney_spot(settings)
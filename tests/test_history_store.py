@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import json
+
+from app.indicators.history import get_latest_date, get_momentum, list_dates, update_history
+from app.storage.history_store import HistoryStore
+
+
+def test_update_history_appends_days_and_computes_momentum(tmp_path) -> None:
+    path = str(tmp_path / "history.db")
+    update_history(path, "2026-10-14", [{"symbol": "600000", "name": "浦发银行", "last": 10.0}])
+    update_history(path, "2026-10-15", [{"symbol": "600000", "name": "浦发银行", "last": 10.5}])
+    store = update_history(
+        path,
+        "2026-10-16",
+        [{"symbol": "600000", "name": "浦发银行", "last": 11.0}, {"symbol": "000001", "last": 5.0}],
+    )
+    # Same-day refresh replaces only that day.
+    store = update_history(path, "2026-10-16", [{"symbol": "600000", "name": "浦发银行", "last": 12.0}])
+
+    assert list_dates(store) == ["2026-10-14", "2026-10-15", "2026-10-16"]
+    assert get_latest_date(store) == "2026-10-16"
+    assert set(store.get_day("2026-10-16")) == {"600000"}
+    assert store.symbol_series("600000", limit=2) == [("2026-10-15", 10.5), ("2026-10-16", 12.0)]
+    result = get_momentum(store, 2)
+    assert result == [{"symbol": "600000", "name": "浦发银行", "momentum": 20.0, "from": "2026-10-14", "to": "2026-10-16"}]
+    assert get_momentum(store, 3) == []
+
+
+def test_store_migrates_legacy_json_once(tmp_path) -> None:
+    legacy = tmp_path / "watchlist_history.json"
+    legacy.write_text(
+        json.dumps(
+            {
+                "dates": {
+                    "2026-10-15": {"600000": {"symbol": "600000", "name": "浦发银行", "last": 10.0}},
+                    "2026-10-16": {"600000": {"symbol": "600000", "name": "浦发银行", "last": 11.0}},
+                }
+            }
+        ),
+        encoding="utf-8",
+    )
+    store = HistoryStore(str(legacy))
+    assert store.path.endswith("watchlist_history.db")
+    assert store.list_dates() == ["2026-10-15", "2026-10-16"]
+
+    legacy.write_text(json.dumps({"dates": {"2026-10-17": {"600000": {"last": 1.0}}}}), encoding="utf-8")
+    assert HistoryStore(str(legacy)).list_dates() == ["2026-10-15", "2026-10-16"]
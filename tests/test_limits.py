@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+
+import app.scheduler.service as service_module
+from app.core.config import Settings
+from app.core.snapshot_frame import SnapshotFrame
+from app.indicators.limits import LimitTracker, get_limit_tracker, scan_limits
+from app.scheduler.service import SchedulerService
+
+# 2026-10-16 10:00 Shanghai.
+TS = 1_792_116_000.0
+
+
+def _row(symbol, name, last, prev_close=10.0, high=None, low=None):
+    return {"symbol": symbol, "name": name, "last": last, "prev_close": prev_close, "high": high, "low": low}
+
+
+def test_scan_limits_by_board() -> None:
+    frame = SnapshotFrame.from_items(
+        [
+            _row("600000", "浦发银行", 11.0),
+            _row("300750", "宁德时代", 11.0, high=12.0),
+            _row("688981", "中芯国际", 8.0),
+            _row("000001", "*ST测试", 10.5),
+            _row("920001", "北交所", 13.0),
+            _row("600002", "普通", 10.2, high=10.5, low=9.0),
+            _row("600003", "停牌", None),
+        ]
+    )
+    scan = scan_limits(frame)
+    assert scan.limit_up.tolist()[:5] == [11.0, 12.0, 12.0, 10.5, 13.0]
+    assert scan.states().tolist() == [1, 2, -1, 1, 1, -2, 0]
+
+
+def test_tracker_emits_only_transitions() -> None:
+    tracker = LimitTracker("Asia/Shanghai")
+
+    sealed = tracker.update([_row("600000", "浦发银行", 11.0, high=11.0)], TS)
+    assert [(e.event_type, e.entity_id) for e in sealed] == [("limit_up_sealed", "600000")]
+    assert sealed[0].message == "600000 浦发银行 涨停封板 11.00"
+    assert tracker.update([_row("600000", "浦发银行", 11.0, high=11.0)], TS + 5) == []
+
+    # A slower scan stamped before the last poll must not flip the state back.
+    assert tracker.update([_row("600000", "浦发银行", 10.8, high=11.0)], TS + 1) == []
+    broken = tracker.update([_row("600000", "浦发银行", 10.8, high=11.0)], TS + 10)
+    assert [e.event_type for e in broken] == ["limit_up_broken"]
+    assert tracker.current()["opened_up"][0]["limit_price"] == 11.0
+
+    resealed = tracker.update([_row("600000", "浦发银行", 11.0, high=11.0)], TS + 15)
+    assert [e.event_type for e in resealed] == ["limit_up_sealed"]
+
+    # A new trading day starts from a clean slate.
+    next_day = tracker.update([_row("600000", "浦发银行", 11.0, high=11.0)], TS + 86400)
+    assert [e.event_type for e in next_day] == ["limit_up_sealed"]
+    assert tracker.current()["date"] == "2026-10-17"
+
+
+def test_tracker_ignores_near_limit_rows_without_prev_close() -> None:
+    tracker = LimitTracker("Asia/Shanghai")
+    # Sina-style rows: no prev_close/high/low, one tick off the 2.20 / 1.80 limits.
+    near = [
+        {"symbol": "600010", "name": "包钢股份", "last": 2.19, "pct_chg": 9.5},
+        {"symbol": "600011", "name": "低价跌", "last": 1.81, "pct_chg": -9.5},
+    ]
+    assert tracker.update(near, TS) == []
+    assert tracker.update(near, TS + 5) == []
+    assert tracker.current()["sealed_up"] == [] and tracker.current()["sealed_down"] == []
+
+    sealed = tracker.update([{"symbol": "600010", "name": "包钢股份", "last": 2.20, "pct_chg": 10.0}], TS + 10)
+    assert [(e.event_type, e.payload["prev_close"], e.payload["limit_price"]) for e in sealed] == [("limit_up_sealed", 2.0, 2.2)]
+
+
+def test_collect_snapshots_records_limit_events(tmp_path, monkeypatch) -> None:
+    watchlist = tmp_path / "watchlist.json"
+    watchlist.write_text(json.dumps([{"symbol": "600000"}]), encoding="utf-8")
+    monkeypatch.setattr(
+        service_module, "fetch_quotes", lambda symbols, settings=None: [_row("600000", "浦发银行", 9.0, low=9.0)]
+    )
+    settings = Settings(
+        db_path=str(tmp_path / "qw.db"),
+        watchlist_path=str(watchlist),
+        intraday_trading_hours_only=False,
+        tick_store_enabled=False,
+        notifier_kind="local",
+        outbox_dir=str(tmp_path / "outbox"),
+    )
+    get_limit_tracker(settings.timezone).clear()
+    service = SchedulerService(settings)
+    service._storage.init_db()
+    service.collect_snapshots()
+    service.collect_snapshots()
+
+    rows = sqlite3.connect(str(tmp_path / "qw.db")).execute("SELECT event_type, entity_id FROM events").fetchall()
+    assert rows == [("limit_down_sealed", "600000")]
+    get_limit_tracker(settings.timezone).clear()
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import math
+
+import numpy as np
+
+from app.indicators.history import backfill_history, get_momentum, update_history
+from app.storage.market_history import MarketHistory
+
+
+def test_market_history_round_trips_ticks_and_interns_symbols(tmp_path) -> None:
+    market = MarketHistory(str(tmp_path / "market"))
+    market.write_day("2026-10-15", [{"symbol": "600000", "last": 10.0, "pct_chg": 1.23}, {"symbol": "510300", "last": 3.912}], 0.0)
+    market.write_day("2026-10-16", [{"symbol": "000001", "last": 12.5}, {"symbol": "600000", "last": 10.5, "amount": 1.5e9}], 0.0)
+    # Re-running a day replaces that day only.
+    market.write_day("2026-10-16", [{"symbol": "000001", "last": 12.6}, {"symbol": "600000", "last": 11.0}], 0.0)
+
+    assert market.days() == ["2026-10-15", "2026-10-16"]
+    assert (tmp_path / "market" / "symbols.txt").read_text(encoding="utf-8").split() == ["600000", "510300", "000001"]
+    day = market.read_day("2026-10-15")
+    assert day["last"].tolist() == [10000, 3912]
+    assert day["pct_chg"][0] == 123
+
+    matrix = market.price_matrix(5, ["000001", "600000", "999999"])
+    assert matrix.dates == ["2026-10-15", "2026-10-16"]
+    assert math.isnan(matrix.prices[0, 0]) and matrix.prices[1, 0] == 12.6
+    assert matrix.prices[:, 1].tolist() == [10.0, 11.0]
+    assert all(math.isnan(v) for v in matrix.prices[:, 2])
+
+
+def test_read_day_does_not_hold_the_file(tmp_path) -> None:
+    market = MarketHistory(str(tmp_path / "market"))
+    market.write_day("2026-10-16", [{"symbol": "600000", "last": 10.0}], 0.0)
+    day = market.read_day("2026-10-16")
+    assert not isinstance(day, np.memmap)
+    # A same-day re-run can replace the file while an earlier read is still alive.
+    market.write_day("2026-10-16", [{"symbol": "600000", "last": 10.5}], 0.0)
+    assert day["last"].tolist() == [10000]
+    assert market.read_day("2026-10-16")["last"].tolist() == [10500]
+
+    path = tmp_path / "market" / "2026-10-16.bin"
+    path.write_bytes(path.read_bytes()[:-4])
+    assert market.read_day("2026-10-16") is None
+
+
+def test_new_watchlist_symbol_is_backfilled_from_market_history(tmp_path) -> None:
+    market = MarketHistory(str(tmp_path / "market"))
+    for date_key, price in (("2026-10-14", 8.0), ("2026-10-15", 9.0)):
+        market.write_day(date_key, [{"symbol": "300750", "last": price, "pct_chg": 1.0}], 0.0)
+
+    store = update_history(str(tmp_path / "history.db"), "2026-10-16", [{"symbol": "300750", "name": "宁德时代", "last": 10.0}])
+    assert backfill_history(store, market, ["300750"]) == 2
+    assert backfill_history(store, market, ["300750"]) == 0
+    assert get_momentum(store, 2)[0]["momentum"] == 25.0
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import time
+
+import numpy as np
+
+from app.indicators.momentum import compute_momentum, momentum_returns
+from app.storage.history_store import PriceMatrix
+
+
+def test_all_windows_in_one_pass_with_missing_prices() -> None:
+    prices = np.array(
+        [
+            [10.0, 20.0, np.nan],
+            [11.0, 0.0, 5.0],
+            [12.0, 18.0, 6.0],
+        ]
+    )
+    matrix = PriceMatrix(["d1", "d2", "d3"], ["A", "B", "C"], ["a", "b", "c"], prices)
+    result = compute_momentum(matrix, [1, 2, 5], top_n=2)
+    assert [row["symbol"] for row in result["1d"]] == ["C", "A"]
+    assert result["1d"][0] == {"symbol": "C", "name": "c", "momentum": 20.0, "from": "d2", "to": "d3"}
+    assert [(row["symbol"], row["momentum"]) for row in result["2d"]] == [("A", 20.0), ("B", -10.0)]
+    assert result["5d"] == []
+
+
+def test_full_market_matrix_matches_naive_top_n() -> None:
+    rng = np.random.default_rng(7)
+    prices = rng.uniform(5, 50, size=(61, 5000))
+    prices[rng.random(prices.shape) < 0.02] = np.nan
+    symbols = [f"{idx:06d}" for idx in range(5000)]
+    matrix = PriceMatrix([f"d{idx:02d}" for idx in range(61)], symbols, [""] * 5000, prices)
+
+    start = time.perf_counter()
+    result = compute_momentum(matrix, [5, 20, 60], top_n=10)
+    assert time.perf_counter() - start < 0.5
+
+    returns = momentum_returns(prices, [20])[0]
+    expected = sorted((v, s) for v, s in zip(returns, symbols) if not np.isnan(v))[::-1][:10]
+    assert [row["symbol"] for row in result["20d"]] == [s for _, s in expected]
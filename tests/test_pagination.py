@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import asyncio
+
+from app.connectors.pagination import scan_pages
+
+
+def _run(fetch, **kwargs):
+    return asyncio.run(scan_pages(fetch, **kwargs))
+
+
+def test_scan_pages_stops_at_short_page() -> None:
+    requested = []
+
+    async def fetch(page: int):
+        requested.append(page)
+        await asyncio.sleep(0.001 * page)
+        if page < 3:
+            return [page] * 10, None
+        if page == 3:
+            return [page] * 4, None
+        return [], None
+
+    pages, errors, last_page = _run(fetch, page_size=10, max_pages=50, window=4)
+    assert last_page == 3
+    assert sorted(pages) == [1, 2, 3]
+    assert not errors
+    assert max(requested) <= 3 + 4
+
+
+def test_scan_pages_uses_reported_total() -> None:
+    requested = []
+
+    async def fetch(page: int):
+        requested.append(page)
+        return [page] * 10, 25
+
+    pages, errors, last_page = _run(fetch, page_size=10, max_pages=50, window=4, probe_first=True)
+    assert last_page == 3
+    assert requested[0] == 1
+    assert sorted(requested) == [1, 2, 3]
+    assert sorted(pages) == [1, 2, 3]
+
+
+def test_scan_pages_collects_errors() -> None:
+    async def fetch(page: int):
+        if page == 2:
+            raise RuntimeError("boom")
+        return [page] * 10, 30
+
+    pages, errors, last_page = _run(fetch, page_size=10, max_pages=50, window=2, total_rows=30)
+    assert last_page == 3
+    assert sorted(pages) == [1, 3]
+    assert list(errors) == [2]
+
+
+def test_scan_pages_requeues_failed_pages() -> None:
+    calls = {}
+
+    async def fetch(page: int):
+        calls[page] = calls.get(page, 0) + 1
+        if page == 2 and calls[page] < 3:
+            raise RuntimeError("flaky")
+        return [page] * 10, 30
+
+    pages, errors, last_page = _run(fetch, page_size=10, max_pages=50, window=2, requeue=2)
+    assert sorted(pages) == [1, 2, 3]
+    assert not errors
+    assert calls == {1: 1, 2: 3, 3: 1}
@@ -18,6 +18,7 @@ def test_post_close_refresh_flow(tmp_path, monkeypatch) -> None:
     os.environ["QW_WATCHLIST_PATH"] = str(tmp_path / "watchlist.json")
     os.environ["QW_REPORT_PARAMS_PATH"] = str(tmp_path / "params.json")
     os.environ["QW_WATCHLIST_HISTORY_PATH"] = str(tmp_path / "history.json")
+    os.environ["QW_MARKET_HISTORY_DIR"] = str(tmp_path / "market_history")
     get_settings.cache_clear()
 
     import app.api.routes.reports as reports_module
@@ -36,6 +37,9 @@ def test_post_close_refresh_flow(tmp_path, monkeypatch) -> None:
         assert resp.status_code == 200
         status = client.get("/reports/post-close/refresh/status")
         assert status.status_code == 200
+        details = status.json()["status"]
+        assert details["state"] == "success"
+        assert details["snapshot_duration_ms"] == details["stage_timings_ms"]["snapshot"]
         data_resp = client.get("/reports/post-close/data")
         assert data_resp.status_code == 200
         report_resp = client.get("/reports/post-close")
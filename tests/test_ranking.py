@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import os
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+from app.api.main import app
+from app.core.boards import board_of, is_st
+from app.core.config import Settings, get_settings
+from app.core.snapshot_frame import SnapshotFrame
+from app.indicators.ranking import GAINERS, LOSERS, TURNOVER, RankFilter, rank_frame, ranking_filter, top_bottom_indices
+from app.storage.quote_table import get_quote_table
+
+
+def _market() -> SnapshotFrame:
+    return SnapshotFrame.from_items(
+        [
+            {"symbol": "600000", "name": "浦发银行", "last": 10.0, "pct_chg": 1.5, "amount": 300.0},
+            {"symbol": "000001", "name": "平安银行", "last": 12.0, "pct_chg": None, "amount": 500.0},
+            {"symbol": "300750", "name": "宁德时代", "last": 200.0, "pct_chg": 9.0, "amount": 900.0},
+            {"symbol": "600001", "name": "*ST 退市", "last": 1.0, "pct_chg": 5.0, "amount": 10.0},
+            {"symbol": "830799", "name": "艾融软件", "last": 30.0, "pct_chg": -8.0, "amount": 50.0},
+            {"symbol": "000002", "name": "万科A", "last": 8.0, "pct_chg": 0.0, "amount": 0.0},
+        ]
+    )
+
+
+def test_rank_frame_builds_top_and_bottom_lists_with_filters() -> None:
+    market = _market()
+    ranked = rank_frame(market, (GAINERS, LOSERS, TURNOVER), 2)
+    assert ranked["top_gainers"].symbols == ["300750", "600001"]
+    assert ranked["top_losers"].symbols == ["830799", "000002"]
+    assert ranked["top_turnover"].symbols == ["300750", "000001"]
+
+    rank_filter = RankFilter(exclude_st=True, exclude_suspended=True, exclude_boards=frozenset({"chinext", "bse"}))
+    ranked = rank_frame(market, (GAINERS, LOSERS), 3, rank_filter)
+    assert ranked["top_gainers"].symbols == ["600000"]
+    assert ranked["top_losers"].symbols == ["600000"]
+
+
+def test_top_bottom_matches_full_sort() -> None:
+    rng = np.random.default_rng(3)
+    values = rng.integers(-50, 50, size=5000).astype(float)
+    top, bottom = top_bottom_indices(values, 20)
+    assert top.tolist() == np.argsort(-values, kind="stable")[:20].tolist()
+    assert bottom.tolist() == np.argsort(values, kind="stable")[:20].tolist()
+
+
+def test_board_of() -> None:
+    assert [board_of(s) for s in ("600519", "000001", "300750", "688981", "830799", "920001", "510300")] == [
+        "sh_main",
+        "sz_main",
+        "chinext",
+        "star",
+        "bse",
+        "bse",
+        "other",
+    ]
+
+
+def test_is_st_matches_only_the_name_prefix() -> None:
+    assert [is_st(name) for name in ("ST中天", "*ST海润", "S*ST前锋", "SST华新", "＊ＳＴ测试", "st康美")] == [True] * 6
+    assert [is_st(name) for name in ("华夏ST", "STAR科创ETF", "中证STAR50", "平安银行", "")] == [False] * 5
+
+
+def test_default_ranking_filter_keeps_suspended_names() -> None:
+    rank_filter = ranking_filter(Settings(_env_file=None))
+    assert not rank_filter.exclude_suspended
+    assert "000002" in rank_frame(_market(), (LOSERS,), 3, rank_filter)["top_losers"].symbols
+
+
+def test_rankings_api_uses_quote_table() -> None:
+    os.environ["QW_DISABLE_SCHEDULER"] = "true"
+    get_settings.cache_clear()
+    get_quote_table().clear()
+    get_quote_table().update(_market().to_items(), "test", 1.0)
+    with TestClient(app) as client:
+        resp = client.get("/quotes/rankings", params={"k": 1, "exclude_boards": "chinext"})
+        assert resp.status_code == 200
+        assert resp.json()["rankings"]["top_gainers"][0]["symbol"] == "600001"
+        assert client.get("/quotes/rankings", params={"exclude_boards": "nasdaq"}).status_code == 400
+    get_quote_table().clear()
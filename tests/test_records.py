@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import json
+import math
+import sqlite3
+from pathlib import Path
+
+from app.core.records import EventRecord, IndicatorRecord, SnapshotRecord, snapshot_records
+from app.core.snapshot_frame import SnapshotFrame
+from app.storage.quote_table import LatestQuoteTable
+from app.storage.sqlite import SqliteStorage
+
+ITEMS = [
+    {"symbol": "600000", "name": "浦发银行", "last": 10.5, "pct_chg": 1.2, "amount": 1.0e8, "open": 10.4},
+    {"symbol": "000001", "name": "平安银行", "last": None, "pct_chg": None, "amount": 0.0},
+    {"symbol": "", "name": "bad"},
+]
+
+
+def test_snapshot_records_from_items_and_frame_agree() -> None:
+    from_items = [record.to_dict() for record in snapshot_records(ITEMS, 5.0, "test")]
+    from_frame = [record.to_dict() for record in snapshot_records(SnapshotFrame.from_items(ITEMS), 5.0, "test")]
+
+    assert from_items == from_frame
+    assert from_items[0] == {
+        "symbol": "600000",
+        "name": "浦发银行",
+        "last": 10.5,
+        "pct_chg": 1.2,
+        "volume": None,
+        "amount": 1.0e8,
+        "open": 10.4,
+        "source": "test",
+        "updated_at": 5.0,
+    }
+    assert from_items[1]["last"] is None
+
+
+def test_record_to_model_at_api_boundary() -> None:
+    model = SnapshotRecord.from_item(ITEMS[1], 0.0, "sina").to_model()
+    assert model.ts.year == 1970
+    assert math.isnan(model.last)
+    assert model.extra == {"name": "平安银行", "source": "sina"}
+
+    indicator = IndicatorRecord(0.0, "symbol", "600000", "momentum", 0.05, "5d").to_model()
+    assert indicator.window == "5d"
+
+
+def test_quote_table_stores_records() -> None:
+    table = LatestQuoteTable()
+    assert table.update(ITEMS, "test", 1.0) == 2
+    assert table.update(SnapshotFrame.from_items(ITEMS[:1]), "older", 0.5) == 0
+    assert table.get(["600000"])[0]["source"] == "test"
+    assert table.stats() == {"rows": 2, "sources": {"test": 2}, "newest_ts": 1.0}
+
+
+def test_record_events_bulk_insert(tmp_path: Path) -> None:
+    db_path = tmp_path / "qw.db"
+    storage = SqliteStorage(str(db_path))
+    storage.init_db()
+    records = [
+        EventRecord(0.0, "limit_up", "symbol", symbol, "hit", f"limit_up:{symbol}", payload={"pct": 10.0})
+        for symbol in ("600000", "000001")
+    ]
+
+    assert storage.record_events(records) == 2
+    assert storage.record_events([]) == 0
+    rows = sqlite3.connect(str(db_path)).execute("SELECT ts, entity_id, payload FROM events ORDER BY id").fetchall()
+    assert [row[1] for row in rows] == ["600000", "000001"]
+    assert rows[0][0] == "1970-01-01T00:00:00+00:00"
+    assert json.loads(rows[0][2]) == {"pct": 10.0}
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import itertools
+import json
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from app.core.config import Settings
+from app.core.snapshot_frame import SnapshotFrame
+from app.reports import refresh_pipeline
+from app.reports.refresh_pipeline import RefreshRun, StageMemo
+from app.storage.market_history import get_market_history
+from app.storage.snapshot_memory import get_snapshot_memory
+
+
+def _settings(tmp_path) -> Settings:
+    watchlist = tmp_path / "watchlist.json"
+    watchlist.write_text(json.dumps([{"symbol": "000001", "name": "平安银行"}]), encoding="utf-8")
+    return Settings(
+        watchlist_path=str(watchlist),
+        report_params_path=str(tmp_path / "params.json"),
+        watchlist_history_path=str(tmp_path / "history.json"),
+        morning_brief_data_path=str(tmp_path / "brief.json"),
+        watchlist_fundamentals_path=str(tmp_path / "fundamentals.json"),
+        watchlist_technicals_path=str(tmp_path / "technicals.json"),
+        market_snapshot_cache_path=str(tmp_path / "market.bin"),
+        market_history_dir=str(tmp_path / "market_history"),
+    )
+
+
+def _memory_fetcher(rows):
+    # Goes through the process-wide snapshot memory like fetch_market_snapshot, so the
+    # returned meta carries per-call timing keys (latency_ms, memory_age_sec).
+    latency = itertools.count(10)
+
+    def _pull():
+        return SnapshotFrame.from_items(rows), {"source": "sina_market", "fallback_used": False, "latency_ms": next(latency)}
+
+    def _fetch(symbols, top_n):
+        items, meta = get_snapshot_memory().fetch(_pull, symbols, 60.0)
+        watchlist = [row for row in items.to_items() if row["symbol"] in symbols]
+        return {"watchlist": watchlist, "top_gainers": [], "top_turnover": [], "meta": meta}
+
+    return _fetch
+
+
+def test_post_close_reuses_stages_from_morning_run(tmp_path) -> None:
+    settings = _settings(tmp_path)
+    memo = StageMemo()
+    get_snapshot_memory().clear()
+    rows = [{"symbol": "000001", "name": "", "last": 10.0, "pct_chg": 1.5, "amount": 100.0}]
+
+    morning = RefreshRun(settings, _memory_fetcher(rows), memo)
+    enriched, indicators = morning.prepare()
+    payload = morning.render_morning(enriched, indicators)
+    assert enriched["watchlist"][0]["name"] == "平安银行"
+    assert "source: sina_market" in payload["notes"]
+    assert payload["top_gainers"][0]["symbol"] == "000001"
+    assert morning.reused == []
+    assert set(morning.timings_ms) == {"snapshot", "enrich", "history", "breadth", "indicators", "render"}
+
+    # Served from memory: the meta now has memory_age_sec, which must not change the fingerprint.
+    fetch = _memory_fetcher(rows)
+    assert "memory_age_sec" in fetch(["000001"], 10)["meta"]
+    post_close = RefreshRun(settings, fetch, memo)
+    enriched, indicators = post_close.prepare()
+    payload = post_close.render_post_close(enriched, indicators)
+    assert post_close.reused == ["enrich", "history", "indicators"]
+    assert payload["watchlist"][0]["name"] == "平安银行"
+    assert "momentum" in payload["indicators"]
+
+    get_snapshot_memory().clear()
+    moved = [{**rows[0], "pct_chg": -2.0}]
+    later = RefreshRun(settings, _memory_fetcher(moved), memo)
+    later.render_post_close(*later.prepare())
+    assert later.reused == []
+    get_snapshot_memory().clear()
+
+
+def test_research_stage_fetches_once_per_day(tmp_path) -> None:
+    settings = _settings(tmp_path)
+    memo = StageMemo()
+    calls = []
+
+    def fake_fundamentals(symbols):
+        calls.append(list(symbols))
+        return [{"symbol": s} for s in symbols]
+
+    for _ in range(2):
+        run = RefreshRun(settings, lambda symbols, top_n: {}, memo)
+        run.research(["000001"], fake_fundamentals, lambda symbols: [])
+    assert calls == [["000001"]]
+    assert json.loads((tmp_path / "fundamentals.json").read_text(encoding="utf-8"))["items"] == [{"symbol": "000001"}]
+
+
+def test_research_stage_retries_after_a_failed_symbol(tmp_path) -> None:
+    settings = _settings(tmp_path)
+    memo = StageMemo()
+    calls = []
+
+    def flaky_technicals(symbols):
+        calls.append(list(symbols))
+        return [{"symbol": s, "trend": "NA", "fetch_failed": True} if len(calls) == 1 else {"symbol": s, "trend": "up"} for s in symbols]
+
+    for _ in range(3):
+        run = RefreshRun(settings, lambda symbols, top_n: {}, memo)
+        _, technicals = run.research(["000001"], lambda symbols: [], flaky_technicals)
+    # The failed first pass is not memoized; the second, complete one is.
+    assert calls == [["000001"], ["000001"]]
+    assert technicals == [{"symbol": "000001", "trend": "up"}]
+
+
+def test_capture_market_only_stores_a_fresh_session_close(tmp_path, monkeypatch) -> None:
+    settings = _settings(tmp_path)
+    get_snapshot_memory().clear()
+    rows = [{"symbol": "600000", "last": 10.0}, {"symbol": "000001", "last": 12.0}]
+    get_snapshot_memory().fetch(lambda: (SnapshotFrame.from_items(rows), {"source": "sina_market"}), [], 60.0)
+    history = get_market_history(settings.market_history_dir)
+    history.write_day("2026-10-16", rows, 0.0)
+
+    def run_on(date_key, session_close):
+        monkeypatch.setattr(refresh_pipeline, "last_session_close", lambda tz: datetime.fromisoformat(f"{session_close}T15:00:00"))
+        run = RefreshRun(settings, lambda symbols, top_n: {})
+        run.date = date_key
+        return run.capture_market()
+
+    # Saturday: the last close is Friday's, so nothing is written under Saturday's date.
+    assert run_on("2026-10-17", "2026-10-16") == 0
+    # A weekday holiday replays Friday's closes unchanged.
+    assert run_on("2026-10-19", "2026-10-19") == 0
+    assert history.days() == ["2026-10-16"]
+
+    get_snapshot_memory().clear()
+    moved = [{"symbol": "600000", "last": 10.1}, {"symbol": "000001", "last": 12.0}]
+    get_snapshot_memory().fetch(lambda: (SnapshotFrame.from_items(moved), {"source": "sina_market"}), [], 60.0)
+    assert run_on("2026-10-19", "2026-10-19") == 2
+    assert history.days() == ["2026-10-16", "2026-10-19"]
+    get_snapshot_memory().clear()
+
+
+def test_run_date_follows_the_market_timezone(tmp_path) -> None:
+    # UTC+14 and UTC-12 never share a calendar day, so a server-local date matches at most one.
+    for tz in ("Pacific/Kiritimati", "Etc/GMT+12"):
+        settings = _settings(tmp_path).model_copy(update={"timezone": tz})
+        assert RefreshRun(settings, lambda symbols, top_n: {}).date == datetime.now(ZoneInfo(tz)).strftime("%Y-%m-%d")
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+
+import pytest
+
+from app.connectors.research_executor import RateLimiter, map_ordered, parse_rate_limits
+from app.core.config import Settings
+from app.reports.refresh_pipeline import RefreshRun, StageMemo
+
+
+def test_parse_rate_limits() -> None:
+    assert parse_rate_limits("akshare_value=4, akshare_hist=2.5,") == {"akshare_value": 4.0, "akshare_hist": 2.5}
+    with pytest.raises(RuntimeError, match="research_rate_limit_invalid"):
+        parse_rate_limits("akshare_value")
+
+
+def test_rate_limiter_spaces_calls() -> None:
+    limiter = RateLimiter(50.0, burst=1)
+    start = time.monotonic()
+    for _ in range(5):
+        limiter.acquire()
+    assert time.monotonic() - start >= 0.07
+
+
+def test_map_ordered_runs_concurrently_and_keeps_order() -> None:
+    def slow(value: int) -> int:
+        time.sleep(0.05)
+        return value * 2
+
+    start = time.monotonic()
+    assert map_ordered(slow, [1, 2, 3, 4], max_workers=4) == [2, 4, 6, 8]
+    assert time.monotonic() - start < 0.15
+
+
+def test_research_symbols_follow_priority_and_cap(tmp_path) -> None:
+    watchlist = tmp_path / "watchlist.json"
+    items = [
+        {"symbol": "000001"},
+        {"symbol": "600519", "priority": 5},
+        {"symbol": "000063", "enabled": False},
+        {"symbol": "300750", "priority": 1},
+        {"symbol": "002281"},
+    ]
+    watchlist.write_text(json.dumps(items), encoding="utf-8")
+    settings = Settings(
+        watchlist_path=str(watchlist),
+        report_params_path=str(tmp_path / "params.json"),
+        priority_symbols="002281",
+        research_max_symbols=3,
+    )
+    run = RefreshRun(settings, lambda symbols, top_n: {}, StageMemo())
+    assert run.research_symbols() == ["002281", "600519", "300750"]
+
+
+def test_research_runs_both_kinds_in_parallel(tmp_path) -> None:
+    settings = Settings(
+        watchlist_path=str(tmp_path / "watchlist.json"),
+        report_params_path=str(tmp_path / "params.json"),
+        watchlist_fundamentals_path=str(tmp_path / "fundamentals.json"),
+        watchlist_technicals_path=str(tmp_path / "technicals.json"),
+    )
+    technicals_started = threading.Event()
+
+    def fundamentals(symbols):
+        # Only finishes if technicals is running at the same time.
+        assert technicals_started.wait(timeout=2)
+        return [{"symbol": s} for s in symbols]
+
+    def technicals(symbols):
+        technicals_started.set()
+        return [{"symbol": s, "trend": "UP"} for s in symbols]
+
+    run = RefreshRun(settings, lambda symbols, top_n: {}, StageMemo())
+    result = run.research(["000001"], fundamentals, technicals)
+    assert result == ([{"symbol": "000001"}], [{"symbol": "000001", "trend": "UP"}])
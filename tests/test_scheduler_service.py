@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import json
+from datetime import datetime, timezone
+
+import app.scheduler.service as service_module
+from app.core.config import Settings
+from app.scheduler.service import SchedulerService
+from app.scheduler.trading_hours import is_trading_time
+from app.storage.quote_table import LatestQuoteTable, get_quote_table
+
+
+def test_collect_snapshots_polls_watchlist_and_priority_only(tmp_path, monkeypatch) -> None:
+    watchlist = tmp_path / "watchlist.json"
+    watchlist.write_text(json.dumps([{"symbol": "600000"}, {"symbol": "000001"}]), encoding="utf-8")
+    calls = []
+
+    def fake_quotes(symbols, settings=None):
+        calls.append(list(symbols))
+        return [{"symbol": s, "last": 1.0, "amount": 2.0} for s in symbols]
+
+    monkeypatch.setattr(service_module, "fetch_quotes", fake_quotes)
+    settings = Settings(
+        db_path=str(tmp_path / "qw.db"),
+        watchlist_path=str(watchlist),
+        priority_symbols="300750,600000",
+        intraday_trading_hours_only=False,
+        tick_store_dir=str(tmp_path / "ticks"),
+        notifier_kind="local",
+        outbox_dir=str(tmp_path / "outbox"),
+    )
+    get_quote_table().clear()
+    SchedulerService(settings).collect_snapshots()
+    assert calls == [["300750", "600000", "000001"]]
+    rows = get_quote_table().get(["000001", "999999"])
+    assert [row["symbol"] for row in rows] == ["000001"]
+    assert rows[0]["source"] == "tencent"
+    get_quote_table().clear()
+
+
+def test_quote_table_keeps_fresher_fast_path_rows() -> None:
+    table = LatestQuoteTable()
+    table.update([{"symbol": "600000", "last": 10.2}], "tencent", ts=200.0)
+    table.update([{"symbol": "600000", "last": 10.0}, {"symbol": "000001", "last": 5.0}], "sina_market", ts=150.0)
+    assert table.get(["600000"])[0]["last"] == 10.2
+    assert table.stats()["sources"] == {"tencent": 1, "sina_market": 1}
+
+
+def test_is_trading_time() -> None:
+    tz = "Asia/Shanghai"
+    # 2026-10-16 is a Friday; 01:30 UTC is 09:30 in Shanghai.
+    assert is_trading_time(tz, datetime(2026, 10, 16, 1, 30, tzinfo=timezone.utc))
+    assert not is_trading_time(tz, datetime(2026, 10, 16, 4, 0, tzinfo=timezone.utc))
+    assert not is_trading_time(tz, datetime(2026, 10, 17, 1, 30, tzinfo=timezone.utc))
+
+
+def test_scan_market_stamps_cache_rows_with_their_cache_time(tmp_path, monkeypatch) -> None:
+    def fake_market(settings, symbols, max_age_sec=None):
+        items = [{"symbol": "600000", "last": 9.0}, {"symbol": "000001", "last": 5.0}]
+        return items, {"source": "cache", "fallback_used": True, "cache_ts": "2026-10-15T07:00:00+00:00"}
+
+    monkeypatch.setattr(service_module, "get_market_items", fake_market)
+    settings = Settings(
+        db_path=str(tmp_path / "qw.db"),
+        watchlist_path=str(tmp_path / "watchlist.json"),
+        intraday_trading_hours_only=False,
+        tick_store_dir=str(tmp_path / "ticks"),
+        notifier_kind="local",
+        outbox_dir=str(tmp_path / "outbox"),
+    )
+    table = get_quote_table()
+    table.clear()
+    # An older fast-path quote, but still newer than the cache file.
+    table.update([{"symbol": "600000", "last": 10.2}], "tencent", ts=datetime(2026, 10, 15, 8, tzinfo=timezone.utc).timestamp())
+    service = SchedulerService(settings)
+    service._storage.init_db()
+    service.scan_market()
+    rows = {row["symbol"]: row for row in table.get()}
+    assert rows["600000"]["last"] == 10.2
+    assert rows["000001"]["source"] == "cache"
+    assert rows["000001"]["updated_at"] == datetime(2026, 10, 15, 7, tzinfo=timezone.utc).timestamp()
+    table.clear()
@@ -1,11 +1,145 @@
 from __future__ import annotations
 
-from app.connectors.sina_market import _parse_sina_text
+from pathlib import Path
+
+import httpx
+import pytest
+
+from app.connectors import sina_market
+from app.core.config import Settings
+from scripts.sina_reference import normalize_sina_rows, parse_sina_text, records_to_items
 
 
 def test_parse_sina_text() -> None:
     raw = '[{symbol:"sh600000",code:"600000",name:"浦发银行",trade:"11.99",changepercent:"0.33",amount:"12345"}]'
-    items = _parse_sina_text(raw)
+    items = parse_sina_text(raw)
     assert items
     assert items[0]["symbol"] == "sh600000"
     assert items[0]["code"] == "600000"
+
+
+def _page_payload(page: int, size: int) -> str:
+    rows = []
+    for idx in range(size):
+        code = f"{600000 + (page - 1) * 100 + idx}"
+        rows.append(
+            f'{{symbol:"sh{code}",code:"{code}",name:"测试{code}",trade:"10.00",'
+            f'changepercent:"1.00",amount:"1000"}}'
+        )
+    return "[" + ",".join(rows) + "]"
+
+
+def _mock_market(monkeypatch, pages: dict, count: int | None = None, failures: dict | None = None) -> list:
+    requested: list = []
+    clients: list = []
+    failures = dict(failures or {})
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("getHQNodeStockCount"):
+            if count is None:
+                return httpx.Response(404)
+            return httpx.Response(200, text=f'"{count}"')
+        page = int(request.url.params["page"])
+        requested.append(page)
+        if failures.get(page):
+            failures[page] -= 1
+            return httpx.Response(502)
+        return httpx.Response(200, text=pages.get(page, "null"))
+
+    def fake_build_client(proxy, timeout, concurrency):
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        clients.append(client)
+        return client
+
+    monkeypatch.setattr(sina_market, "_build_client", fake_build_client)
+    return [requested, clients]
+
+
+def _settings(**overrides) -> Settings:
+    values = {
+        "sina_market_min_rows": 0,
+        "sina_market_max_pages": 5,
+        "sina_market_page_delay_sec": 0.0,
+        "sina_market_backoff_sec": 0.0,
+        "http_proxy": None,
+        "https_proxy": None,
+    }
+    values.update(overrides)
+    return Settings(**values)
+
+
+def test_fetch_sina_market_concurrent_shares_client(monkeypatch) -> None:
+    pages = {1: _page_payload(1, 100), 2: _page_payload(2, 100), 3: _page_payload(3, 40)}
+    requested, clients = _mock_market(monkeypatch, pages)
+    rows = sina_market.fetch_sina_market(_settings(sina_market_concurrency=3))
+    assert len(rows) == 240
+    assert rows[0]["symbol"] == "600000"
+    assert len(clients) == 1
+    assert {1, 2, 3} <= set(requested)
+
+
+def test_fetch_sina_market_sequential(monkeypatch) -> None:
+    pages = {1: _page_payload(1, 100), 2: _page_payload(2, 10)}
+    requested, clients = _mock_market(monkeypatch, pages)
+    rows = sina_market.fetch_sina_market(_settings(sina_market_concurrency=1))
+    assert len(rows) == 110
+    assert requested == [1, 2]
+    assert len(clients) == 1
+
+
+def test_fetch_sina_market_stops_at_probed_count(monkeypatch) -> None:
+    pages = {page: _page_payload(page, 100) for page in range(1, 6)}
+    requested, _ = _mock_market(monkeypatch, pages, count=200)
+    rows = sina_market.fetch_sina_market(_settings(sina_market_concurrency=2, sina_market_max_pages=20))
+    assert len(rows) == 200
+    assert max(requested) <= 4
+
+
+def test_fetch_sina_market_requeues_only_failed_page(monkeypatch) -> None:
+    pages = {page: _page_payload(page, 100) for page in range(1, 4)}
+    pages[4] = _page_payload(4, 30)
+    requested, _ = _mock_market(monkeypatch, pages, count=330, failures={2: 2})
+    settings = _settings(sina_market_concurrency=2, sina_market_retries=1, sina_market_page_requeue=2)
+    rows = sina_market.fetch_sina_market(settings)
+    assert len(rows) == 330
+    assert requested.count(2) == 3
+    assert requested.count(3) == 1
+
+
+def test_fetch_sina_market_rejects_gaps(monkeypatch) -> None:
+    pages = {page: _page_payload(page, 100) for page in range(1, 4)}
+    _mock_market(monkeypatch, pages, count=300, failures={2: 10})
+    settings = _settings(sina_market_concurrency=2, sina_market_retries=1, sina_market_page_requeue=1)
+    with pytest.raises(RuntimeError, match="sina_market_gaps:2"):
+        sina_market.fetch_sina_market(settings)
+
+
+def _fixture_text() -> str:
+    return (Path(__file__).parent / "fixtures" / "sina_hs_a_page.txt").read_text(encoding="utf-8")
+
+
+def test_parse_sina_records_matches_json_path() -> None:
+    text = _fixture_text()
+    fast = records_to_items(sina_market._parse_sina_records(text))
+    legacy = normalize_sina_rows(parse_sina_text(text))
+    assert len(fast) == 102
+    assert fast == legacy
+    assert [item["symbol"] for item in fast[-2:]] == ["830799", "920002"]
+
+
+def test_parse_sina_records_strips_bj_prefix_like_the_reference() -> None:
+    # Without a code field both parsers fall back to the prefixed symbol.
+    raw = '[{symbol:"bj830799",code:"",name:"艾融软件",trade:"30.10",changepercent:"2.5",amount:"1000"}]'
+    fast = records_to_items(sina_market._parse_sina_records(raw))
+    assert fast == normalize_sina_rows(parse_sina_text(raw))
+    assert fast[0]["symbol"] == "830799"
+
+
+def test_parse_sina_columns_handles_reordered_keys() -> None:
+    raw = '[{code:"000001",symbol:"sz000001",amount:2000,name:"平安银行",changepercent:"-1.5",trade:"10.5"}]'
+    columns = sina_market.parse_sina_columns(raw)
+    assert columns["symbol"] == ["000001"]
+    assert columns["name"] == ["平安银行"]
+    assert columns["last"] == [10.5]
+    assert columns["pct_chg"] == [-1.5]
+    assert columns["amount"] == [2000.0]
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+from app.connectors.akshare_snapshot import _build_snapshot_from_items
+from app.core.snapshot_frame import SnapshotFrame
+
+
+def _frame() -> SnapshotFrame:
+    return SnapshotFrame.from_records(
+        ("symbol", "name", "last", "pct_chg", "amount"),
+        [
+            ("600000", "浦发银行", 10.0, 1.5, 300.0),
+            ("000001", "平安银行", 12.0, None, 500.0),
+            ("300750", "宁德时代", 200.0, 3.0, None),
+            ("", "skipped", 1.0, 1.0, 1.0),
+        ],
+    )
+
+
+def test_frame_lookup_and_select() -> None:
+    frame = _frame()
+    assert len(frame) == 3
+    assert frame.get("000001") == {"symbol": "000001", "name": "平安银行", "last": 12.0, "pct_chg": None, "amount": 500.0}
+    assert frame.get("999999") is None
+    assert frame.select(["300750", "999999", "600000"]).symbols == ["300750", "600000"]
+    assert frame.head(2).symbols == ["600000", "000001"]
+
+
+def test_frame_round_trips_items_and_builds_snapshot() -> None:
+    items = [
+        {"symbol": "600000", "name": "浦发银行", "last": 10.0, "pct_chg": 1.5, "amount": 300.0, "pe_ttm": 5.0},
+        {"symbol": "000001", "name": None, "last": None, "pct_chg": "bad", "amount": 500.0},
+    ]
+    frame = SnapshotFrame.from_items(items)
+    assert list(frame.columns) == ["last", "pct_chg", "amount", "pe_ttm"]
+    assert frame.to_items()[1] == {"symbol": "000001", "name": "", "last": None, "pct_chg": None, "amount": 500.0, "pe_ttm": None}
+
+    snapshot = _build_snapshot_from_items(_frame(), ["000001"], 2)
+    assert [row["symbol"] for row in snapshot["watchlist"]] == ["000001"]
+    assert [row["symbol"] for row in snapshot["top_gainers"]] == ["300750", "600000"]
+    assert [row["symbol"] for row in snapshot["top_turnover"]] == ["000001", "600000"]
+    assert [row["symbol"] for row in _build_snapshot_from_items(_frame(), ["999999"], 2)["watchlist"]] == ["600000", "000001"]
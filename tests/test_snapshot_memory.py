@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import threading
+import time
+
+from app.storage.snapshot_memory import SnapshotMemory
+
+
+def _rows(prefix: str) -> list:
+    return [{"symbol": f"{prefix}{idx:04d}", "last": 1.0} for idx in range(3)]
+
+
+def test_concurrent_callers_share_one_fetch() -> None:
+    memory = SnapshotMemory()
+    calls = []
+    release = threading.Event()
+
+    def fetch():
+        calls.append(1)
+        release.wait(2)
+        return _rows("60"), {"source": "sina_market"}
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(memory.fetch(fetch, ["600000"], 60))) for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.1)
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1
+    assert len(results) == 4
+    assert sum(1 for _, meta in results if meta.get("joined_inflight")) == 3
+
+
+def test_max_age_controls_reuse() -> None:
+    memory = SnapshotMemory()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        return _rows("00"), {"source": "eastmoney_direct"}
+
+    memory.fetch(fetch, [], 60)
+    _, meta = memory.fetch(fetch, [], 60)
+    assert len(calls) == 1
+    assert meta["memory_age_sec"] >= 0
+    memory.fetch(fetch, [], 0)
+    assert len(calls) == 2
+
+
+def test_degraded_entries_only_serve_their_symbols() -> None:
+    memory = SnapshotMemory()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        return _rows("60"), {"source": "tencent_watchlist", "degraded": True}
+
+    memory.fetch(fetch, ["600000", "000001"], 60)
+    memory.fetch(fetch, ["600000"], 60)
+    assert len(calls) == 1
+    memory.fetch(fetch, ["300750"], 60)
+    assert len(calls) == 2
+
+
+def test_uncovered_joiners_share_one_follow_up_fetch() -> None:
+    memory = SnapshotMemory()
+    calls = []
+    release = threading.Event()
+
+    def watchlist_fetch():
+        calls.append("watchlist")
+        release.wait(2)
+        return _rows("60"), {"source": "tencent_watchlist", "degraded": True}
+
+    def market_fetch():
+        calls.append("market")
+        time.sleep(0.05)
+        return _rows("30"), {"source": "sina_market"}
+
+    owner = threading.Thread(target=lambda: memory.fetch(watchlist_fetch, ["600000"], 60))
+    owner.start()
+    time.sleep(0.05)
+    results = []
+    joiners = [
+        threading.Thread(target=lambda: results.append(memory.fetch(market_fetch, ["300750"], 60))) for _ in range(3)
+    ]
+    for thread in joiners:
+        thread.start()
+    time.sleep(0.1)
+    release.set()
+    owner.join()
+    for thread in joiners:
+        thread.join()
+    assert calls == ["watchlist", "market"]
+    assert [meta["source"] for _, meta in results] == ["sina_market"] * 3
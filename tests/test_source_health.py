@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.main import app
+from app.connectors.source_health import SourceHealthRegistry, get_source_health, track_source
+from app.core.config import Settings, get_settings
+
+
+def _settings(**overrides) -> Settings:
+    values = {"source_breaker_failures": 3, "source_breaker_cooldown_sec": 300}
+    values.update(overrides)
+    return Settings(**values)
+
+
+def test_registry_stats_and_breaker() -> None:
+    registry = SourceHealthRegistry()
+    settings = _settings()
+    registry.record("sina_market", True, 100)
+    registry.record("sina_market", True, 300)
+    for _ in range(3):
+        registry.record("sina_market", False, 10_000, "timeout")
+    stats = registry.snapshot(settings)["sina_market"]
+    assert stats["samples"] == 5
+    assert stats["success_rate"] == 0.4
+    assert stats["p50_ms"] == 10_000
+    assert stats["p95_ms"] == 10_000
+    assert stats["last_error"] == "timeout"
+    assert stats["circuit"] == "open"
+    assert registry.is_open("sina_market", settings)
+    assert not registry.is_open("sina_market", _settings(source_breaker_cooldown_sec=0))
+
+
+def test_registry_orders_full_market_sources() -> None:
+    registry = SourceHealthRegistry()
+    settings = _settings()
+    configured = ["sina_market", "cache", "akshare", "eastmoney_direct", "tencent"]
+    assert registry.order(configured, settings) == configured
+    for _ in range(3):
+        registry.record("sina_market", False, 8000, "boom")
+    registry.record("eastmoney_direct", True, 500)
+    registry.record("akshare", False, 2000, "x")
+    registry.record("akshare", True, 2000)
+    order = registry.order(configured, settings)
+    assert order == ["cache", "eastmoney_direct", "akshare", "tencent"]
+
+
+def test_track_source_records_failures() -> None:
+    registry = get_source_health()
+    registry.reset()
+    with pytest.raises(RuntimeError):
+        with track_source("tencent"):
+            raise RuntimeError("down")
+    with track_source("tencent"):
+        pass
+    stats = registry.snapshot(_settings())["tencent"]
+    assert stats["samples"] == 2
+    assert stats["consecutive_failures"] == 0
+    assert stats["last_error"] == "down"
+    registry.reset()
+
+
+def test_sources_health_endpoint(tmp_path) -> None:
+    os.environ["QW_DISABLE_SCHEDULER"] = "true"
+    os.environ["QW_WATCHLIST_PATH"] = str(tmp_path / "watchlist.json")
+    get_settings.cache_clear()
+    get_source_health().reset()
+    get_source_health().record("sina_market", True, 120)
+    with TestClient(app) as client:
+        resp = client.get("/sources/health")
+        assert resp.status_code == 200
+        body = resp.json()
+        assert body["sources"]["sina_market"]["samples"] == 1
+        assert body["effective_order"][0] == "sina_market"
+        health = client.get("/health").json()
+        assert health["open_circuits"] == []
+    get_source_health().reset()
@@ -1,6 +1,24 @@
 from __future__ import annotations
 
-from app.connectors.tencent_quote import _parse_response
+import httpx
+
+from app.connectors import tencent_quote
+from app.connectors.tencent_quote import _parse_response, parse_tencent_columns
+from app.core.config import Settings
+
+
+def _record(code: str, last: float) -> str:
+    parts = [""] * 50
+    parts[:7] = ["51", "测试", code, str(last), "10.00", "10.10", "123456"]
+    parts[9], parts[10] = "10.49", "300"
+    parts[19], parts[20] = "10.50", "200"
+    parts[30] = "20261016150003"
+    parts[32], parts[33], parts[34] = "5.00", "10.60", "9.90"
+    parts[37], parts[38], parts[39] = "12345.6", "1.23", "8.80"
+    parts[44], parts[45], parts[46] = "100.5", "120.0", "1.10"
+    parts[47], parts[48], parts[49] = "11.00", "9.00", "0.95"
+    prefix = "sh" if code.startswith("6") else "sz"
+    return f'v_{prefix}{code}="{"~".join(parts)}";'
 
 
 def test_parse_response() -> None:
@@ -10,3 +28,43 @@ def test_parse_response() -> None:
     assert items[0]["symbol"] == "000001"
     assert items[0]["name"] == "平安银行"
     assert items[0]["last"] == 12.34
+
+
+def test_parse_full_record_into_columns() -> None:
+    columns = parse_tencent_columns(_record("600000", 10.5))
+    assert columns["symbol"] == ["600000"]
+    assert columns["amount"] == [123456000.0]
+    assert columns["volume"] == [123456.0]
+    assert columns["bid1"] == [10.49]
+    assert columns["ask1_volume"] == [200.0]
+    assert columns["ts"] == ["20261016150003"]
+    assert columns["total_mv"] == [12_000_000_000.0]
+    assert columns["limit_up"] == [11.0]
+    item = _parse_response(_record("600000", 10.5))[0]
+    assert item["pct_chg"] == 5.0
+    assert "bid1" not in item
+
+
+def test_fetch_quotes_chunks_concurrently_over_one_client(monkeypatch) -> None:
+    requested = []
+    clients = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        codes = str(request.url).split("q=", 1)[1].split(",")
+        requested.append(codes)
+        body = "\n".join(_record(code[2:], 10.0 + idx) for idx, code in enumerate(codes))
+        return httpx.Response(200, text=body)
+
+    def fake_client(proxy, timeout, max_connections, headers=None):
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        clients.append(client)
+        return client
+
+    monkeypatch.setattr(tencent_quote, "build_async_client", fake_client)
+    settings = Settings(tencent_chunk_size=2, tencent_concurrency=3)
+    symbols = ["600000", "000001", "300750", "688981", "601318"]
+    items = tencent_quote.fetch_quotes(symbols, settings=settings)
+    assert [item["symbol"] for item in items] == symbols
+    assert len(clients) == 1
+    assert sorted(len(chunk) for chunk in requested) == [1, 2, 2]
+    assert all(item["amount"] == 123456000.0 for item in items)
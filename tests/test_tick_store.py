@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import numpy as np
+
+from app.storage.tick_store import TickStore
+
+# 2026-10-16 09:30:00 Asia/Shanghai
+_OPEN_TS = 1792114200.0
+
+
+def test_append_and_read_back_day(tmp_path) -> None:
+    store = TickStore(str(tmp_path))
+    store.append([{"symbol": "600000", "last": 10.0, "amount": 1e6}, {"symbol": "000001", "last": 5.0}], _OPEN_TS)
+    store.append([{"symbol": "600000", "last": 10.4}, {"symbol": "300750", "last": None}], _OPEN_TS + 20)
+    store.append([{"symbol": "600000", "last": 9.8}], _OPEN_TS + 40)
+    store.append([{"symbol": "600000", "last": 10.1}], _OPEN_TS + 70)
+
+    assert store.days() == ["2026-10-16"]
+    day = store.open_day("2026-10-16")
+    assert day is not None
+    assert day.rows == 6
+    assert day.symbols == ["600000", "000001", "300750"]
+    assert isinstance(day.columns["last"], np.memmap)
+    ts, last = day.series("600000", "last")
+    assert last.tolist() == [10.0, 10.4, 9.8, 10.1]
+    assert np.isnan(day.series("300750", "last")[1][0])
+
+    bars = day.minute_bars("600000")
+    assert bars["open"].tolist() == [10.0, 10.1]
+    assert bars["high"].tolist() == [10.4, 10.1]
+    assert bars["low"].tolist() == [9.8, 10.1]
+    assert bars["close"].tolist() == [9.8, 10.1]
+
+
+def test_series_are_views_into_one_grouped_copy(tmp_path) -> None:
+    store = TickStore(str(tmp_path))
+    for step in range(3):
+        store.append([{"symbol": "000001", "last": 5.0 + step}, {"symbol": "600000", "last": 10.0 + step}], _OPEN_TS + step * 5)
+    day = store.open_day("2026-10-16")
+    assert day.symbol_rows("600000").tolist() == [1, 3, 5]
+    assert day.symbol_rows("999999").size == 0
+    first = day.series("000001", "last")[1]
+    second = day.series("600000", "last")[1]
+    assert first.tolist() == [5.0, 6.0, 7.0] and second.tolist() == [10.0, 11.0, 12.0]
+    # Both lookups slice the same per-field array; nothing is gathered per call.
+    assert first.base is not None and first.base is second.base
+
+
+def test_reader_ignores_torn_tail(tmp_path) -> None:
+    store = TickStore(str(tmp_path))
+    store.append([{"symbol": "600000", "last": 10.0}], _OPEN_TS)
+    with (tmp_path / "2026-10-16" / "last.bin").open("ab") as handle:
+        np.array([11.0], dtype="<f8").tofile(handle)
+    day = store.open_day("2026-10-16")
+    assert day.rows == 1
+    assert store.open_day("2026-10-17") is None
+
+
+def test_append_after_torn_tail_stays_aligned(tmp_path) -> None:
+    store = TickStore(str(tmp_path))
+    store.append([{"symbol": "600000", "last": 10.0}, {"symbol": "000001", "last": 5.0}], _OPEN_TS)
+    day_dir = tmp_path / "2026-10-16"
+    # Simulate a crash mid-append: two columns got the next row, one got half a value.
+    for name, value in (("ts", _OPEN_TS + 20), ("symbol_id", 0)):
+        with (day_dir / f"{name}.bin").open("ab") as handle:
+            np.array([value], dtype="<f8" if name == "ts" else "<i4").tofile(handle)
+    with (day_dir / "last.bin").open("ab") as handle:
+        handle.write(b"\x00\x00\x00")
+
+    restarted = TickStore(str(tmp_path))
+    restarted.append([{"symbol": "000001", "last": 5.5}, {"symbol": "600000", "last": 10.2}], _OPEN_TS + 40)
+    day = restarted.open_day("2026-10-16")
+    assert day.rows == 4
+    assert (day_dir / "last.bin").stat().st_size == 4 * 8
+    assert day.series("600000", "last")[1].tolist() == [10.0, 10.2]
+    assert day.series("000001", "last")[1].tolist() == [5.0, 5.5]
+    assert day.series("000001", "ts")[0].tolist() == [_OPEN_TS, _OPEN_TS + 40]